@@ -1339,6 +1339,22 @@ JSON format: { "tags": ["tag1", "tag2", "tag3"] }
 {{MESSAGES:END:6}}
 </chat_history>"""
 
+DEFAULT_TITLE_TAGS_GENERATION_PROMPT_TEMPLATE = """### Task:
+Generate a concise, 3-5 word title with an emoji summarizing the chat history, and 1-3 broad tags categorizing its main themes along with 1-3 more specific subtopic tags.
+### Guidelines:
+- The title should clearly represent the main theme or subject of the conversation.
+- Use emojis in the title that enhance understanding of the topic, but avoid quotation marks or special formatting.
+- Start the tags with high-level domains (e.g. Science, Technology, Philosophy, Arts, Politics, Business, Health, Sports, Entertainment, Education)
+- If content is too short (less than 3 messages) or too diverse, use only ["General"] as tags
+- Write in the chat's primary language; default to English if multilingual.
+- Prioritize accuracy over excessive creativity; keep it clear and simple.
+### Output:
+JSON format: { "title": "your concise title here", "tags": ["tag1", "tag2", "tag3"] }
+### Chat History:
+<chat_history>
+{{MESSAGES:END:6}}
+</chat_history>"""
+
 IMAGE_PROMPT_GENERATION_PROMPT_TEMPLATE = PersistentConfig(
     "IMAGE_PROMPT_GENERATION_PROMPT_TEMPLATE",
     "task.image.prompt_template",
@@ -1659,6 +1675,9 @@ Ensure that the tools are effectively utilized to achieve the highest-quality an
 
 VECTOR_DB = os.environ.get("VECTOR_DB", "chroma")
 
+# Number of items written to the vector database per insert/upsert request
+VECTOR_DB_BATCH_SIZE = int(os.environ.get("VECTOR_DB_BATCH_SIZE", "500"))
+
 # Chroma
 CHROMA_DATA_PATH = f"{DATA_DIR}/vector_db"
 
@@ -1724,6 +1743,26 @@ PGVECTOR_INITIALIZE_MAX_VECTOR_LENGTH = int(
     os.environ.get("PGVECTOR_INITIALIZE_MAX_VECTOR_LENGTH", "1536")
 )
 
+# Vector index used for document_chunk searches: "ivfflat" (as before) or
+# "hnsw". On a table that already has rows, switching builds the new index
+# only through the vector index rebuild endpoint.
+PGVECTOR_INDEX_METHOD = os.environ.get("PGVECTOR_INDEX_METHOD", "ivfflat").lower()
+if PGVECTOR_INDEX_METHOD not in ["hnsw", "ivfflat"]:
+    PGVECTOR_INDEX_METHOD = "ivfflat"
+
+PGVECTOR_HNSW_M = int(os.environ.get("PGVECTOR_HNSW_M", "16"))
+PGVECTOR_HNSW_EF_CONSTRUCTION = int(
+    os.environ.get("PGVECTOR_HNSW_EF_CONSTRUCTION", "64")
+)
+PGVECTOR_HNSW_EF_SEARCH = int(os.environ.get("PGVECTOR_HNSW_EF_SEARCH", "40"))
+
+PGVECTOR_IVFFLAT_LISTS = int(os.environ.get("PGVECTOR_IVFFLAT_LISTS", "100"))
+PGVECTOR_IVFFLAT_PROBES = int(os.environ.get("PGVECTOR_IVFFLAT_PROBES", "1"))
+
+# Hash-partition document_chunk by collection_name into this many partitions
+# when the table is first created, 0 disables partitioning
+PGVECTOR_PARTITIONS = int(os.environ.get("PGVECTOR_PARTITIONS", "0"))
+
 ####################################
 # Information Retrieval (RAG)
 ####################################
@@ -1887,6 +1926,10 @@ RAG_EMBEDDING_BATCH_SIZE = PersistentConfig(
     ),
 )
 
+ENABLE_RAG_CHUNK_DEDUPLICATION = (
+    os.environ.get("ENABLE_RAG_CHUNK_DEDUPLICATION", "True").lower() == "true"
+)
+
 RAG_EMBEDDING_QUERY_PREFIX = os.environ.get("RAG_EMBEDDING_QUERY_PREFIX", None)
 
 RAG_EMBEDDING_CONTENT_PREFIX = os.environ.get("RAG_EMBEDDING_CONTENT_PREFIX", None)
@@ -112,6 +112,7 @@ class TASKS(str, Enum):
     DEFAULT = lambda task="": f"{task if task else 'generation'}"
     TITLE_GENERATION = "title_generation"
     TAGS_GENERATION = "tags_generation"
+    TITLE_TAGS_GENERATION = "title_tags_generation"
     EMOJI_GENERATION = "emoji_generation"
     QUERY_GENERATION = "query_generation"
     IMAGE_PROMPT_GENERATION = "image_prompt_generation"
@@ -326,6 +326,19 @@ REDIS_URL = os.environ.get("REDIS_URL", "")
 REDIS_SENTINEL_HOSTS = os.environ.get("REDIS_SENTINEL_HOSTS", "")
 REDIS_SENTINEL_PORT = os.environ.get("REDIS_SENTINEL_PORT", "26379")
 
+# Seconds between a worker's heartbeats in the shared task registry, a
+# worker's tasks are dropped after three missed heartbeats
+try:
+    TASK_HEARTBEAT_INTERVAL = int(os.environ.get("TASK_HEARTBEAT_INTERVAL", "10"))
+except ValueError:
+    TASK_HEARTBEAT_INTERVAL = 10
+
+# Seconds a task registry call may take before the local view is used
+try:
+    TASK_REGISTRY_TIMEOUT = float(os.environ.get("TASK_REGISTRY_TIMEOUT", "1"))
+except ValueError:
+    TASK_REGISTRY_TIMEOUT = 1.0
+
 ####################################
 # UVICORN WORKERS
 ####################################
@@ -399,6 +412,22 @@ WEBSOCKET_SENTINEL_HOSTS = os.environ.get("WEBSOCKET_SENTINEL_HOSTS", "")
 
 WEBSOCKET_SENTINEL_PORT = os.environ.get("WEBSOCKET_SENTINEL_PORT", "26379")
 
+# Presence changes (users online, models in use) are broadcast at most this often
+try:
+    WEBSOCKET_PRESENCE_BROADCAST_INTERVAL = float(
+        os.environ.get("WEBSOCKET_PRESENCE_BROADCAST_INTERVAL", "1")
+    )
+except ValueError:
+    WEBSOCKET_PRESENCE_BROADCAST_INTERVAL = 1.0
+
+# Streamed chat content is coalesced into one socket frame per interval (seconds)
+try:
+    CHAT_EVENT_FRAME_INTERVAL = float(
+        os.environ.get("CHAT_EVENT_FRAME_INTERVAL", "0.04")
+    )
+except ValueError:
+    CHAT_EVENT_FRAME_INTERVAL = 0.04
+
 AIOHTTP_CLIENT_TIMEOUT = os.environ.get("AIOHTTP_CLIENT_TIMEOUT", "")
 
 if AIOHTTP_CLIENT_TIMEOUT == "":
@@ -437,6 +466,179 @@ else:
     except Exception:
         AIOHTTP_CLIENT_TIMEOUT_TOOL_SERVER_DATA = 10
 
+# Seconds an OpenAPI tool server spec is served from cache before revalidating
+TOOL_SERVER_SPEC_CACHE_TTL = int(os.environ.get("TOOL_SERVER_SPEC_CACHE_TTL", "300"))
+
+# Cached OpenAPI tool server specs and converted tool payloads kept at most
+TOOL_SERVER_CACHE_MAX_SIZE = int(os.environ.get("TOOL_SERVER_CACHE_MAX_SIZE", "256"))
+
+# Consecutive failures before a tool server is skipped, and for how long
+TOOL_SERVER_CIRCUIT_BREAKER_THRESHOLD = int(
+    os.environ.get("TOOL_SERVER_CIRCUIT_BREAKER_THRESHOLD", "3")
+)
+TOOL_SERVER_CIRCUIT_BREAKER_COOLDOWN = int(
+    os.environ.get("TOOL_SERVER_CIRCUIT_BREAKER_COOLDOWN", "60")
+)
+
+# Concurrent requests and keep-alive per OpenAPI tool server
+TOOL_SERVER_MAX_CONCURRENCY = int(os.environ.get("TOOL_SERVER_MAX_CONCURRENCY", "8"))
+TOOL_SERVER_KEEPALIVE_TIMEOUT = int(
+    os.environ.get("TOOL_SERVER_KEEPALIVE_TIMEOUT", "30")
+)
+
+####################################
+# CODE INTERPRETER
+####################################
+
+# Warm Jupyter kernels kept ready per server
+try:
+    JUPYTER_KERNEL_POOL_SIZE = int(os.environ.get("JUPYTER_KERNEL_POOL_SIZE", "2"))
+except ValueError:
+    JUPYTER_KERNEL_POOL_SIZE = 2
+
+# Seconds a kernel bound to a chat is kept after its last execution
+try:
+    JUPYTER_KERNEL_IDLE_TIMEOUT = int(
+        os.environ.get("JUPYTER_KERNEL_IDLE_TIMEOUT", "600")
+    )
+except ValueError:
+    JUPYTER_KERNEL_IDLE_TIMEOUT = 600
+
+try:
+    JUPYTER_KERNEL_MAX_SESSIONS = int(
+        os.environ.get("JUPYTER_KERNEL_MAX_SESSIONS", "20")
+    )
+except ValueError:
+    JUPYTER_KERNEL_MAX_SESSIONS = 20
+
+####################################
+# ACCESS CONTROL
+####################################
+
+# Seconds a user's group memberships are cached for access checks
+try:
+    ACCESS_CONTROL_CACHE_TTL = int(os.environ.get("ACCESS_CONTROL_CACHE_TTL", "10"))
+except ValueError:
+    ACCESS_CONTROL_CACHE_TTL = 10
+
+####################################
+# CHANNELS
+####################################
+
+# Seconds a channel and its access checks are cached per worker
+try:
+    CHANNEL_ACCESS_CACHE_TTL = int(os.environ.get("CHANNEL_ACCESS_CACHE_TTL", "10"))
+except ValueError:
+    CHANNEL_ACCESS_CACHE_TTL = 10
+
+# Seconds channel events are buffered per room before they are emitted
+try:
+    CHANNEL_EVENT_BATCH_WINDOW = float(
+        os.environ.get("CHANNEL_EVENT_BATCH_WINDOW", "0.05")
+    )
+except ValueError:
+    CHANNEL_EVENT_BATCH_WINDOW = 0.05
+
+try:
+    CHANNEL_NOTIFICATION_QUEUE_SIZE = int(
+        os.environ.get("CHANNEL_NOTIFICATION_QUEUE_SIZE", "1000")
+    )
+except ValueError:
+    CHANNEL_NOTIFICATION_QUEUE_SIZE = 1000
+
+####################################
+# CHAT IMAGES
+####################################
+
+# Move base64 images out of existing chats into file storage once on startup
+ENABLE_CHAT_IMAGE_MIGRATION = (
+    os.environ.get("ENABLE_CHAT_IMAGE_MIGRATION", "True").lower() == "true"
+)
+
+try:
+    CHAT_IMAGE_MIGRATION_BATCH_SIZE = int(
+        os.environ.get("CHAT_IMAGE_MIGRATION_BATCH_SIZE", "100")
+    )
+except ValueError:
+    CHAT_IMAGE_MIGRATION_BATCH_SIZE = 100
+
+####################################
+# IMAGE GENERATION
+####################################
+
+# Jobs run at once against one ComfyUI server, Automatic1111 always gets one
+try:
+    IMAGE_GENERATION_MAX_CONCURRENT_JOBS = int(
+        os.environ.get("IMAGE_GENERATION_MAX_CONCURRENT_JOBS", "2")
+    )
+except ValueError:
+    IMAGE_GENERATION_MAX_CONCURRENT_JOBS = 2
+
+# Jobs waiting for a slot on one server before new ones are rejected
+try:
+    IMAGE_GENERATION_MAX_QUEUED_JOBS = int(
+        os.environ.get("IMAGE_GENERATION_MAX_QUEUED_JOBS", "20")
+    )
+except ValueError:
+    IMAGE_GENERATION_MAX_QUEUED_JOBS = 20
+
+IMAGE_GENERATION_TIMEOUT = os.environ.get("IMAGE_GENERATION_TIMEOUT", "")
+
+if IMAGE_GENERATION_TIMEOUT == "":
+    IMAGE_GENERATION_TIMEOUT = None
+else:
+    try:
+        IMAGE_GENERATION_TIMEOUT = int(IMAGE_GENERATION_TIMEOUT)
+    except ValueError:
+        IMAGE_GENERATION_TIMEOUT = 600
+
+####################################
+# BACKGROUND TASKS
+####################################
+
+# Approximate tokens of chat history sent to each background task
+try:
+    TITLE_GENERATION_TOKEN_BUDGET = int(
+        os.environ.get("TITLE_GENERATION_TOKEN_BUDGET", "1000")
+    )
+except ValueError:
+    TITLE_GENERATION_TOKEN_BUDGET = 1000
+
+try:
+    TAGS_GENERATION_TOKEN_BUDGET = int(
+        os.environ.get("TAGS_GENERATION_TOKEN_BUDGET", "2000")
+    )
+except ValueError:
+    TAGS_GENERATION_TOKEN_BUDGET = 2000
+
+# Generate the title and tags of a chat with one task model call
+ENABLE_TITLE_TAGS_FUSION = (
+    os.environ.get("ENABLE_TITLE_TAGS_FUSION", "False").lower() == "true"
+)
+
+####################################
+# TOOL CALLS
+####################################
+
+# Per-call timeout in seconds for native function-calling tool calls
+TOOL_CALL_TIMEOUT = os.environ.get("TOOL_CALL_TIMEOUT", "")
+
+if TOOL_CALL_TIMEOUT == "":
+    TOOL_CALL_TIMEOUT = None
+else:
+    try:
+        TOOL_CALL_TIMEOUT = int(TOOL_CALL_TIMEOUT)
+    except Exception:
+        TOOL_CALL_TIMEOUT = 300
+
+# Maximum number of tool calls from one model turn that run at the same time
+try:
+    TOOL_CALL_MAX_CONCURRENCY = max(
+        int(os.environ.get("TOOL_CALL_MAX_CONCURRENCY", "8")), 1
+    )
+except Exception:
+    TOOL_CALL_MAX_CONCURRENCY = 8
+
 ####################################
 # OFFLINE_MODE
 ####################################
@@ -467,6 +669,22 @@ AUDIT_EXCLUDED_PATHS = os.getenv("AUDIT_EXCLUDED_PATHS", "/chats,/chat,/folders"
 AUDIT_EXCLUDED_PATHS = [path.strip() for path in AUDIT_EXCLUDED_PATHS]
 AUDIT_EXCLUDED_PATHS = [path.lstrip("/") for path in AUDIT_EXCLUDED_PATHS]
 
+# Audit entries are queued and written in batches by a background task
+try:
+    AUDIT_LOG_QUEUE_SIZE = int(os.environ.get("AUDIT_LOG_QUEUE_SIZE", "10000"))
+except ValueError:
+    AUDIT_LOG_QUEUE_SIZE = 10000
+
+try:
+    AUDIT_LOG_BATCH_SIZE = int(os.environ.get("AUDIT_LOG_BATCH_SIZE", "100"))
+except ValueError:
+    AUDIT_LOG_BATCH_SIZE = 100
+
+try:
+    AUDIT_LOG_FLUSH_INTERVAL = float(os.environ.get("AUDIT_LOG_FLUSH_INTERVAL", "1"))
+except ValueError:
+    AUDIT_LOG_FLUSH_INTERVAL = 1.0
+
 ####################################
 # OPENTELEMETRY
 ####################################
@@ -490,6 +708,13 @@ OTEL_TRACES_SAMPLER = os.environ.get(
 PIP_OPTIONS = os.getenv("PIP_OPTIONS", "").split()
 PIP_PACKAGE_INDEX_OPTIONS = os.getenv("PIP_PACKAGE_INDEX_OPTIONS", "").split()
 
+####################################
+# TOOLS/FUNCTIONS WARMUP
+####################################
+
+# Load all tools and active functions when the app starts
+ENABLE_PLUGIN_WARMUP = os.getenv("ENABLE_PLUGIN_WARMUP", "True").lower() == "true"
+
 
 ####################################
 # PROGRESSIVE WEB APP OPTIONS
@@ -15,7 +15,7 @@ from open_webui.env import (
     DATABASE_POOL_TIMEOUT,
 )
 from peewee_migrate import Router
-from sqlalchemy import Dialect, create_engine, MetaData, types
+from sqlalchemy import Dialect, and_, create_engine, MetaData, or_, types
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import scoped_session, sessionmaker
 from sqlalchemy.pool import QueuePool, NullPool
@@ -114,3 +114,12 @@ def get_session():
 
 
 get_db = contextmanager(get_session)
+
+
+def get_keyset_filter(column, id_column, cursor: tuple[int, str]):
+    """
+    Rows after `cursor` when ordered by (column, id_column) descending. The
+    redundant `column <= value` lets the database seek an index on `column`.
+    """
+    value, id = cursor
+    return and_(column <= value, or_(column < value, id_column < id))
@@ -46,10 +46,15 @@ from starlette.responses import Response, StreamingResponse
 
 
 from open_webui.utils import logger
-from open_webui.utils.audit import AuditLevel, AuditLoggingMiddleware
+from open_webui.utils.audit import (
+    AuditLevel,
+    AuditLoggingMiddleware,
+    audit_log_sink,
+)
 from open_webui.utils.logger import start_logger
 from open_webui.socket.main import (
     app as socket_app,
+    get_chat_event_metrics,
     periodic_usage_pool_cleanup,
 )
 
@@ -350,6 +355,8 @@ from open_webui.env import (
     OFFLINE_MODE,
     ENABLE_OTEL,
     EXTERNAL_PWA_MANIFEST_URL,
+    ENABLE_PLUGIN_WARMUP,
+    ENABLE_CHAT_IMAGE_MIGRATION,
 )
 
 
@@ -364,6 +371,7 @@ from open_webui.utils.chat import (
     chat_action as chat_action_handler,
 )
 from open_webui.utils.middleware import process_chat_payload, process_chat_response
+from open_webui.utils.task import get_task_messages
 from open_webui.utils.access_control import has_access
 
 from open_webui.utils.auth import (
@@ -380,9 +388,24 @@ from open_webui.tasks import (
     list_task_ids_by_chat_id,
     stop_task,
     list_tasks,
+    listen_for_task_stops,
+    periodic_task_heartbeat,
+    close_task_registry,
 )  # Import from tasks.py
 
 from open_webui.utils.redis import get_sentinels_from_env
+from open_webui.utils.plugin import listen_for_plugin_updates, warm_up_plugins
+from open_webui.utils.code_interpreter import close_kernel_pools
+from open_webui.utils.images.client import close_image_generation_clients
+from open_webui.utils.files import run_chat_image_migration
+from open_webui.utils.channels import (
+    channel_event_emitter,
+    channel_notification_worker,
+)
+from open_webui.utils.tools import (
+    close_tool_server_executors,
+    periodic_tool_servers_refresh,
+)
 
 
 if SAFE_MODE:
@@ -435,9 +458,34 @@ async def lifespan(app: FastAPI):
     if LICENSE_KEY:
         get_license_data(app, LICENSE_KEY)
 
-    asyncio.create_task(periodic_usage_pool_cleanup())
+    # Kept for the lifetime of the app, and stopped on shutdown
+    background_tasks = [
+        asyncio.create_task(periodic_usage_pool_cleanup()),
+        asyncio.create_task(listen_for_plugin_updates(app)),
+        asyncio.create_task(periodic_tool_servers_refresh(app)),
+        asyncio.create_task(periodic_task_heartbeat()),
+        asyncio.create_task(listen_for_task_stops()),
+    ]
+
+    if ENABLE_CHAT_IMAGE_MIGRATION:
+        asyncio.create_task(run_chat_image_migration())
+
+    if ENABLE_PLUGIN_WARMUP and not SAFE_MODE:
+        await asyncio.to_thread(warm_up_plugins, app)
     yield
 
+    for task in background_tasks:
+        task.cancel()
+    await asyncio.gather(*background_tasks, return_exceptions=True)
+
+    await close_tool_server_executors()
+    await close_kernel_pools()
+    await close_image_generation_clients()
+    await close_task_registry()
+    await audit_log_sink.close()
+    await channel_event_emitter.close()
+    await channel_notification_worker.close()
+
 
 app = FastAPI(
     title="Open WebUI",
@@ -1131,6 +1179,9 @@ async def chat_completion(
         request.state.metadata = metadata
         form_data["metadata"] = metadata
 
+        # Taken before system prompts and retrieved context are added
+        task_messages = get_task_messages(form_data.get("messages", []))
+
         form_data, metadata, events = await process_chat_payload(
             request, form_data, user, metadata, model
         )
@@ -1156,7 +1207,15 @@ async def chat_completion(
         response = await chat_completion_handler(request, form_data, user)
 
         return await process_chat_response(
-            request, response, form_data, user, metadata, model, events, tasks
+            request,
+            response,
+            form_data,
+            user,
+            metadata,
+            model,
+            events,
+            tasks,
+            task_messages,
         )
     except Exception as e:
         raise HTTPException(
@@ -1219,7 +1278,12 @@ async def stop_task_endpoint(task_id: str, user=Depends(get_verified_user)):
 
 @app.get("/api/tasks")
 async def list_tasks_endpoint(user=Depends(get_verified_user)):
-    return {"tasks": list_tasks()}
+    return {"tasks": await list_tasks()}
+
+
+@app.get("/api/tasks/events")
+async def get_chat_event_metrics_endpoint(user=Depends(get_admin_user)):
+    return get_chat_event_metrics()
 
 
 @app.get("/api/tasks/chat/{chat_id}")
@@ -1228,7 +1292,7 @@ async def list_tasks_by_chat_id_endpoint(chat_id: str, user=Depends(get_verified
     if chat is None or chat.user_id != user.id:
         return {"task_ids": []}
 
-    task_ids = list_task_ids_by_chat_id(chat_id)
+    task_ids = await list_task_ids_by_chat_id(chat_id)
 
     print(f"Task IDs for chat {chat_id}: {task_ids}")
     return {"task_ids": task_ids}
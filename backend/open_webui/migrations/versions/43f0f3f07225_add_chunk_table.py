@@ -0,0 +1,34 @@
+"""Add chunk table
+
+Revision ID: 43f0f3f07225
+Revises: 3781e22d8b01
+Create Date: 2026-10-18 03:00:00.000000
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "43f0f3f07225"
+down_revision = "3781e22d8b01"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "chunk",
+        sa.Column(
+            "id", sa.Text(), nullable=False, primary_key=True, unique=True
+        ),  # Content hash of the embedding config and chunk text
+        sa.Column("embedding_config", sa.Text(), nullable=True),
+        sa.Column("vector", sa.LargeBinary(), nullable=True),  # float32 vector
+        sa.Column("size", sa.BigInteger(), nullable=True),
+        sa.Column("ref_count", sa.BigInteger(), nullable=True),
+        sa.Column("created_at", sa.BigInteger(), nullable=True),
+        sa.Column("updated_at", sa.BigInteger(), nullable=True),
+    )
+
+
+def downgrade():
+    op.drop_table("chunk")
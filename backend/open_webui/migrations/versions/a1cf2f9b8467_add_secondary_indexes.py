@@ -0,0 +1,55 @@
+"""Add secondary indexes for per-user and per-channel lookups
+
+Revision ID: a1cf2f9b8467
+Revises: e28386d46f8b
+Create Date: 2026-10-18 06:00:00.000000
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "a1cf2f9b8467"
+down_revision = "e28386d46f8b"
+branch_labels = None
+depends_on = None
+
+# (index name, table, columns), kept in sync with the models' __table_args__
+INDEXES = [
+    ("chat_user_id_updated_at_idx", "chat", ["user_id", "updated_at"]),
+    (
+        "chat_user_id_folder_id_updated_at_idx",
+        "chat",
+        ["user_id", "folder_id", "updated_at"],
+    ),
+    (
+        "message_channel_id_parent_id_created_at_idx",
+        "message",
+        ["channel_id", "parent_id", "created_at"],
+    ),
+    ("message_parent_id_created_at_idx", "message", ["parent_id", "created_at"]),
+    ("message_reaction_message_id_idx", "message_reaction", ["message_id"]),
+    ("file_user_id_idx", "file", ["user_id"]),
+    ("memory_user_id_idx", "memory", ["user_id"]),
+    ("feedback_user_id_idx", "feedback", ["user_id"]),
+    ("tag_user_id_idx", "tag", ["user_id"]),
+    ("folder_user_id_parent_id_idx", "folder", ["user_id", "parent_id"]),
+]
+
+
+def get_existing_indexes(table_name: str) -> set[str]:
+    inspector = sa.inspect(op.get_bind())
+    return {index["name"] for index in inspector.get_indexes(table_name)}
+
+
+def upgrade():
+    for name, table_name, columns in INDEXES:
+        # Some deployments added these by hand before they were shipped
+        if name not in get_existing_indexes(table_name):
+            op.create_index(name, table_name, columns)
+
+
+def downgrade():
+    for name, table_name, _ in reversed(INDEXES):
+        if name in get_existing_indexes(table_name):
+            op.drop_index(name, table_name=table_name)
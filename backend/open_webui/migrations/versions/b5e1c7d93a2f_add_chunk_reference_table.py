@@ -0,0 +1,42 @@
+"""Add chunk_reference table
+
+Revision ID: b5e1c7d93a2f
+Revises: a1cf2f9b8467
+Create Date: 2026-10-19 00:00:00.000000
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "b5e1c7d93a2f"
+down_revision = "a1cf2f9b8467"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "chunk_reference",
+        sa.Column("chunk_id", sa.Text(), nullable=False),
+        sa.Column("collection_name", sa.Text(), nullable=False),
+        sa.Column("file_id", sa.Text(), nullable=False),  # "" when not from a file
+        sa.Column("count", sa.BigInteger(), nullable=False),
+        sa.PrimaryKeyConstraint("chunk_id", "collection_name", "file_id"),
+    )
+    op.create_index(
+        "chunk_reference_collection_name_file_id_idx",
+        "chunk_reference",
+        ["collection_name", "file_id"],
+    )
+
+    # Existing chunks have no references that could ever release them, they
+    # are only a cache of embeddings and are computed again as needed
+    op.execute("DELETE FROM chunk")
+
+
+def downgrade():
+    op.drop_index(
+        "chunk_reference_collection_name_file_id_idx", table_name="chunk_reference"
+    )
+    op.drop_table("chunk_reference")
@@ -0,0 +1,49 @@
+"""Add group_member table
+
+Revision ID: e28386d46f8b
+Revises: 43f0f3f07225
+Create Date: 2026-10-18 04:00:00.000000
+
+"""
+
+import json
+import time
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "e28386d46f8b"
+down_revision = "43f0f3f07225"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    group_member = op.create_table(
+        "group_member",
+        sa.Column("group_id", sa.Text(), nullable=False),
+        sa.Column("user_id", sa.Text(), nullable=False),
+        sa.Column("created_at", sa.BigInteger(), nullable=True),
+        sa.PrimaryKeyConstraint("group_id", "user_id", name="pk_group_id_user_id"),
+    )
+    op.create_index("group_member_user_id_idx", "group_member", ["user_id"])
+
+    # Copy existing memberships from group.user_ids
+    conn = op.get_bind()
+    group = sa.table("group", sa.column("id", sa.Text), sa.column("user_ids", sa.JSON))
+
+    now = int(time.time())
+    rows = []
+    for group_id, user_ids in conn.execute(sa.select(group.c.id, group.c.user_ids)):
+        if isinstance(user_ids, str):
+            user_ids = json.loads(user_ids)
+        for user_id in dict.fromkeys(user_ids or []):
+            rows.append({"group_id": group_id, "user_id": user_id, "created_at": now})
+
+    if rows:
+        op.bulk_insert(group_member, rows)
+
+
+def downgrade():
+    op.drop_index("group_member_user_id_idx", table_name="group_member")
+    op.drop_table("group_member")
@@ -4,13 +4,13 @@ import time
 import uuid
 from typing import Optional
 
-from open_webui.internal.db import Base, get_db
+from open_webui.internal.db import Base, get_db, get_keyset_filter
 from open_webui.models.tags import TagModel, Tag, Tags
 from open_webui.env import SRC_LOG_LEVELS
 
 from pydantic import BaseModel, ConfigDict
-from sqlalchemy import BigInteger, Boolean, Column, String, Text, JSON
-from sqlalchemy import or_, func, select, and_, text
+from sqlalchemy import BigInteger, Boolean, Column, Index, String, Text, JSON
+from sqlalchemy import or_, func, select, and_, text, cast
 from sqlalchemy.sql import exists
 
 ####################
@@ -39,6 +39,16 @@ class Chat(Base):
     meta = Column(JSON, server_default="{}")
     folder_id = Column(Text, nullable=True)
 
+    __table_args__ = (
+        Index("chat_user_id_updated_at_idx", "user_id", "updated_at"),
+        Index(
+            "chat_user_id_folder_id_updated_at_idx",
+            "user_id",
+            "folder_id",
+            "updated_at",
+        ),
+    )
+
 
 class ChatModel(BaseModel):
     model_config = ConfigDict(from_attributes=True)
@@ -104,6 +114,11 @@ class ChatTitleIdResponse(BaseModel):
     created_at: int
 
 
+# Columns behind ChatTitleIdResponse, list queries select only these so the
+# chat JSON is never read for them
+CHAT_TITLE_ID_COLUMNS = (Chat.id, Chat.title, Chat.updated_at, Chat.created_at)
+
+
 class ChatTable:
     def insert_new_chat(self, user_id: str, form_data: ChatForm) -> Optional[ChatModel]:
         with get_db() as db:
@@ -378,16 +393,19 @@ class ChatTable:
 
     def get_archived_chat_list_by_user_id(
         self, user_id: str, skip: int = 0, limit: int = 50
-    ) -> list[ChatModel]:
+    ) -> list[ChatTitleIdResponse]:
         with get_db() as db:
             all_chats = (
                 db.query(Chat)
                 .filter_by(user_id=user_id, archived=True)
                 .order_by(Chat.updated_at.desc())
+                .with_entities(*CHAT_TITLE_ID_COLUMNS)
                 # .limit(limit).offset(skip)
                 .all()
             )
-            return [ChatModel.model_validate(chat) for chat in all_chats]
+            return [
+                ChatTitleIdResponse.model_validate(chat._asdict()) for chat in all_chats
+            ]
 
     def get_chat_list_by_user_id(
         self,
@@ -395,13 +413,19 @@ class ChatTable:
         include_archived: bool = False,
         skip: int = 0,
         limit: int = 50,
-    ) -> list[ChatModel]:
+        cursor: Optional[tuple[int, str]] = None,
+    ) -> list[ChatTitleIdResponse]:
         with get_db() as db:
             query = db.query(Chat).filter_by(user_id=user_id)
             if not include_archived:
                 query = query.filter_by(archived=False)
+            if cursor:
+                query = query.filter(
+                    get_keyset_filter(Chat.updated_at, Chat.id, cursor)
+                )
 
-            query = query.order_by(Chat.updated_at.desc())
+            query = query.order_by(Chat.updated_at.desc(), Chat.id.desc())
+            query = query.with_entities(*CHAT_TITLE_ID_COLUMNS)
 
             if skip:
                 query = query.offset(skip)
@@ -409,7 +433,9 @@ class ChatTable:
                 query = query.limit(limit)
 
             all_chats = query.all()
-            return [ChatModel.model_validate(chat) for chat in all_chats]
+            return [
+                ChatTitleIdResponse.model_validate(chat._asdict()) for chat in all_chats
+            ]
 
     def get_chat_title_id_list_by_user_id(
         self,
@@ -417,6 +443,7 @@ class ChatTable:
         include_archived: bool = False,
         skip: Optional[int] = None,
         limit: Optional[int] = None,
+        cursor: Optional[tuple[int, str]] = None,
     ) -> list[ChatTitleIdResponse]:
         with get_db() as db:
             query = db.query(Chat).filter_by(user_id=user_id).filter_by(folder_id=None)
@@ -424,10 +451,13 @@ class ChatTable:
 
             if not include_archived:
                 query = query.filter_by(archived=False)
+            if cursor:
+                query = query.filter(
+                    get_keyset_filter(Chat.updated_at, Chat.id, cursor)
+                )
 
-            query = query.order_by(Chat.updated_at.desc()).with_entities(
-                Chat.id, Chat.title, Chat.updated_at, Chat.created_at
-            )
+            query = query.order_by(Chat.updated_at.desc(), Chat.id.desc())
+            query = query.with_entities(*CHAT_TITLE_ID_COLUMNS)
 
             if skip:
                 query = query.offset(skip)
@@ -470,6 +500,37 @@ class ChatTable:
         except Exception:
             return None
 
+    def has_shared_chat_by_ids(self, ids: list[str]) -> bool:
+        with get_db() as db:
+            return db.query(
+                exists().where(Chat.id.in_(ids), Chat.share_id.isnot(None))
+            ).scalar()
+
+    def get_chats_with_inline_images(
+        self, after_id: Optional[str] = None, limit: int = 100
+    ) -> list[ChatModel]:
+        with get_db() as db:
+            query = db.query(Chat).filter(cast(Chat.chat, Text).like('%"data:image/%'))
+            if after_id:
+                query = query.filter(Chat.id > after_id)
+
+            all_chats = query.order_by(Chat.id).limit(limit).all()
+            return [ChatModel.model_validate(chat) for chat in all_chats]
+
+    def replace_chat_json_by_id(self, id: str, chat: dict, updated_at: int) -> bool:
+        """
+        Swaps the chat JSON without touching updated_at, unless the chat has
+        changed since it was read.
+        """
+        with get_db() as db:
+            result = (
+                db.query(Chat)
+                .filter_by(id=id, updated_at=updated_at)
+                .update({"chat": chat}, synchronize_session=False)
+            )
+            db.commit()
+            return result > 0
+
     def get_chat_by_share_id(self, id: str) -> Optional[ChatModel]:
         try:
             with get_db() as db:
@@ -510,14 +571,17 @@ class ChatTable:
             )
             return [ChatModel.model_validate(chat) for chat in all_chats]
 
-    def get_pinned_chats_by_user_id(self, user_id: str) -> list[ChatModel]:
+    def get_pinned_chats_by_user_id(self, user_id: str) -> list[ChatTitleIdResponse]:
         with get_db() as db:
             all_chats = (
                 db.query(Chat)
                 .filter_by(user_id=user_id, pinned=True, archived=False)
                 .order_by(Chat.updated_at.desc())
+                .with_entities(*CHAT_TITLE_ID_COLUMNS)
             )
-            return [ChatModel.model_validate(chat) for chat in all_chats]
+            return [
+                ChatTitleIdResponse.model_validate(chat._asdict()) for chat in all_chats
+            ]
 
     def get_archived_chats_by_user_id(self, user_id: str) -> list[ChatModel]:
         with get_db() as db:
@@ -535,7 +599,7 @@ class ChatTable:
         include_archived: bool = False,
         skip: int = 0,
         limit: int = 60,
-    ) -> list[ChatModel]:
+    ) -> list[ChatTitleIdResponse]:
         """
         Filters chats based on a search query using Python, allowing pagination using skip and limit.
         """
@@ -672,25 +736,35 @@ class ChatTable:
                 )
 
             # Perform pagination at the SQL level
-            all_chats = query.offset(skip).limit(limit).all()
+            all_chats = (
+                query.with_entities(*CHAT_TITLE_ID_COLUMNS)
+                .offset(skip)
+                .limit(limit)
+                .all()
+            )
 
             log.info(f"The number of chats: {len(all_chats)}")
 
             # Validate and return chats
-            return [ChatModel.model_validate(chat) for chat in all_chats]
+            return [
+                ChatTitleIdResponse.model_validate(chat._asdict()) for chat in all_chats
+            ]
 
     def get_chats_by_folder_id_and_user_id(
         self, folder_id: str, user_id: str
-    ) -> list[ChatModel]:
+    ) -> list[ChatTitleIdResponse]:
         with get_db() as db:
             query = db.query(Chat).filter_by(folder_id=folder_id, user_id=user_id)
             query = query.filter(or_(Chat.pinned == False, Chat.pinned == None))
             query = query.filter_by(archived=False)
 
             query = query.order_by(Chat.updated_at.desc())
+            query = query.with_entities(*CHAT_TITLE_ID_COLUMNS)
 
             all_chats = query.all()
-            return [ChatModel.model_validate(chat) for chat in all_chats]
+            return [
+                ChatTitleIdResponse.model_validate(chat._asdict()) for chat in all_chats
+            ]
 
     def get_chats_by_folder_ids_and_user_id(
         self, folder_ids: list[str], user_id: str
@@ -730,7 +804,7 @@ class ChatTable:
 
     def get_chat_list_by_user_id_and_tag_name(
         self, user_id: str, tag_name: str, skip: int = 0, limit: int = 50
-    ) -> list[ChatModel]:
+    ) -> list[ChatTitleIdResponse]:
         with get_db() as db:
             query = db.query(Chat).filter_by(user_id=user_id)
             tag_id = tag_name.replace(" ", "_").lower()
@@ -755,9 +829,11 @@ class ChatTable:
                     f"Unsupported dialect: {db.bind.dialect.name}"
                 )
 
-            all_chats = query.all()
+            all_chats = query.with_entities(*CHAT_TITLE_ID_COLUMNS).all()
             log.debug(f"all_chats: {all_chats}")
-            return [ChatModel.model_validate(chat) for chat in all_chats]
+            return [
+                ChatTitleIdResponse.model_validate(chat._asdict()) for chat in all_chats
+            ]
 
     def add_chat_tag_by_id_and_user_id_and_tag_name(
         self, id: str, user_id: str, tag_name: str
@@ -0,0 +1,278 @@
+import hashlib
+import logging
+import time
+from array import array
+from collections import defaultdict
+from typing import Optional
+
+from open_webui.internal.db import Base, engine, get_db
+from open_webui.env import SRC_LOG_LEVELS
+from pydantic import BaseModel
+from sqlalchemy import BigInteger, Column, Index, LargeBinary, Text, func
+from sqlalchemy.dialects import postgresql, sqlite
+
+log = logging.getLogger(__name__)
+log.setLevel(SRC_LOG_LEVELS["MODELS"])
+
+####################
+# Chunk DB Schema
+####################
+
+
+class Chunk(Base):
+    __tablename__ = "chunk"
+
+    # sha256 of the embedding config and the chunk text
+    id = Column(Text, primary_key=True)
+    embedding_config = Column(Text)
+
+    # float32 packed embedding vector
+    vector = Column(LargeBinary)
+    size = Column(BigInteger)
+
+    # Number of times the chunk is stored in a collection, the sum of its
+    # references. Chunks are deleted when it drops to zero.
+    ref_count = Column(BigInteger, default=0)
+
+    created_at = Column(BigInteger)
+    updated_at = Column(BigInteger)
+
+
+class ChunkReference(Base):
+    __tablename__ = "chunk_reference"
+
+    chunk_id = Column(Text, primary_key=True)
+    collection_name = Column(Text, primary_key=True)
+    file_id = Column(Text, primary_key=True)  # "" when not from a file
+    count = Column(BigInteger)
+
+    __table_args__ = (
+        Index(
+            "chunk_reference_collection_name_file_id_idx",
+            "collection_name",
+            "file_id",
+        ),
+    )
+
+
+class ChunkStatsResponse(BaseModel):
+    chunks: int
+    references: int
+    deduplicated: int
+    vector_bytes: int
+
+
+def calculate_chunk_hash(text: str, embedding_config: str) -> str:
+    return hashlib.sha256(f"{embedding_config}\n{text}".encode()).hexdigest()
+
+
+# Rows per INSERT, keeps statements under SQLite's bound parameter limit
+INSERT_BATCH_SIZE = 500
+
+
+# INSERT ... ON CONFLICT by dialect, so concurrent writers of a chunk don't
+# collide. Deduplication is turned off on databases without one.
+INSERTS = {"postgresql": postgresql.insert, "sqlite": sqlite.insert}
+
+
+def pack_vector(vector: list[float]) -> bytes:
+    return array("f", vector).tobytes()
+
+
+def unpack_vector(data: bytes) -> list[float]:
+    vector = array("f")
+    vector.frombytes(data)
+    return vector.tolist()
+
+
+class ChunksTable:
+    def __init__(self):
+        self.supported = None
+
+    def is_supported(self) -> bool:
+        if self.supported is None:
+            self.supported = engine.dialect.name in INSERTS
+            if not self.supported:
+                log.warning(
+                    f"Chunk deduplication is not supported on {engine.dialect.name}, "
+                    "chunks are embedded without it"
+                )
+        return self.supported
+
+    def get_vectors_by_ids(self, ids: list[str]) -> dict[str, list[float]]:
+        if not ids:
+            return {}
+
+        with get_db() as db:
+            try:
+                return {
+                    id: unpack_vector(vector)
+                    for id, vector in db.query(Chunk.id, Chunk.vector)
+                    .filter(Chunk.id.in_(set(ids)))
+                    .all()
+                }
+            except Exception as e:
+                log.exception(f"Error getting chunk vectors: {e}")
+                return {}
+
+    def upsert_chunks(
+        self,
+        embedding_config: str,
+        vectors: dict[str, list[float]],
+        references: dict[str, int],
+        collection_name: str,
+        file_id: str = "",
+    ) -> bool:
+        """
+        Records that the chunks in references were written to the collection
+        that many times, storing their vectors if they are new.
+        """
+        if not self.is_supported():
+            return False
+
+        with get_db() as db:
+            try:
+                insert = INSERTS[db.bind.dialect.name]
+                now = int(time.time())
+                ids = list(references)
+
+                for start in range(0, len(ids), INSERT_BATCH_SIZE):
+                    rows = []
+                    for id in ids[start : start + INSERT_BATCH_SIZE]:
+                        data = pack_vector(vectors[id])
+                        rows.append(
+                            {
+                                "id": id,
+                                "embedding_config": embedding_config,
+                                "vector": data,
+                                "size": len(data),
+                                "ref_count": references[id],
+                                "created_at": now,
+                                "updated_at": now,
+                            }
+                        )
+
+                    statement = insert(Chunk).values(rows)
+                    db.execute(
+                        statement.on_conflict_do_update(
+                            index_elements=[Chunk.id],
+                            set_={
+                                "ref_count": Chunk.ref_count
+                                + statement.excluded.ref_count,
+                                "updated_at": statement.excluded.updated_at,
+                            },
+                        )
+                    )
+
+                    statement = insert(ChunkReference).values(
+                        [
+                            {
+                                "chunk_id": row["id"],
+                                "collection_name": collection_name,
+                                "file_id": file_id,
+                                "count": row["ref_count"],
+                            }
+                            for row in rows
+                        ]
+                    )
+                    db.execute(
+                        statement.on_conflict_do_update(
+                            index_elements=[
+                                ChunkReference.chunk_id,
+                                ChunkReference.collection_name,
+                                ChunkReference.file_id,
+                            ],
+                            set_={
+                                "count": ChunkReference.count + statement.excluded.count
+                            },
+                        )
+                    )
+
+                db.commit()
+                return True
+            except Exception as e:
+                log.exception(f"Error saving chunk vectors: {e}")
+                db.rollback()
+                return False
+
+    def delete_references(
+        self, collection_name: str, file_id: Optional[str] = None
+    ) -> bool:
+        """
+        Releases the chunks written to the collection, or only those of one
+        file in it, and deletes the chunks no collection uses anymore.
+        """
+        with get_db() as db:
+            try:
+                query = db.query(ChunkReference).filter_by(
+                    collection_name=collection_name
+                )
+                if file_id is not None:
+                    query = query.filter_by(file_id=file_id)
+
+                counts = defaultdict(int)
+                for chunk_id, count in query.with_entities(
+                    ChunkReference.chunk_id, ChunkReference.count
+                ):
+                    counts[chunk_id] += count
+                if not counts:
+                    return True
+
+                query.delete(synchronize_session=False)
+
+                # One UPDATE per distinct count, most chunks are written once
+                chunk_ids_by_count = defaultdict(list)
+                for chunk_id, count in counts.items():
+                    chunk_ids_by_count[count].append(chunk_id)
+
+                for count, chunk_ids in chunk_ids_by_count.items():
+                    for start in range(0, len(chunk_ids), INSERT_BATCH_SIZE):
+                        db.query(Chunk).filter(
+                            Chunk.id.in_(chunk_ids[start : start + INSERT_BATCH_SIZE])
+                        ).update(
+                            {Chunk.ref_count: Chunk.ref_count - count},
+                            synchronize_session=False,
+                        )
+
+                chunk_ids = list(counts)
+                for start in range(0, len(chunk_ids), INSERT_BATCH_SIZE):
+                    db.query(Chunk).filter(
+                        Chunk.id.in_(chunk_ids[start : start + INSERT_BATCH_SIZE]),
+                        Chunk.ref_count <= 0,
+                    ).delete(synchronize_session=False)
+
+                db.commit()
+                return True
+            except Exception as e:
+                log.exception(f"Error releasing chunk references: {e}")
+                db.rollback()
+                return False
+
+    def get_stats(self) -> ChunkStatsResponse:
+        with get_db() as db:
+            chunks, references, vector_bytes = db.query(
+                func.count(Chunk.id),
+                func.coalesce(func.sum(Chunk.ref_count), 0),
+                func.coalesce(func.sum(Chunk.size), 0),
+            ).one()
+
+            return ChunkStatsResponse(
+                chunks=chunks,
+                references=references,
+                deduplicated=max(references - chunks, 0),
+                vector_bytes=vector_bytes,
+            )
+
+    def delete_all_chunks(self) -> bool:
+        with get_db() as db:
+            try:
+                db.query(ChunkReference).delete()
+                db.query(Chunk).delete()
+                db.commit()
+
+                return True
+            except Exception:
+                return False
+
+
+Chunks = ChunksTable()
@@ -2,10 +2,10 @@ import logging
 import time
 from typing import Optional
 
-from open_webui.internal.db import Base, JSONField, get_db
+from open_webui.internal.db import Base, JSONField, get_db, get_keyset_filter
 from open_webui.env import SRC_LOG_LEVELS
 from pydantic import BaseModel, ConfigDict
-from sqlalchemy import BigInteger, Column, String, Text, JSON
+from sqlalchemy import BigInteger, Column, Index, String, Text, JSON
 
 log = logging.getLogger(__name__)
 log.setLevel(SRC_LOG_LEVELS["MODELS"])
@@ -32,6 +32,8 @@ class File(Base):
     created_at = Column(BigInteger)
     updated_at = Column(BigInteger)
 
+    __table_args__ = (Index("file_user_id_idx", "user_id"),)
+
 
 class FileModel(BaseModel):
     model_config = ConfigDict(from_attributes=True)
@@ -97,6 +99,11 @@ class FileForm(BaseModel):
     access_control: Optional[dict] = None
 
 
+# Ids per IN (...) query, keeps lookups of many files under SQLite's bound
+# parameter limit
+ID_BATCH_SIZE = 500
+
+
 class FilesTable:
     def insert_new_file(self, user_id: str, form_data: FileForm) -> Optional[FileModel]:
         with get_db() as db:
@@ -143,9 +150,25 @@ class FilesTable:
             except Exception:
                 return None
 
-    def get_files(self) -> list[FileModel]:
+    def get_files(
+        self,
+        limit: Optional[int] = None,
+        cursor: Optional[tuple[int, str]] = None,
+    ) -> list[FileModel]:
         with get_db() as db:
-            return [FileModel.model_validate(file) for file in db.query(File).all()]
+            query = db.query(File)
+
+            # Pages are ordered newest first, a full listing keeps table order
+            if limit or cursor:
+                if cursor:
+                    query = query.filter(
+                        get_keyset_filter(File.created_at, File.id, cursor)
+                    )
+                query = query.order_by(File.created_at.desc(), File.id.desc())
+                if limit:
+                    query = query.limit(limit)
+
+            return [FileModel.model_validate(file) for file in query.all()]
 
     def get_files_by_ids(self, ids: list[str]) -> list[FileModel]:
         with get_db() as db:
@@ -158,26 +181,60 @@ class FilesTable:
             ]
 
     def get_file_metadatas_by_ids(self, ids: list[str]) -> list[FileMetadataResponse]:
+        ids = list(dict.fromkeys(ids))
+        files = []
         with get_db() as db:
-            return [
-                FileMetadataResponse(
-                    id=file.id,
-                    meta=file.meta,
-                    created_at=file.created_at,
-                    updated_at=file.updated_at,
+            for start in range(0, len(ids), ID_BATCH_SIZE):
+                files.extend(
+                    db.query(File.id, File.meta, File.created_at, File.updated_at)
+                    .filter(File.id.in_(ids[start : start + ID_BATCH_SIZE]))
+                    .all()
                 )
-                for file in db.query(File)
-                .filter(File.id.in_(ids))
-                .order_by(File.updated_at.desc())
-                .all()
-            ]
 
-    def get_files_by_user_id(self, user_id: str) -> list[FileModel]:
+        return [
+            FileMetadataResponse(
+                id=file.id,
+                meta=file.meta,
+                created_at=file.created_at,
+                updated_at=file.updated_at,
+            )
+            for file in sorted(
+                files, key=lambda file: file.updated_at or 0, reverse=True
+            )
+        ]
+
+    def get_existing_file_ids(self, ids: list[str]) -> set[str]:
+        ids = list(dict.fromkeys(ids))
+        existing_ids = set()
         with get_db() as db:
-            return [
-                FileModel.model_validate(file)
-                for file in db.query(File).filter_by(user_id=user_id).all()
-            ]
+            for start in range(0, len(ids), ID_BATCH_SIZE):
+                existing_ids.update(
+                    id
+                    for (id,) in db.query(File.id).filter(
+                        File.id.in_(ids[start : start + ID_BATCH_SIZE])
+                    )
+                )
+        return existing_ids
+
+    def get_files_by_user_id(
+        self,
+        user_id: str,
+        limit: Optional[int] = None,
+        cursor: Optional[tuple[int, str]] = None,
+    ) -> list[FileModel]:
+        with get_db() as db:
+            query = db.query(File).filter_by(user_id=user_id)
+
+            if limit or cursor:
+                if cursor:
+                    query = query.filter(
+                        get_keyset_filter(File.created_at, File.id, cursor)
+                    )
+                query = query.order_by(File.created_at.desc(), File.id.desc())
+                if limit:
+                    query = query.limit(limit)
+
+            return [FileModel.model_validate(file) for file in query.all()]
 
     def update_file_hash_by_id(self, id: str, hash: str) -> Optional[FileModel]:
         with get_db() as db:
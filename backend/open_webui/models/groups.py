@@ -11,7 +11,14 @@ from open_webui.models.files import FileMetadataResponse
 
 
 from pydantic import BaseModel, ConfigDict
-from sqlalchemy import BigInteger, Column, String, Text, JSON, func
+from sqlalchemy import (
+    BigInteger,
+    Column,
+    Index,
+    PrimaryKeyConstraint,
+    Text,
+    JSON,
+)
 
 
 log = logging.getLogger(__name__)
@@ -41,6 +48,20 @@ class Group(Base):
     updated_at = Column(BigInteger)
 
 
+class GroupMember(Base):
+    __tablename__ = "group_member"
+
+    # Normalized copy of Group.user_ids for membership lookups
+    group_id = Column(Text, nullable=False)
+    user_id = Column(Text, nullable=False)
+    created_at = Column(BigInteger)
+
+    __table_args__ = (
+        PrimaryKeyConstraint("group_id", "user_id", name="pk_group_id_user_id"),
+        Index("group_member_user_id_idx", "user_id"),
+    )
+
+
 class GroupModel(BaseModel):
     model_config = ConfigDict(from_attributes=True)
     id: str
@@ -88,6 +109,20 @@ class GroupUpdateForm(GroupForm):
 
 
 class GroupTable:
+    # Bumped on every membership or permission change so cached group
+    # lookups (see utils.access_control) know they are stale
+    version = 0
+
+    def _set_group_members(self, db, group_id: str, user_ids: list[str]):
+        db.query(GroupMember).filter_by(group_id=group_id).delete()
+        now = int(time.time())
+        db.add_all(
+            [
+                GroupMember(group_id=group_id, user_id=user_id, created_at=now)
+                for user_id in dict.fromkeys(user_ids)
+            ]
+        )
+
     def insert_new_group(
         self, user_id: str, form_data: GroupForm
     ) -> Optional[GroupModel]:
@@ -105,7 +140,9 @@ class GroupTable:
             try:
                 result = Group(**group.model_dump())
                 db.add(result)
+                self._set_group_members(db, result.id, group.user_ids)
                 db.commit()
+                self.version += 1
                 db.refresh(result)
                 if result:
                     return GroupModel.model_validate(result)
@@ -127,12 +164,8 @@ class GroupTable:
             return [
                 GroupModel.model_validate(group)
                 for group in db.query(Group)
-                .filter(
-                    func.json_array_length(Group.user_ids) > 0
-                )  # Ensure array exists
-                .filter(
-                    Group.user_ids.cast(String).like(f'%"{user_id}"%')
-                )  # String-based check
+                .join(GroupMember, GroupMember.group_id == Group.id)
+                .filter(GroupMember.user_id == user_id)
                 .order_by(Group.updated_at.desc())
                 .all()
             ]
@@ -163,7 +196,10 @@ class GroupTable:
                         "updated_at": int(time.time()),
                     }
                 )
+                if form_data.user_ids is not None:
+                    self._set_group_members(db, id, form_data.user_ids)
                 db.commit()
+                self.version += 1
                 return self.get_group_by_id(id=id)
         except Exception as e:
             log.exception(e)
@@ -173,7 +209,9 @@ class GroupTable:
         try:
             with get_db() as db:
                 db.query(Group).filter_by(id=id).delete()
+                db.query(GroupMember).filter_by(group_id=id).delete()
                 db.commit()
+                self.version += 1
                 return True
         except Exception:
             return False
@@ -182,7 +220,9 @@ class GroupTable:
         with get_db() as db:
             try:
                 db.query(Group).delete()
+                db.query(GroupMember).delete()
                 db.commit()
+                self.version += 1
 
                 return True
             except Exception:
@@ -201,7 +241,9 @@ class GroupTable:
                             "updated_at": int(time.time()),
                         }
                     )
-                    db.commit()
+                db.query(GroupMember).filter_by(user_id=user_id).delete()
+                db.commit()
+                self.version += 1
 
                 return True
             except Exception:
@@ -8,13 +8,13 @@ from open_webui.internal.db import Base, get_db
 from open_webui.env import SRC_LOG_LEVELS
 
 from open_webui.models.files import FileMetadataResponse
-from open_webui.models.users import Users, UserResponse
+from open_webui.models.users import User, UserModel, UserResponse
 
 
 from pydantic import BaseModel, ConfigDict
 from sqlalchemy import BigInteger, Column, String, Text, JSON
 
-from open_webui.utils.access_control import has_access
+from open_webui.utils.access_control import has_access, get_access_control_filter
 
 log = logging.getLogger(__name__)
 log.setLevel(SRC_LOG_LEVELS["MODELS"])
@@ -126,18 +126,25 @@ class KnowledgeTable:
             except Exception:
                 return None
 
-    def get_knowledge_bases(self) -> list[KnowledgeUserModel]:
+    def get_knowledge_bases(self, filter=None) -> list[KnowledgeUserModel]:
         with get_db() as db:
+            query = db.query(Knowledge, User).outerjoin(
+                User, User.id == Knowledge.user_id
+            )
+            if filter is not None:
+                query = query.filter(filter)
+
             knowledge_bases = []
-            for knowledge in (
-                db.query(Knowledge).order_by(Knowledge.updated_at.desc()).all()
-            ):
-                user = Users.get_user_by_id(knowledge.user_id)
+            for knowledge, user in query.order_by(Knowledge.updated_at.desc()).all():
                 knowledge_bases.append(
                     KnowledgeUserModel.model_validate(
                         {
                             **KnowledgeModel.model_validate(knowledge).model_dump(),
-                            "user": user.model_dump() if user else None,
+                            "user": (
+                                UserModel.model_validate(user).model_dump()
+                                if user
+                                else None
+                            ),
                         }
                     )
                 )
@@ -146,7 +153,11 @@ class KnowledgeTable:
     def get_knowledge_bases_by_user_id(
         self, user_id: str, permission: str = "write"
     ) -> list[KnowledgeUserModel]:
-        knowledge_bases = self.get_knowledge_bases()
+        knowledge_bases = self.get_knowledge_bases(
+            get_access_control_filter(
+                Knowledge.access_control, Knowledge.user_id, user_id, permission
+            )
+        )
         return [
             knowledge_base
             for knowledge_base in knowledge_bases
@@ -154,6 +165,13 @@ class KnowledgeTable:
             or has_access(user_id, permission, knowledge_base.access_control)
         ]
 
+    def get_knowledge_by_ids(self, ids: list[str]) -> list[KnowledgeModel]:
+        with get_db() as db:
+            return [
+                KnowledgeModel.model_validate(knowledge)
+                for knowledge in db.query(Knowledge).filter(Knowledge.id.in_(ids)).all()
+            ]
+
     def get_knowledge_by_id(self, id: str) -> Optional[KnowledgeModel]:
         try:
             with get_db() as db:
@@ -4,7 +4,7 @@ from typing import Optional
 
 from open_webui.internal.db import Base, get_db
 from pydantic import BaseModel, ConfigDict
-from sqlalchemy import BigInteger, Column, String, Text
+from sqlalchemy import BigInteger, Column, Index, String, Text
 
 ####################
 # Memory DB Schema
@@ -20,6 +20,8 @@ class Memory(Base):
     updated_at = Column(BigInteger)
     created_at = Column(BigInteger)
 
+    __table_args__ = (Index("memory_user_id_idx", "user_id"),)
+
 
 class MemoryModel(BaseModel):
     id: str
@@ -3,12 +3,12 @@ import time
 import uuid
 from typing import Optional
 
-from open_webui.internal.db import Base, get_db
+from open_webui.internal.db import Base, get_db, get_keyset_filter
 from open_webui.models.tags import TagModel, Tag, Tags
 
 
 from pydantic import BaseModel, ConfigDict
-from sqlalchemy import BigInteger, Boolean, Column, String, Text, JSON
+from sqlalchemy import BigInteger, Boolean, Column, Index, String, Text, JSON
 from sqlalchemy import or_, func, select, and_, text
 from sqlalchemy.sql import exists
 
@@ -25,6 +25,8 @@ class MessageReaction(Base):
     name = Column(Text)
     created_at = Column(BigInteger)
 
+    __table_args__ = (Index("message_reaction_message_id_idx", "message_id"),)
+
 
 class MessageReactionModel(BaseModel):
     model_config = ConfigDict(from_attributes=True)
@@ -52,6 +54,16 @@ class Message(Base):
     created_at = Column(BigInteger)  # time_ns
     updated_at = Column(BigInteger)  # time_ns
 
+    __table_args__ = (
+        Index(
+            "message_channel_id_parent_id_created_at_idx",
+            "channel_id",
+            "parent_id",
+            "created_at",
+        ),
+        Index("message_parent_id_created_at_idx", "parent_id", "created_at"),
+    )
+
 
 class MessageModel(BaseModel):
     model_config = ConfigDict(from_attributes=True)
@@ -92,6 +104,8 @@ class MessageResponse(MessageModel):
     latest_reply_at: Optional[int]
     reply_count: int
     reactions: list[Reactions]
+    # Pagination cursor of the message, see utils.misc.get_cursor
+    cursor: Optional[str] = None
 
 
 class MessageTable:
@@ -158,13 +172,21 @@ class MessageTable:
             ]
 
     def get_messages_by_channel_id(
-        self, channel_id: str, skip: int = 0, limit: int = 50
+        self,
+        channel_id: str,
+        skip: int = 0,
+        limit: int = 50,
+        cursor: Optional[tuple[int, str]] = None,
     ) -> list[MessageModel]:
         with get_db() as db:
+            query = db.query(Message).filter_by(channel_id=channel_id, parent_id=None)
+            if cursor:
+                query = query.filter(
+                    get_keyset_filter(Message.created_at, Message.id, cursor)
+                )
+
             all_messages = (
-                db.query(Message)
-                .filter_by(channel_id=channel_id, parent_id=None)
-                .order_by(Message.created_at.desc())
+                query.order_by(Message.created_at.desc(), Message.id.desc())
                 .offset(skip)
                 .limit(limit)
                 .all()
@@ -172,7 +194,12 @@ class MessageTable:
             return [MessageModel.model_validate(message) for message in all_messages]
 
     def get_messages_by_parent_id(
-        self, channel_id: str, parent_id: str, skip: int = 0, limit: int = 50
+        self,
+        channel_id: str,
+        parent_id: str,
+        skip: int = 0,
+        limit: int = 50,
+        cursor: Optional[tuple[int, str]] = None,
     ) -> list[MessageModel]:
         with get_db() as db:
             message = db.get(Message, parent_id)
@@ -180,10 +207,16 @@ class MessageTable:
             if not message:
                 return []
 
+            query = db.query(Message).filter_by(
+                channel_id=channel_id, parent_id=parent_id
+            )
+            if cursor:
+                query = query.filter(
+                    get_keyset_filter(Message.created_at, Message.id, cursor)
+                )
+
             all_messages = (
-                db.query(Message)
-                .filter_by(channel_id=channel_id, parent_id=parent_id)
-                .order_by(Message.created_at.desc())
+                query.order_by(Message.created_at.desc(), Message.id.desc())
                 .offset(skip)
                 .limit(limit)
                 .all()
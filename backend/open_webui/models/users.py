@@ -1,7 +1,7 @@
 import time
 from typing import Optional
 
-from open_webui.internal.db import Base, JSONField, get_db
+from open_webui.internal.db import Base, JSONField, get_db, get_keyset_filter
 
 
 from open_webui.models.chats import Chats
@@ -160,11 +160,19 @@ class UsersTable:
             return None
 
     def get_users(
-        self, skip: Optional[int] = None, limit: Optional[int] = None
+        self,
+        skip: Optional[int] = None,
+        limit: Optional[int] = None,
+        cursor: Optional[tuple[int, str]] = None,
     ) -> list[UserModel]:
         with get_db() as db:
 
-            query = db.query(User).order_by(User.created_at.desc())
+            query = db.query(User)
+            if cursor:
+                query = query.filter(
+                    get_keyset_filter(User.created_at, User.id, cursor)
+                )
+            query = query.order_by(User.created_at.desc(), User.id.desc())
 
             if skip:
                 query = query.offset(skip)
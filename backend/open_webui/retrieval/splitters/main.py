@@ -0,0 +1,249 @@
+import logging
+import re
+from abc import ABC, abstractmethod
+from collections import deque
+from datetime import datetime
+from functools import lru_cache
+from typing import Callable, Iterable, Iterator, Optional
+
+import tiktoken
+from langchain_core.documents import Document
+
+from open_webui.constants import ERROR_MESSAGES
+from open_webui.env import SRC_LOG_LEVELS
+
+log = logging.getLogger(__name__)
+log.setLevel(SRC_LOG_LEVELS["RAG"])
+
+
+DEFAULT_SEPARATORS = ["\n\n", "\n", " ", ""]
+
+
+@lru_cache(maxsize=8)
+def get_encoding(encoding_name: str):
+    # A single encoder per encoding name is shared across requests
+    return tiktoken.get_encoding(encoding_name)
+
+
+def sanitize_metadata(metadata: dict) -> dict:
+    # ChromaDB does not like datetime formats
+    # for meta-data so convert them to string.
+    return {
+        key: (str(value) if isinstance(value, (datetime, list, dict)) else value)
+        for key, value in metadata.items()
+    }
+
+
+class TextSplitter(ABC):
+    """
+    Base class for the native text splitters.
+
+    Splitting is lazy: `split_documents` yields chunks as they are produced so
+    callers can start embedding before the whole document has been split.
+    Chunk metadata is built once per source document and only shallow-copied
+    per chunk to attach its `start_index`.
+    """
+
+    def __init__(
+        self,
+        chunk_size: int = 1000,
+        chunk_overlap: int = 100,
+        add_start_index: bool = True,
+        strip_whitespace: bool = True,
+        length_function: Callable[[str], int] = len,
+    ):
+        if chunk_overlap > chunk_size:
+            raise ValueError(
+                f"Got a larger chunk overlap ({chunk_overlap}) than chunk size "
+                f"({chunk_size}), should be smaller."
+            )
+
+        self.chunk_size = chunk_size
+        self.chunk_overlap = chunk_overlap
+        self.add_start_index = add_start_index
+        self.strip_whitespace = strip_whitespace
+        self.length_function = length_function
+
+    @abstractmethod
+    def split_text(self, text: str) -> Iterator[str]:
+        """Yields the chunks of text in order."""
+
+    def split_documents(
+        self,
+        docs: Iterable[Document],
+        metadata_fn: Optional[Callable[[dict], dict]] = None,
+    ) -> Iterator[Document]:
+        for doc in docs:
+            metadata = doc.metadata or {}
+            if metadata_fn:
+                metadata = metadata_fn(metadata)
+
+            text = doc.page_content
+            index = 0
+            previous_chunk_len = 0
+            for chunk in self.split_text(text):
+                if self.add_start_index:
+                    offset = index + previous_chunk_len - self.chunk_overlap
+                    index = text.find(chunk, max(0, offset))
+                    previous_chunk_len = len(chunk)
+                    yield Document(
+                        page_content=chunk,
+                        metadata={**metadata, "start_index": index},
+                    )
+                else:
+                    yield Document(page_content=chunk, metadata=metadata)
+
+    def _join(self, splits: list[str], separator: str) -> Optional[str]:
+        text = separator.join(splits)
+        if self.strip_whitespace:
+            text = text.strip()
+        return text if text != "" else None
+
+    def _merge_splits(self, splits: Iterable[str], separator: str) -> Iterator[str]:
+        # Combine small splits into chunks of at most chunk_size, carrying
+        # chunk_overlap worth of trailing splits into the next chunk.
+        separator_len = self.length_function(separator)
+
+        current = deque()
+        lengths = deque()
+        total = 0
+        for split in splits:
+            split_len = self.length_function(split)
+            if total + split_len + (separator_len if current else 0) > self.chunk_size:
+                if total > self.chunk_size:
+                    log.warning(
+                        f"Created a chunk of size {total}, which is longer than the specified {self.chunk_size}"
+                    )
+                if current:
+                    chunk = self._join(current, separator)
+                    if chunk is not None:
+                        yield chunk
+
+                    while total > self.chunk_overlap or (
+                        total + split_len + (separator_len if current else 0)
+                        > self.chunk_size
+                        and total > 0
+                    ):
+                        total -= lengths[0] + (separator_len if len(current) > 1 else 0)
+                        current.popleft()
+                        lengths.popleft()
+
+            current.append(split)
+            lengths.append(split_len)
+            total += split_len + (separator_len if len(current) > 1 else 0)
+
+        chunk = self._join(current, separator)
+        if chunk is not None:
+            yield chunk
+
+
+class RecursiveCharacterSplitter(TextSplitter):
+    """
+    Splits text on the first separator present in it, recursing into pieces
+    that are still larger than chunk_size with the remaining separators.
+
+    Produces the same chunks as langchain's RecursiveCharacterTextSplitter
+    (keep_separator=True), without materializing the full chunk list.
+    """
+
+    def __init__(self, separators: Optional[list[str]] = None, **kwargs):
+        super().__init__(**kwargs)
+        self.separators = separators or DEFAULT_SEPARATORS
+        self._patterns = {
+            separator: re.compile(f"({re.escape(separator)})")
+            for separator in self.separators
+            if separator
+        }
+
+    def _split_with_separator(self, text: str, separator: str) -> list[str]:
+        if not separator:
+            return list(text)
+
+        # Keep the separator attached to the start of the following split
+        parts = self._patterns[separator].split(text)
+        splits = [parts[0]] + [
+            parts[i] + parts[i + 1] for i in range(1, len(parts) - 1, 2)
+        ]
+        return [split for split in splits if split != ""]
+
+    def split_text(self, text: str) -> Iterator[str]:
+        yield from self._split_text(text, self.separators)
+
+    def _split_text(self, text: str, separators: list[str]) -> Iterator[str]:
+        separator = separators[-1]
+        remaining = []
+        for i, candidate in enumerate(separators):
+            if candidate == "":
+                separator = candidate
+                break
+            if candidate in text:
+                separator = candidate
+                remaining = separators[i + 1 :]
+                break
+
+        good_splits = []
+        for split in self._split_with_separator(text, separator):
+            if self.length_function(split) < self.chunk_size:
+                good_splits.append(split)
+                continue
+
+            if good_splits:
+                yield from self._merge_splits(good_splits, "")
+                good_splits = []
+
+            if remaining:
+                yield from self._split_text(split, remaining)
+            else:
+                yield split
+
+        if good_splits:
+            yield from self._merge_splits(good_splits, "")
+
+
+class TokenSplitter(TextSplitter):
+    """
+    Splits text into windows of chunk_size tokens overlapping by chunk_overlap
+    tokens, encoding the text only once with a shared tiktoken encoder.
+    """
+
+    def __init__(self, encoding_name: str = "cl100k_base", **kwargs):
+        super().__init__(**kwargs)
+        self.encoding = get_encoding(encoding_name)
+
+    def split_text(self, text: str) -> Iterator[str]:
+        input_ids = self.encoding.encode(
+            text, allowed_special=set(), disallowed_special="all"
+        )
+
+        step = self.chunk_size - self.chunk_overlap
+        start_idx = 0
+        while start_idx < len(input_ids):
+            end_idx = min(start_idx + self.chunk_size, len(input_ids))
+            yield self.encoding.decode(input_ids[start_idx:end_idx])
+            if end_idx == len(input_ids) or step <= 0:
+                break
+            start_idx += step
+
+
+def get_text_splitter(
+    splitter: str,
+    chunk_size: int,
+    chunk_overlap: int,
+    encoding_name: Optional[str] = None,
+) -> TextSplitter:
+    if splitter in ["", "character"]:
+        return RecursiveCharacterSplitter(
+            chunk_size=chunk_size,
+            chunk_overlap=chunk_overlap,
+            add_start_index=True,
+        )
+    elif splitter == "token":
+        log.info(f"Using token text splitter: {encoding_name}")
+        return TokenSplitter(
+            encoding_name=str(encoding_name),
+            chunk_size=chunk_size,
+            chunk_overlap=chunk_overlap,
+            add_start_index=True,
+        )
+    else:
+        raise ValueError(ERROR_MESSAGES.DEFAULT("Invalid text splitter"))
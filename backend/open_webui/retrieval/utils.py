@@ -259,24 +259,38 @@ def query_collection(
     embedding_function,
     k: int,
 ) -> dict:
+    collection_names = [name for name in collection_names if name]
+    if not collection_names or not queries:
+        return merge_and_sort_query_results([], k=k)
+
+    log.debug(f"query_collection:queries {queries}")
+    query_embeddings = embedding_function(
+        list(queries), prefix=RAG_EMBEDDING_QUERY_PREFIX
+    )
+
+    # One batched round trip for every query x collection pair
+    try:
+        collection_results = VECTOR_DB_CLIENT.search_many(
+            collection_names=collection_names,
+            vectors=query_embeddings,
+            limit=k,
+        )
+    except Exception as e:
+        log.exception(f"Error when querying the collections: {e}")
+        collection_results = {}
+
     results = []
-    for query in queries:
-        log.debug(f"query_collection:query {query}")
-        query_embedding = embedding_function(query, prefix=RAG_EMBEDDING_QUERY_PREFIX)
-        for collection_name in collection_names:
-            if collection_name:
-                try:
-                    result = query_doc(
-                        collection_name=collection_name,
-                        k=k,
-                        query_embedding=query_embedding,
-                    )
-                    if result is not None:
-                        results.append(result.model_dump())
-                except Exception as e:
-                    log.exception(f"Error when querying the collection: {e}")
-            else:
-                pass
+    for collection_name, result in collection_results.items():
+        log.info(f"query_collection:result {collection_name} {result.ids}")
+        for idx in range(len(result.ids)):
+            results.append(
+                {
+                    "ids": [result.ids[idx]],
+                    "distances": [result.distances[idx]],
+                    "documents": [result.documents[idx]],
+                    "metadatas": [result.metadatas[idx]],
+                }
+            )
 
     return merge_and_sort_query_results(results, k=k)
 
@@ -5,7 +5,12 @@ from chromadb.utils.batch_utils import create_batches
 
 from typing import Optional
 
-from open_webui.retrieval.vector.main import VectorItem, SearchResult, GetResult
+from open_webui.retrieval.vector.main import (
+    VectorDBBase,
+    VectorItem,
+    SearchResult,
+    GetResult,
+)
 from open_webui.config import (
     CHROMA_DATA_PATH,
     CHROMA_HTTP_HOST,
@@ -23,7 +28,7 @@ log = logging.getLogger(__name__)
 log.setLevel(SRC_LOG_LEVELS["RAG"])
 
 
-class ChromaClient:
+class ChromaClient(VectorDBBase):
     def __init__(self):
         settings_dict = {
             "allow_reset": True,
@@ -75,24 +80,48 @@ class ChromaClient:
                     n_results=limit,
                 )
 
-                # chromadb has cosine distance, 2 (worst) -> 0 (best). Re-odering to 0 -> 1
-                # https://docs.trychroma.com/docs/collections/configure cosine equation
-                distances: list = result["distances"][0]
-                distances = [2 - dist for dist in distances]
-                distances = [[dist / 2 for dist in distances]]
-
-                return SearchResult(
-                    **{
-                        "ids": result["ids"],
-                        "distances": distances,
-                        "documents": result["documents"],
-                        "metadatas": result["metadatas"],
-                    }
-                )
+                return self._result_to_search_result(result)
             return None
         except Exception as e:
             return None
 
+    def search_many(
+        self,
+        collection_names: list[str],
+        vectors: list[list[float | int]],
+        limit: int,
+    ) -> dict[str, SearchResult]:
+        # Chroma collections are queried separately, but every query vector
+        # is sent in the same request
+        results = {}
+        for collection_name in collection_names:
+            try:
+                collection = self.client.get_collection(name=collection_name)
+                result = collection.query(
+                    query_embeddings=vectors,
+                    n_results=limit,
+                )
+                results[collection_name] = self._result_to_search_result(result)
+            except Exception as e:
+                log.debug(f"Error searching collection {collection_name}: {e}")
+        return results
+
+    def _result_to_search_result(self, result) -> SearchResult:
+        # chromadb has cosine distance, 2 (worst) -> 0 (best). Re-odering to 0 -> 1
+        # https://docs.trychroma.com/docs/collections/configure cosine equation
+        distances = [
+            [(2 - dist) / 2 for dist in distances] for distances in result["distances"]
+        ]
+
+        return SearchResult(
+            **{
+                "ids": result["ids"],
+                "distances": distances,
+                "documents": result["documents"],
+                "metadatas": result["metadatas"],
+            }
+        )
+
     def query(
         self, collection_name: str, filter: dict, limit: Optional[int] = None
     ) -> Optional[GetResult]:
@@ -161,9 +190,14 @@ class ChromaClient:
         embeddings = [item["vector"] for item in items]
         metadatas = [item["metadata"] for item in items]
 
-        collection.upsert(
-            ids=ids, documents=documents, embeddings=embeddings, metadatas=metadatas
-        )
+        for batch in create_batches(
+            api=self.client,
+            documents=documents,
+            embeddings=embeddings,
+            ids=ids,
+            metadatas=metadatas,
+        ):
+            collection.upsert(*batch)
 
     def delete(
         self,
@@ -2,7 +2,12 @@ from elasticsearch import Elasticsearch, BadRequestError
 from typing import Optional
 import ssl
 from elasticsearch.helpers import bulk, scan
-from open_webui.retrieval.vector.main import VectorItem, SearchResult, GetResult
+from open_webui.retrieval.vector.main import (
+    VectorDBBase,
+    VectorItem,
+    SearchResult,
+    GetResult,
+)
 from open_webui.config import (
     ELASTICSEARCH_URL,
     ELASTICSEARCH_CA_CERTS,
@@ -12,10 +17,11 @@ from open_webui.config import (
     ELASTICSEARCH_CLOUD_ID,
     ELASTICSEARCH_INDEX_PREFIX,
     SSL_ASSERT_FINGERPRINT,
+    VECTOR_DB_BATCH_SIZE,
 )
 
 
-class ElasticsearchClient:
+class ElasticsearchClient(VectorDBBase):
     """
     Important:
     in order to reduce the number of indexes and since the embedding vector length is fixed, we avoid creating
@@ -122,7 +128,7 @@ class ElasticsearchClient:
 
     # Status: works
 
-    def _create_batches(self, items: list[VectorItem], batch_size=100):
+    def _create_batches(self, items: list[VectorItem], batch_size=VECTOR_DB_BATCH_SIZE):
         for i in range(0, len(items), batch_size):
             yield items[i : min(i + batch_size, len(items))]
 
@@ -144,11 +150,8 @@ class ElasticsearchClient:
         query = {"query": {"term": {"collection": collection_name}}}
         self.client.delete_by_query(index=f"{self.index_prefix}*", body=query)
 
-    # Status: works
-    def search(
-        self, collection_name: str, vectors: list[list[float]], limit: int
-    ) -> Optional[SearchResult]:
-        query = {
+    def _search_body(self, collection_name: str, vector: list[float], limit: int):
+        return {
             "size": limit,
             "_source": ["text", "metadata"],
             "query": {
@@ -158,20 +161,69 @@ class ElasticsearchClient:
                     },
                     "script": {
                         "source": "cosineSimilarity(params.vector, 'vector') + 1.0",
-                        "params": {
-                            "vector": vectors[0]
-                        },  # Assuming single query vector
+                        "params": {"vector": vector},
                     },
                 }
             },
         }
 
+    # Status: works
+    def search(
+        self, collection_name: str, vectors: list[list[float]], limit: int
+    ) -> Optional[SearchResult]:
+        query = self._search_body(
+            collection_name, vectors[0], limit
+        )  # Assuming single query vector
+
         result = self.client.search(
             index=self._get_index_name(len(vectors[0])), body=query
         )
 
         return self._result_to_search_result(result)
 
+    def search_many(
+        self,
+        collection_names: list[str],
+        vectors: list[list[float]],
+        limit: int,
+    ) -> dict[str, SearchResult]:
+        # All collections of the same dimension share an index, so every
+        # (collection, vector) pair goes out in a single msearch request
+        if not collection_names or not vectors:
+            return {}
+
+        index = self._get_index_name(len(vectors[0]))
+        searches = []
+        for collection_name in collection_names:
+            for vector in vectors:
+                searches.append({"index": index})
+                searches.append(self._search_body(collection_name, vector, limit))
+
+        responses = iter(self.client.msearch(searches=searches)["responses"])
+
+        results = {}
+        for collection_name in collection_names:
+            ids, distances, documents, metadatas = [], [], [], []
+            for _ in vectors:
+                response = next(responses)
+                if "error" in response:
+                    response = {"hits": {"hits": []}}
+
+                result = self._result_to_search_result(response)
+                ids.extend(result.ids)
+                distances.extend(result.distances)
+                documents.extend(result.documents)
+                metadatas.extend(result.metadatas)
+
+            if any(ids):
+                results[collection_name] = SearchResult(
+                    ids=ids,
+                    distances=distances,
+                    documents=documents,
+                    metadatas=metadatas,
+                )
+        return results
+
     # Status: only tested halfwat
     def query(
         self, collection_name: str, filter: dict, limit: Optional[int] = None
@@ -243,7 +295,7 @@ class ElasticsearchClient:
                 }
                 for item in batch
             ]
-            bulk(self.client, actions)
+            bulk(self.client, actions, chunk_size=len(actions))
 
     # Upsert documents using the update API with doc_as_upsert=True.
     def upsert(self, collection_name: str, items: list[VectorItem]):
@@ -265,7 +317,7 @@ class ElasticsearchClient:
                 }
                 for item in batch
             ]
-            bulk(self.client, actions)
+            bulk(self.client, actions, chunk_size=len(actions))
 
     # Delete specific documents from a collection by filtering on both collection and document IDs.
     def delete(
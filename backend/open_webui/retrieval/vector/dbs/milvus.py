@@ -4,11 +4,17 @@ import json
 import logging
 from typing import Optional
 
-from open_webui.retrieval.vector.main import VectorItem, SearchResult, GetResult
+from open_webui.retrieval.vector.main import (
+    VectorDBBase,
+    VectorItem,
+    SearchResult,
+    GetResult,
+)
 from open_webui.config import (
     MILVUS_URI,
     MILVUS_DB,
     MILVUS_TOKEN,
+    VECTOR_DB_BATCH_SIZE,
 )
 from open_webui.env import SRC_LOG_LEVELS
 
@@ -16,7 +22,7 @@ log = logging.getLogger(__name__)
 log.setLevel(SRC_LOG_LEVELS["RAG"])
 
 
-class MilvusClient:
+class MilvusClient(VectorDBBase):
     def __init__(self):
         self.collection_prefix = "open_webui"
         if MILVUS_TOKEN is None:
@@ -229,18 +235,19 @@ class MilvusClient:
                 collection_name=collection_name, dimension=len(items[0]["vector"])
             )
 
-        return self.client.insert(
-            collection_name=f"{self.collection_prefix}_{collection_name}",
-            data=[
-                {
-                    "id": item["id"],
-                    "vector": item["vector"],
-                    "data": {"text": item["text"]},
-                    "metadata": item["metadata"],
-                }
-                for item in items
-            ],
-        )
+        for i in range(0, len(items), VECTOR_DB_BATCH_SIZE):
+            self.client.insert(
+                collection_name=f"{self.collection_prefix}_{collection_name}",
+                data=[
+                    {
+                        "id": item["id"],
+                        "vector": item["vector"],
+                        "data": {"text": item["text"]},
+                        "metadata": item["metadata"],
+                    }
+                    for item in items[i : i + VECTOR_DB_BATCH_SIZE]
+                ],
+            )
 
     def upsert(self, collection_name: str, items: list[VectorItem]):
         # Update the items in the collection, if the items are not present, insert them. If the collection does not exist, it will be created.
@@ -252,18 +259,19 @@ class MilvusClient:
                 collection_name=collection_name, dimension=len(items[0]["vector"])
             )
 
-        return self.client.upsert(
-            collection_name=f"{self.collection_prefix}_{collection_name}",
-            data=[
-                {
-                    "id": item["id"],
-                    "vector": item["vector"],
-                    "data": {"text": item["text"]},
-                    "metadata": item["metadata"],
-                }
-                for item in items
-            ],
-        )
+        for i in range(0, len(items), VECTOR_DB_BATCH_SIZE):
+            self.client.upsert(
+                collection_name=f"{self.collection_prefix}_{collection_name}",
+                data=[
+                    {
+                        "id": item["id"],
+                        "vector": item["vector"],
+                        "data": {"text": item["text"]},
+                        "metadata": item["metadata"],
+                    }
+                    for item in items[i : i + VECTOR_DB_BATCH_SIZE]
+                ],
+            )
 
     def delete(
         self,
@@ -2,17 +2,23 @@ from opensearchpy import OpenSearch
 from opensearchpy.helpers import bulk
 from typing import Optional
 
-from open_webui.retrieval.vector.main import VectorItem, SearchResult, GetResult
+from open_webui.retrieval.vector.main import (
+    VectorDBBase,
+    VectorItem,
+    SearchResult,
+    GetResult,
+)
 from open_webui.config import (
     OPENSEARCH_URI,
     OPENSEARCH_SSL,
     OPENSEARCH_CERT_VERIFY,
     OPENSEARCH_USERNAME,
     OPENSEARCH_PASSWORD,
+    VECTOR_DB_BATCH_SIZE,
 )
 
 
-class OpenSearchClient:
+class OpenSearchClient(VectorDBBase):
     def __init__(self):
         self.index_prefix = "open_webui"
         self.client = OpenSearch(
@@ -62,6 +68,24 @@ class OpenSearchClient:
             metadatas=[metadatas],
         )
 
+    def _search_body(self, vector: list[float | int], limit: int) -> dict:
+        return {
+            "size": limit,
+            "_source": ["text", "metadata"],
+            "query": {
+                "script_score": {
+                    "query": {"match_all": {}},
+                    "script": {
+                        "source": "(cosineSimilarity(params.query_value, doc[params.field]) + 1.0) / 2.0",
+                        "params": {
+                            "field": "vector",
+                            "query_value": vector,
+                        },
+                    },
+                }
+            },
+        }
+
     def _create_index(self, collection_name: str, dimension: int):
         body = {
             "settings": {"index": {"knn": True}},
@@ -92,7 +116,7 @@ class OpenSearchClient:
             index=self._get_index_name(collection_name), body=body
         )
 
-    def _create_batches(self, items: list[VectorItem], batch_size=100):
+    def _create_batches(self, items: list[VectorItem], batch_size=VECTOR_DB_BATCH_SIZE):
         for i in range(0, len(items), batch_size):
             yield items[i : i + batch_size]
 
@@ -113,22 +137,7 @@ class OpenSearchClient:
             if not self.has_collection(collection_name):
                 return None
 
-            query = {
-                "size": limit,
-                "_source": ["text", "metadata"],
-                "query": {
-                    "script_score": {
-                        "query": {"match_all": {}},
-                        "script": {
-                            "source": "(cosineSimilarity(params.query_value, doc[params.field]) + 1.0) / 2.0",
-                            "params": {
-                                "field": "vector",
-                                "query_value": vectors[0],
-                            },  # Assuming single query vector
-                        },
-                    }
-                },
-            }
+            query = self._search_body(vectors[0], limit)  # Assuming single query vector
 
             result = self.client.search(
                 index=self._get_index_name(collection_name), body=query
@@ -139,6 +148,53 @@ class OpenSearchClient:
         except Exception as e:
             return None
 
+    def search_many(
+        self,
+        collection_names: list[str],
+        vectors: list[list[float | int]],
+        limit: int,
+    ) -> dict[str, SearchResult]:
+        # Every (collection, vector) pair goes out in a single msearch request,
+        # collections without an index come back as per-search errors
+        if not collection_names or not vectors:
+            return {}
+
+        body = []
+        for collection_name in collection_names:
+            for vector in vectors:
+                body.append({"index": self._get_index_name(collection_name)})
+                body.append(self._search_body(vector, limit))
+
+        try:
+            responses = iter(self.client.msearch(body=body)["responses"])
+        except Exception as e:
+            return {}
+
+        results = {}
+        for collection_name in collection_names:
+            ids, distances, documents, metadatas = [], [], [], []
+            for _ in vectors:
+                response = next(responses)
+                result = (
+                    self._result_to_search_result(response)
+                    if "error" not in response
+                    else None
+                )
+
+                ids.append(result.ids[0] if result else [])
+                distances.append(result.distances[0] if result else [])
+                documents.append(result.documents[0] if result else [])
+                metadatas.append(result.metadatas[0] if result else [])
+
+            if any(ids):
+                results[collection_name] = SearchResult(
+                    ids=ids,
+                    distances=distances,
+                    documents=documents,
+                    metadatas=metadatas,
+                )
+        return results
+
     def query(
         self, collection_name: str, filter: dict, limit: Optional[int] = None
     ) -> Optional[GetResult]:
@@ -200,7 +256,7 @@ class OpenSearchClient:
                 }
                 for item in batch
             ]
-            bulk(self.client, actions)
+            bulk(self.client, actions, chunk_size=len(actions))
 
     def upsert(self, collection_name: str, items: list[VectorItem]):
         self._create_index_if_not_exists(
@@ -222,7 +278,7 @@ class OpenSearchClient:
                 }
                 for item in batch
             ]
-            bulk(self.client, actions)
+            bulk(self.client, actions, chunk_size=len(actions))
 
     def delete(
         self,
@@ -239,7 +295,7 @@ class OpenSearchClient:
                 }
                 for id in ids
             ]
-            bulk(self.client, actions)
+            bulk(self.client, actions, chunk_size=len(actions))
         elif filter:
             query_body = {
                 "query": {"bool": {"filter": []}},
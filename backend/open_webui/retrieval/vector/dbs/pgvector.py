@@ -1,5 +1,11 @@
 from typing import Optional, List, Dict, Any
+import io
+import json
 import logging
+import struct
+import sys
+import time
+from array import array as float_array
 from sqlalchemy import (
     cast,
     column,
@@ -17,13 +23,29 @@ from sqlalchemy.sql import true
 from sqlalchemy.pool import NullPool
 
 from sqlalchemy.orm import declarative_base, scoped_session, sessionmaker
-from sqlalchemy.dialects.postgresql import JSONB, array
+from sqlalchemy.dialects.postgresql import JSONB, array, insert as pg_insert
 from pgvector.sqlalchemy import Vector
 from sqlalchemy.ext.mutable import MutableDict
 from sqlalchemy.exc import NoSuchTableError
 
-from open_webui.retrieval.vector.main import VectorItem, SearchResult, GetResult
-from open_webui.config import PGVECTOR_DB_URL, PGVECTOR_INITIALIZE_MAX_VECTOR_LENGTH
+from open_webui.retrieval.vector.main import (
+    VectorDBBase,
+    VectorItem,
+    SearchResult,
+    GetResult,
+)
+from open_webui.config import (
+    PGVECTOR_DB_URL,
+    PGVECTOR_INITIALIZE_MAX_VECTOR_LENGTH,
+    PGVECTOR_INDEX_METHOD,
+    PGVECTOR_HNSW_M,
+    PGVECTOR_HNSW_EF_CONSTRUCTION,
+    PGVECTOR_HNSW_EF_SEARCH,
+    PGVECTOR_IVFFLAT_LISTS,
+    PGVECTOR_IVFFLAT_PROBES,
+    PGVECTOR_PARTITIONS,
+    VECTOR_DB_BATCH_SIZE,
+)
 
 from open_webui.env import SRC_LOG_LEVELS
 
@@ -33,6 +55,14 @@ Base = declarative_base()
 log = logging.getLogger(__name__)
 log.setLevel(SRC_LOG_LEVELS["RAG"])
 
+# Binary COPY framing, see https://www.postgresql.org/docs/current/sql-copy.html
+PGCOPY_HEADER = b"PGCOPY\n\xff\r\n\x00" + struct.pack(">ii", 0, 0)
+PGCOPY_TRAILER = struct.pack(">h", -1)
+PGCOPY_COLUMNS = "(id, vector, collection_name, text, vmetadata)"
+
+# Largest hnsw.ef_search pgvector accepts
+HNSW_EF_SEARCH_MAX = 1000
+
 
 class DocumentChunk(Base):
     __tablename__ = "document_chunk"
@@ -44,7 +74,7 @@ class DocumentChunk(Base):
     vmetadata = Column(MutableDict.as_mutable(JSONB), nullable=True)
 
 
-class PgvectorClient:
+class PgvectorClient(VectorDBBase):
     def __init__(self) -> None:
 
         # if no pgvector uri, use the existing database connection
@@ -68,19 +98,21 @@ class PgvectorClient:
             # Check vector length consistency
             self.check_vector_length()
 
+            if PGVECTOR_PARTITIONS > 0:
+                self.create_partitioned_table(PGVECTOR_PARTITIONS)
+
             # Create the tables if they do not exist
             # Base.metadata.create_all requires a bind (engine or connection)
             # Get the connection from the session
             connection = self.session.connection()
             Base.metadata.create_all(bind=connection)
 
+            # Partitioned tables key on (id, collection_name)
+            self.partitioned = self._is_partitioned()
+
             # Create an index on the vector column if it doesn't exist
-            self.session.execute(
-                text(
-                    "CREATE INDEX IF NOT EXISTS idx_document_chunk_vector "
-                    "ON document_chunk USING ivfflat (vector vector_cosine_ops) WITH (lists = 100);"
-                )
-            )
+            self.index_method = self._get_supported_index_method()
+            self.create_vector_index()
             self.session.execute(
                 text(
                     "CREATE INDEX IF NOT EXISTS idx_document_chunk_collection_name "
@@ -129,6 +161,226 @@ class PgvectorClient:
                 "The 'vector' column does not exist in the 'document_chunk' table."
             )
 
+    def create_partitioned_table(self, partitions: int) -> None:
+        """
+        Create document_chunk hash-partitioned by collection_name, so that
+        collection-filtered searches only scan (and index) one partition.
+        Existing unpartitioned tables are left as they are.
+        """
+        exists = self.session.execute(
+            text("SELECT to_regclass('document_chunk') IS NOT NULL")
+        ).scalar()
+        if exists:
+            if not self._is_partitioned():
+                log.warning(
+                    "PGVECTOR_PARTITIONS is set but document_chunk already exists "
+                    "unpartitioned; migrate the data to enable partitioning."
+                )
+            return
+
+        self.session.execute(
+            text(
+                "CREATE TABLE document_chunk ("
+                "id TEXT NOT NULL, "
+                f"vector vector({VECTOR_LENGTH}), "
+                "collection_name TEXT NOT NULL, "
+                "text TEXT, "
+                "vmetadata JSONB, "
+                "PRIMARY KEY (id, collection_name)"
+                ") PARTITION BY HASH (collection_name);"
+            )
+        )
+        for remainder in range(partitions):
+            self.session.execute(
+                text(
+                    f"CREATE TABLE document_chunk_p{remainder} "
+                    "PARTITION OF document_chunk "
+                    f"FOR VALUES WITH (MODULUS {partitions}, REMAINDER {remainder});"
+                )
+            )
+        log.info(f"Created document_chunk with {partitions} hash partitions.")
+
+    def _is_partitioned(self) -> bool:
+        return bool(
+            self.session.execute(
+                text(
+                    "SELECT EXISTS (SELECT 1 FROM pg_partitioned_table "
+                    "WHERE partrelid = to_regclass('document_chunk'))"
+                )
+            ).scalar()
+        )
+
+    def _get_supported_index_method(self) -> str:
+        # HNSW needs pgvector >= 0.5.0, fall back to ivfflat on older installs
+        if PGVECTOR_INDEX_METHOD == "hnsw":
+            version = self.session.execute(
+                text("SELECT extversion FROM pg_extension WHERE extname = 'vector'")
+            ).scalar()
+            major, minor = (int(part) for part in (version or "0.0").split(".")[:2])
+            if (major, minor) < (0, 5):
+                log.warning(
+                    f"pgvector {version} does not support hnsw, using ivfflat instead."
+                )
+                return "ivfflat"
+        return PGVECTOR_INDEX_METHOD
+
+    def _vector_index_name(self, method: str) -> str:
+        # ivfflat keeps the original index name for existing deployments
+        if method == "ivfflat":
+            return "idx_document_chunk_vector"
+        return f"idx_document_chunk_vector_{method}"
+
+    def create_vector_index(self, force: bool = False) -> None:
+        method = self.index_method
+        index_name = self._vector_index_name(method)
+
+        # Building an index locks the table, don't do it on startup for
+        # existing data, e.g. after switching PGVECTOR_INDEX_METHOD
+        if (
+            not force
+            and not self.session.execute(
+                text(f"SELECT to_regclass('{index_name}') IS NOT NULL")
+            ).scalar()
+        ):
+            if self.session.execute(
+                text("SELECT EXISTS (SELECT 1 FROM document_chunk)")
+            ).scalar():
+                log.warning(
+                    f"No {method} index on document_chunk, rebuild the vector "
+                    "index to create it."
+                )
+                return
+
+        if method == "hnsw":
+            params = (
+                f"m = {PGVECTOR_HNSW_M}, "
+                f"ef_construction = {PGVECTOR_HNSW_EF_CONSTRUCTION}"
+            )
+        else:
+            params = f"lists = {PGVECTOR_IVFFLAT_LISTS}"
+
+        self.session.execute(
+            text(
+                f"CREATE INDEX IF NOT EXISTS {index_name} "
+                f"ON document_chunk USING {method} (vector vector_cosine_ops) "
+                f"WITH ({params});"
+            )
+        )
+
+        other = "ivfflat" if method == "hnsw" else "hnsw"
+        if self.session.execute(
+            text(f"SELECT to_regclass('{self._vector_index_name(other)}') IS NOT NULL")
+        ).scalar():
+            log.warning(
+                f"Found a stale {other} index on document_chunk, "
+                "rebuild the vector index to drop it."
+            )
+
+    def rebuild_vector_index(self) -> Dict[str, Any]:
+        # Drop every vector index and recreate the configured one, e.g. after
+        # changing PGVECTOR_INDEX_METHOD or the index build parameters
+        try:
+            for method in ["hnsw", "ivfflat"]:
+                self.session.execute(
+                    text(f"DROP INDEX IF EXISTS {self._vector_index_name(method)};")
+                )
+            self.create_vector_index(force=True)
+            self.session.commit()
+            log.info(f"Rebuilt {self.index_method} index on document_chunk.")
+        except Exception as e:
+            self.session.rollback()
+            log.exception(f"Error rebuilding vector index: {e}")
+            raise
+        return self.get_index_status()
+
+    def get_index_status(self) -> Dict[str, Any]:
+        try:
+            indexes = self.session.execute(
+                text(
+                    "SELECT i.relname AS name, am.amname AS method, "
+                    "ix.indisvalid AS valid, ix.indisready AS ready, "
+                    "pg_relation_size(i.oid) AS size, "
+                    "pg_get_indexdef(i.oid) AS definition "
+                    "FROM pg_index ix "
+                    "JOIN pg_class i ON i.oid = ix.indexrelid "
+                    "JOIN pg_am am ON am.oid = i.relam "
+                    "WHERE ix.indrelid = to_regclass('document_chunk') "
+                    "ORDER BY i.relname"
+                )
+            ).all()
+            partitions = self.session.execute(
+                text(
+                    "SELECT c.relname AS name, c.reltuples::bigint AS rows "
+                    "FROM pg_inherits inh "
+                    "JOIN pg_class c ON c.oid = inh.inhrelid "
+                    "WHERE inh.inhparent = to_regclass('document_chunk') "
+                    "ORDER BY c.relname"
+                )
+            ).all()
+            rows = self.session.execute(
+                text(
+                    "SELECT COALESCE(SUM(c.reltuples), 0)::bigint FROM pg_class c "
+                    "WHERE c.oid = to_regclass('document_chunk') "
+                    "OR c.oid IN (SELECT inhrelid FROM pg_inherits "
+                    "WHERE inhparent = to_regclass('document_chunk'))"
+                )
+            ).scalar()
+
+            vector_index = self._vector_index_name(self.index_method)
+            return {
+                "method": self.index_method,
+                "parameters": (
+                    {
+                        "m": PGVECTOR_HNSW_M,
+                        "ef_construction": PGVECTOR_HNSW_EF_CONSTRUCTION,
+                        "ef_search": PGVECTOR_HNSW_EF_SEARCH,
+                    }
+                    if self.index_method == "hnsw"
+                    else {
+                        "lists": PGVECTOR_IVFFLAT_LISTS,
+                        "probes": PGVECTOR_IVFFLAT_PROBES,
+                    }
+                ),
+                "healthy": any(
+                    index.name == vector_index and index.valid and index.ready
+                    for index in indexes
+                ),
+                "estimated_rows": rows,
+                "partitioned": self._is_partitioned(),
+                "partitions": [
+                    {"name": partition.name, "estimated_rows": max(partition.rows, 0)}
+                    for partition in partitions
+                ],
+                "indexes": [
+                    {
+                        "name": index.name,
+                        "method": index.method,
+                        "valid": index.valid,
+                        "ready": index.ready,
+                        "size": index.size,
+                        "definition": index.definition,
+                    }
+                    for index in indexes
+                ],
+            }
+        except Exception as e:
+            self.session.rollback()
+            log.exception(f"Error getting index status: {e}")
+            raise
+
+    def _set_search_params(self, limit: Optional[int], ef_search: Optional[int]):
+        # Applies to the current transaction only
+        if self.index_method == "hnsw":
+            ef_search = min(
+                max(ef_search or PGVECTOR_HNSW_EF_SEARCH, limit or 0),
+                HNSW_EF_SEARCH_MAX,
+            )
+            self.session.execute(text(f"SET LOCAL hnsw.ef_search = {int(ef_search)}"))
+        else:
+            self.session.execute(
+                text(f"SET LOCAL ivfflat.probes = {int(PGVECTOR_IVFFLAT_PROBES)}")
+            )
+
     def adjust_vector_length(self, vector: List[float]) -> List[float]:
         # Adjust vector to have length VECTOR_LENGTH
         current_length = len(vector)
@@ -141,68 +393,182 @@ class PgvectorClient:
             )
         return vector
 
-    def insert(self, collection_name: str, items: List[VectorItem]) -> None:
-        try:
-            new_items = []
-            for item in items:
-                vector = self.adjust_vector_length(item["vector"])
-                new_chunk = DocumentChunk(
-                    id=item["id"],
-                    vector=vector,
-                    collection_name=collection_name,
-                    text=item["text"],
-                    vmetadata=item["metadata"],
-                )
-                new_items.append(new_chunk)
-            self.session.bulk_save_objects(new_items)
-            self.session.commit()
-            log.info(
-                f"Inserted {len(new_items)} items into collection '{collection_name}'."
+    def _encode_vector(self, vector: List[float]) -> bytes:
+        # pgvector binary format: int16 dim, int16 unused, float4[dim] (big-endian)
+        current_length = len(vector)
+        if current_length > VECTOR_LENGTH:
+            raise Exception(
+                f"Vector length {current_length} not supported. Max length must be <= {VECTOR_LENGTH}"
             )
-        except Exception as e:
-            self.session.rollback()
-            log.exception(f"Error during insert: {e}")
-            raise
 
-    def upsert(self, collection_name: str, items: List[VectorItem]) -> None:
+        data = float_array("f", vector)
+        if sys.byteorder == "little":
+            data.byteswap()
+
+        # Zero padding is all zero bytes in IEEE 754
+        return (
+            struct.pack(">hh", VECTOR_LENGTH, 0)
+            + data.tobytes()
+            + bytes(4 * (VECTOR_LENGTH - current_length))
+        )
+
+    def _encode_copy_rows(self, collection_name: str, items: List[VectorItem]):
+        buffer = io.BytesIO()
+        buffer.write(PGCOPY_HEADER)
+
+        collection = collection_name.encode()
+        for item in items:
+            metadata = item["metadata"]
+            fields = (
+                item["id"].encode(),
+                self._encode_vector(item["vector"]),
+                collection,
+                item["text"].encode() if item["text"] is not None else None,
+                # jsonb binary format is a version byte followed by the json text
+                (
+                    b"\x01" + json.dumps(metadata).encode()
+                    if metadata is not None
+                    else None
+                ),
+            )
+
+            buffer.write(struct.pack(">h", len(fields)))
+            for field in fields:
+                if field is None:
+                    buffer.write(struct.pack(">i", -1))
+                else:
+                    buffer.write(struct.pack(">i", len(field)))
+                    buffer.write(field)
+
+        buffer.write(PGCOPY_TRAILER)
+        buffer.seek(0)
+        return buffer
+
+    def _copy_rows(self, table: str, collection_name: str, items: List[VectorItem]):
+        # COPY ... FORMAT binary through the session's connection, so it runs in
+        # the same transaction as the surrounding statements
+        cursor = self.session.connection().connection.cursor()
         try:
-            for item in items:
-                vector = self.adjust_vector_length(item["vector"])
-                existing = (
-                    self.session.query(DocumentChunk)
-                    .filter(DocumentChunk.id == item["id"])
-                    .first()
+            cursor.copy_expert(
+                f"COPY {table} {PGCOPY_COLUMNS} FROM STDIN WITH (FORMAT binary)",
+                self._encode_copy_rows(collection_name, items),
+            )
+        finally:
+            cursor.close()
+
+    def _supports_copy(self) -> bool:
+        # copy_expert is psycopg2 specific, other drivers use multi-row INSERT
+        return self.session.get_bind().dialect.driver == "psycopg2"
+
+    def _insert_values(self, collection_name: str, items: List[VectorItem]):
+        return pg_insert(DocumentChunk).values(
+            [
+                {
+                    "id": item["id"],
+                    "vector": self.adjust_vector_length(list(item["vector"])),
+                    "collection_name": collection_name,
+                    "text": item["text"],
+                    "vmetadata": item["metadata"],
+                }
+                for item in items
+            ]
+        )
+
+    def _write_batches(
+        self,
+        collection_name: str,
+        items: List[VectorItem],
+        write_batch,
+        operation: str,
+    ) -> None:
+        # Each batch is committed in its own transaction
+        start = time.perf_counter()
+        use_copy = self._supports_copy()
+
+        written = 0
+        for i in range(0, len(items), VECTOR_DB_BATCH_SIZE):
+            batch = items[i : i + VECTOR_DB_BATCH_SIZE]
+            try:
+                write_batch(collection_name, batch, use_copy)
+                self.session.commit()
+            except Exception as e:
+                self.session.rollback()
+                log.exception(
+                    f"Error during {operation} after {written} items were written: {e}"
                 )
-                if existing:
-                    existing.vector = vector
-                    existing.text = item["text"]
-                    existing.vmetadata = item["metadata"]
-                    existing.collection_name = (
-                        collection_name  # Update collection_name if necessary
-                    )
-                else:
-                    new_chunk = DocumentChunk(
-                        id=item["id"],
-                        vector=vector,
-                        collection_name=collection_name,
-                        text=item["text"],
-                        vmetadata=item["metadata"],
+                raise
+            written += len(batch)
+
+        elapsed = time.perf_counter() - start
+        log.info(
+            f"{operation}: wrote {written} items into collection "
+            f"'{collection_name}' in {elapsed:.2f}s "
+            f"({written / max(elapsed, 1e-6):.0f} rows/s)."
+        )
+
+    def _insert_batch(
+        self, collection_name: str, items: List[VectorItem], use_copy: bool
+    ) -> None:
+        if use_copy:
+            self._copy_rows("document_chunk", collection_name, items)
+        else:
+            self.session.execute(self._insert_values(collection_name, items))
+
+    def _upsert_batch(
+        self, collection_name: str, items: List[VectorItem], use_copy: bool
+    ) -> None:
+        # ON CONFLICT can't touch the same row twice, the last item for an id wins
+        items = list({item["id"]: item for item in items}.values())
+
+        if self.partitioned:
+            # The partition key can't be changed by an update
+            conflict_target = "(id, collection_name)"
+            update_columns = ["vector", "text", "vmetadata"]
+        else:
+            conflict_target = "(id)"
+            update_columns = ["vector", "text", "vmetadata", "collection_name"]
+
+        if use_copy:
+            # Stage the batch with COPY, then merge it in a single statement
+            self.session.execute(
+                text(
+                    "CREATE TEMP TABLE IF NOT EXISTS document_chunk_staging "
+                    "(LIKE document_chunk INCLUDING DEFAULTS) ON COMMIT DELETE ROWS"
+                )
+            )
+            self._copy_rows("document_chunk_staging", collection_name, items)
+            self.session.execute(
+                text(
+                    f"INSERT INTO document_chunk {PGCOPY_COLUMNS} "
+                    f"SELECT id, vector, collection_name, text, vmetadata "
+                    f"FROM document_chunk_staging "
+                    f"ON CONFLICT {conflict_target} DO UPDATE SET "
+                    + ", ".join(
+                        f"{column} = EXCLUDED.{column}" for column in update_columns
                     )
-                    self.session.add(new_chunk)
-            self.session.commit()
-            log.info(
-                f"Upserted {len(items)} items into collection '{collection_name}'."
+                )
             )
-        except Exception as e:
-            self.session.rollback()
-            log.exception(f"Error during upsert: {e}")
-            raise
+        else:
+            stmt = self._insert_values(collection_name, items)
+            self.session.execute(
+                stmt.on_conflict_do_update(
+                    index_elements=conflict_target.strip("()").split(", "),
+                    set_={column: stmt.excluded[column] for column in update_columns},
+                )
+            )
+
+    def insert(self, collection_name: str, items: List[VectorItem]) -> None:
+        self._write_batches(collection_name, items, self._insert_batch, "insert")
+
+    def upsert(self, collection_name: str, items: List[VectorItem]) -> None:
+        self._write_batches(collection_name, items, self._upsert_batch, "upsert")
 
     def search(
         self,
         collection_name: str,
         vectors: List[List[float]],
         limit: Optional[int] = None,
+        ef_search: Optional[int] = None,
     ) -> Optional[SearchResult]:
         try:
             if not vectors:
@@ -259,6 +625,7 @@ class PgvectorClient:
                 .order_by(query_vectors.c.qid, subq.c.distance)
             )
 
+            self._set_search_params(limit, ef_search)
             result_proxy = self.session.execute(stmt)
             results = result_proxy.all()
 
@@ -288,9 +655,105 @@ class PgvectorClient:
                 ids=ids, distances=distances, documents=documents, metadatas=metadatas
             )
         except Exception as e:
+            self.session.rollback()
             log.exception(f"Error during search: {e}")
             return None
 
+    def search_many(
+        self,
+        collection_names: List[str],
+        vectors: List[List[float]],
+        limit: Optional[int] = None,
+        ef_search: Optional[int] = None,
+    ) -> Dict[str, SearchResult]:
+        try:
+            if not collection_names or not vectors:
+                return {}
+
+            # Adjust query vectors to VECTOR_LENGTH
+            vectors = [self.adjust_vector_length(vector) for vector in vectors]
+            num_queries = len(vectors)
+
+            def vector_expr(vector):
+                return cast(array(vector), Vector(VECTOR_LENGTH))
+
+            qid_col = column("qid", Integer)
+            q_vector_col = column("q_vector", Vector(VECTOR_LENGTH))
+            query_vectors = (
+                values(qid_col, q_vector_col)
+                .data(
+                    [(idx, vector_expr(vector)) for idx, vector in enumerate(vectors)]
+                )
+                .alias("query_vectors")
+            )
+
+            cname_col = column("cname", Text)
+            collections = (
+                values(cname_col)
+                .data([(collection_name,) for collection_name in collection_names])
+                .alias("collections")
+            )
+
+            # Top-k per (query vector, collection) pair, all in one round trip
+            subq = (
+                select(
+                    DocumentChunk.id,
+                    DocumentChunk.text,
+                    DocumentChunk.vmetadata,
+                    (
+                        DocumentChunk.vector.cosine_distance(query_vectors.c.q_vector)
+                    ).label("distance"),
+                )
+                .where(DocumentChunk.collection_name == collections.c.cname)
+                .order_by(
+                    (DocumentChunk.vector.cosine_distance(query_vectors.c.q_vector))
+                )
+            )
+            if limit is not None:
+                subq = subq.limit(limit)
+            subq = subq.lateral("result")
+
+            stmt = (
+                select(
+                    collections.c.cname,
+                    query_vectors.c.qid,
+                    subq.c.id,
+                    subq.c.text,
+                    subq.c.vmetadata,
+                    subq.c.distance,
+                )
+                .select_from(collections)
+                .join(query_vectors, true())
+                .join(subq, true())
+                .order_by(collections.c.cname, query_vectors.c.qid, subq.c.distance)
+            )
+
+            self._set_search_params(limit, ef_search)
+
+            results = {}
+            for row in self.session.execute(stmt).all():
+                if row.cname not in results:
+                    results[row.cname] = SearchResult(
+                        ids=[[] for _ in range(num_queries)],
+                        distances=[[] for _ in range(num_queries)],
+                        documents=[[] for _ in range(num_queries)],
+                        metadatas=[[] for _ in range(num_queries)],
+                    )
+
+                result = results[row.cname]
+                qid = int(row.qid)
+                result.ids[qid].append(row.id)
+                # normalize and re-orders pgvec distance from [2, 0] to [0, 1] score range
+                result.distances[qid].append((2.0 - row.distance) / 2.0)
+                result.documents[qid].append(row.text)
+                result.metadatas[qid].append(row.vmetadata)
+
+            return results
+        except Exception as e:
+            self.session.rollback()
+            log.exception(f"Error during search_many: {e}")
+            return {}
+
     def query(
         self, collection_name: str, filter: Dict[str, Any], limit: Optional[int] = None
     ) -> Optional[GetResult]:
@@ -5,8 +5,13 @@ from qdrant_client import QdrantClient as Qclient
 from qdrant_client.http.models import PointStruct
 from qdrant_client.models import models
 
-from open_webui.retrieval.vector.main import VectorItem, SearchResult, GetResult
-from open_webui.config import QDRANT_URI, QDRANT_API_KEY
+from open_webui.retrieval.vector.main import (
+    VectorDBBase,
+    VectorItem,
+    SearchResult,
+    GetResult,
+)
+from open_webui.config import QDRANT_URI, QDRANT_API_KEY, VECTOR_DB_BATCH_SIZE
 from open_webui.env import SRC_LOG_LEVELS
 
 NO_LIMIT = 999999999
@@ -15,7 +20,7 @@ log = logging.getLogger(__name__)
 log.setLevel(SRC_LOG_LEVELS["RAG"])
 
 
-class QdrantClient:
+class QdrantClient(VectorDBBase):
     def __init__(self):
         self.collection_prefix = "open-webui"
         self.QDRANT_URI = QDRANT_URI
@@ -103,6 +108,48 @@ class QdrantClient:
             distances=[[(point.score + 1.0) / 2.0 for point in query_response.points]],
         )
 
+    def search_many(
+        self,
+        collection_names: list[str],
+        vectors: list[list[float | int]],
+        limit: int,
+    ) -> dict[str, SearchResult]:
+        # One batch request per collection carrying every query vector
+        if limit is None:
+            limit = NO_LIMIT  # otherwise qdrant would set limit to 10!
+
+        results = {}
+        for collection_name in collection_names:
+            try:
+                responses = self.client.query_batch_points(
+                    collection_name=f"{self.collection_prefix}_{collection_name}",
+                    requests=[
+                        models.QueryRequest(
+                            query=vector, limit=limit, with_payload=True
+                        )
+                        for vector in vectors
+                    ],
+                )
+            except Exception as e:
+                log.debug(f"Error searching collection {collection_name}: {e}")
+                continue
+
+            ids, distances, documents, metadatas = [], [], [], []
+            for response in responses:
+                get_result = self._result_to_get_result(response.points)
+                ids.extend(get_result.ids)
+                documents.extend(get_result.documents)
+                metadatas.extend(get_result.metadatas)
+                # qdrant distance is [-1, 1], normalize to [0, 1]
+                distances.append(
+                    [(point.score + 1.0) / 2.0 for point in response.points]
+                )
+
+            results[collection_name] = SearchResult(
+                ids=ids, distances=distances, documents=documents, metadatas=metadatas
+            )
+        return results
+
     def query(self, collection_name: str, filter: dict, limit: Optional[int] = None):
         # Construct the filter string for querying
         if not self.has_collection(collection_name):
@@ -141,13 +188,18 @@ class QdrantClient:
         # Insert the items into the collection, if the collection does not exist, it will be created.
         self._create_collection_if_not_exists(collection_name, len(items[0]["vector"]))
         points = self._create_points(items)
-        self.client.upload_points(f"{self.collection_prefix}_{collection_name}", points)
+        self.client.upload_points(
+            f"{self.collection_prefix}_{collection_name}",
+            points,
+            batch_size=VECTOR_DB_BATCH_SIZE,
+        )
 
     def upsert(self, collection_name: str, items: list[VectorItem]):
         # Update the items in the collection, if the items are not present, insert them. If the collection does not exist, it will be created.
         self._create_collection_if_not_exists(collection_name, len(items[0]["vector"]))
-        points = self._create_points(items)
-        return self.client.upsert(f"{self.collection_prefix}_{collection_name}", points)
+        for i in range(0, len(items), VECTOR_DB_BATCH_SIZE):
+            points = self._create_points(items[i : i + VECTOR_DB_BATCH_SIZE])
+            self.client.upsert(f"{self.collection_prefix}_{collection_name}", points)
 
     def delete(
         self,
@@ -1,5 +1,11 @@
+import logging
 from pydantic import BaseModel
-from typing import Optional, List, Any
+from typing import Optional, List, Dict, Any
+
+from open_webui.env import SRC_LOG_LEVELS
+
+log = logging.getLogger(__name__)
+log.setLevel(SRC_LOG_LEVELS["RAG"])
 
 
 class VectorItem(BaseModel):
@@ -17,3 +23,44 @@ class GetResult(BaseModel):
 
 class SearchResult(GetResult):
     distances: Optional[List[List[float | int]]]
+
+
+class VectorDBBase:
+    """
+    Shared behaviour for the vector DB clients in retrieval/vector/dbs.
+
+    Clients whose backend can answer several collections and query vectors in
+    a single request override `search_many`; the default issues one
+    multi-vector `search` per collection.
+    """
+
+    def search(
+        self, collection_name: str, vectors: List[List[float | int]], limit: int
+    ) -> Optional[SearchResult]:
+        raise NotImplementedError
+
+    def search_many(
+        self,
+        collection_names: List[str],
+        vectors: List[List[float | int]],
+        limit: int,
+    ) -> Dict[str, SearchResult]:
+        # Returns one SearchResult per collection, with one row per query vector
+        results = {}
+        for collection_name in collection_names:
+            try:
+                result = self.search(
+                    collection_name=collection_name, vectors=vectors, limit=limit
+                )
+                if result is not None:
+                    results[collection_name] = result
+            except Exception as e:
+                log.exception(f"Error searching collection {collection_name}: {e}")
+        return results
+
+    def get_index_status(self) -> Optional[Dict[str, Any]]:
+        # Backends with managed ANN indexes report their health here
+        return None
+
+    def rebuild_vector_index(self) -> Optional[Dict[str, Any]]:
+        return None
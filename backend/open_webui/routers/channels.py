@@ -1,13 +1,13 @@
+import asyncio
 import json
 import logging
 from typing import Optional
 
 
-from fastapi import APIRouter, Depends, HTTPException, Request, status, BackgroundTasks
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
 from pydantic import BaseModel
 
 
-from open_webui.socket.main import sio, get_user_ids_from_room
 from open_webui.models.users import Users, UserNameResponse
 
 from open_webui.models.channels import Channels, ChannelModel, ChannelForm
@@ -25,8 +25,15 @@ from open_webui.env import SRC_LOG_LEVELS
 
 
 from open_webui.utils.auth import get_admin_user, get_verified_user
-from open_webui.utils.access_control import has_access, get_users_with_access
-from open_webui.utils.webhook import post_webhook
+from open_webui.utils.access_control import has_access
+from open_webui.utils.misc import CURSOR_PATTERN, get_cursor, parse_cursor
+from open_webui.utils.channels import (
+    channel_event_emitter,
+    channel_notification_worker,
+    get_channel,
+    has_channel_access,
+    invalidate_channel_cache,
+)
 
 log = logging.getLogger(__name__)
 log.setLevel(SRC_LOG_LEVELS["MODELS"])
@@ -103,6 +110,7 @@ async def update_channel_by_id(
 
     try:
         channel = Channels.update_channel_by_id(id, form_data)
+        invalidate_channel_cache(id)
         return ChannelModel(**channel.model_dump())
     except Exception as e:
         log.exception(e)
@@ -126,6 +134,7 @@ async def delete_channel_by_id(id: str, user=Depends(get_admin_user)):
 
     try:
         Channels.delete_channel_by_id(id)
+        invalidate_channel_cache(id)
         return True
     except Exception as e:
         log.exception(e)
@@ -145,7 +154,11 @@ class MessageUserResponse(MessageResponse):
 
 @router.get("/{id}/messages", response_model=list[MessageUserResponse])
 async def get_channel_messages(
-    id: str, skip: int = 0, limit: int = 50, user=Depends(get_verified_user)
+    id: str,
+    skip: int = 0,
+    limit: int = 50,
+    cursor: Optional[str] = Query(None, pattern=CURSOR_PATTERN),
+    user=Depends(get_verified_user),
 ):
     channel = Channels.get_channel_by_id(id)
     if not channel:
@@ -160,7 +173,9 @@ async def get_channel_messages(
             status_code=status.HTTP_403_FORBIDDEN, detail=ERROR_MESSAGES.DEFAULT()
         )
 
-    message_list = Messages.get_messages_by_channel_id(id, skip, limit)
+    message_list = Messages.get_messages_by_channel_id(
+        id, skip, limit, cursor=parse_cursor(cursor)
+    )
     users = {}
 
     messages = []
@@ -179,6 +194,7 @@ async def get_channel_messages(
                     "reply_count": len(replies),
                     "latest_reply_at": latest_reply_at,
                     "reactions": Messages.get_reactions_by_message_id(message.id),
+                    "cursor": get_cursor(message.created_at, message.id),
                     "user": UserNameResponse(**users[message.user_id].model_dump()),
                 }
             )
@@ -192,55 +208,28 @@ async def get_channel_messages(
 ############################
 
 
-async def send_notification(name, webui_url, channel, message, active_user_ids):
-    users = get_users_with_access("read", channel.access_control)
-
-    for user in users:
-        if user.id in active_user_ids:
-            continue
-        else:
-            if user.settings:
-                webhook_url = user.settings.ui.get("notifications", {}).get(
-                    "webhook_url", None
-                )
-
-                if webhook_url:
-                    post_webhook(
-                        name,
-                        webhook_url,
-                        f"#{channel.name} - {webui_url}/channels/{channel.id}\n\n{message.content}",
-                        {
-                            "action": "channel",
-                            "message": message.content,
-                            "title": channel.name,
-                            "url": f"{webui_url}/channels/{channel.id}",
-                        },
-                    )
-
-
 @router.post("/{id}/messages/post", response_model=Optional[MessageModel])
 async def post_new_message(
     request: Request,
     id: str,
     form_data: MessageForm,
-    background_tasks: BackgroundTasks,
     user=Depends(get_verified_user),
 ):
-    channel = Channels.get_channel_by_id(id)
+    channel = await get_channel(id)
     if not channel:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail=ERROR_MESSAGES.NOT_FOUND
         )
 
-    if user.role != "admin" and not has_access(
-        user.id, type="read", access_control=channel.access_control
-    ):
+    if not await has_channel_access(user, channel, type="read"):
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN, detail=ERROR_MESSAGES.DEFAULT()
         )
 
     try:
-        message = Messages.insert_new_message(form_data, channel.id, user.id)
+        message = await asyncio.to_thread(
+            Messages.insert_new_message, form_data, channel.id, user.id
+        )
 
         if message:
             event_data = {
@@ -253,9 +242,8 @@ async def post_new_message(
                             **message.model_dump(),
                             "reply_count": 0,
                             "latest_reply_at": None,
-                            "reactions": Messages.get_reactions_by_message_id(
-                                message.id
-                            ),
+                            # A new message has no reactions yet
+                            "reactions": [],
                             "user": UserNameResponse(**user.model_dump()),
                         }
                     ).model_dump(),
@@ -264,19 +252,22 @@ async def post_new_message(
                 "channel": channel.model_dump(),
             }
 
-            await sio.emit(
-                "channel-events",
+            await channel_event_emitter.emit(
                 event_data,
                 to=f"channel:{channel.id}",
             )
 
             if message.parent_id:
                 # If this message is a reply, emit to the parent message as well
-                parent_message = Messages.get_message_by_id(message.parent_id)
+                parent_message = await asyncio.to_thread(
+                    Messages.get_message_by_id, message.parent_id
+                )
 
                 if parent_message:
-                    await sio.emit(
-                        "channel-events",
+                    parent_user = await asyncio.to_thread(
+                        Users.get_user_by_id, parent_message.user_id
+                    )
+                    await channel_event_emitter.emit(
                         {
                             "channel_id": channel.id,
                             "message_id": parent_message.id,
@@ -286,9 +277,7 @@ async def post_new_message(
                                     **{
                                         **parent_message.model_dump(),
                                         "user": UserNameResponse(
-                                            **Users.get_user_by_id(
-                                                parent_message.user_id
-                                            ).model_dump()
+                                            **parent_user.model_dump()
                                         ),
                                     }
                                 ).model_dump(),
@@ -299,15 +288,11 @@ async def post_new_message(
                         to=f"channel:{channel.id}",
                     )
 
-            active_user_ids = get_user_ids_from_room(f"channel:{channel.id}")
-
-            background_tasks.add_task(
-                send_notification,
+            channel_notification_worker.put(
                 request.app.state.WEBUI_NAME,
                 request.app.state.config.WEBUI_URL,
                 channel,
                 message,
-                active_user_ids,
             )
 
         return MessageModel(**message.model_dump())
@@ -374,6 +359,7 @@ async def get_channel_thread_messages(
     message_id: str,
     skip: int = 0,
     limit: int = 50,
+    cursor: Optional[str] = Query(None, pattern=CURSOR_PATTERN),
     user=Depends(get_verified_user),
 ):
     channel = Channels.get_channel_by_id(id)
@@ -389,7 +375,9 @@ async def get_channel_thread_messages(
             status_code=status.HTTP_403_FORBIDDEN, detail=ERROR_MESSAGES.DEFAULT()
         )
 
-    message_list = Messages.get_messages_by_parent_id(id, message_id, skip, limit)
+    message_list = Messages.get_messages_by_parent_id(
+        id, message_id, skip, limit, cursor=parse_cursor(cursor)
+    )
     users = {}
 
     messages = []
@@ -405,6 +393,7 @@ async def get_channel_thread_messages(
                     "reply_count": 0,
                     "latest_reply_at": None,
                     "reactions": Messages.get_reactions_by_message_id(message.id),
+                    "cursor": get_cursor(message.created_at, message.id),
                     "user": UserNameResponse(**users[message.user_id].model_dump()),
                 }
             )
@@ -453,8 +442,7 @@ async def update_message_by_id(
         message = Messages.get_message_by_id(message_id)
 
         if message:
-            await sio.emit(
-                "channel-events",
+            await channel_event_emitter.emit(
                 {
                     "channel_id": channel.id,
                     "message_id": message.id,
@@ -524,8 +512,7 @@ async def add_reaction_to_message(
         Messages.add_reaction_to_message(message_id, user.id, form_data.name)
         message = Messages.get_message_by_id(message_id)
 
-        await sio.emit(
-            "channel-events",
+        await channel_event_emitter.emit(
             {
                 "channel_id": channel.id,
                 "message_id": message.id,
@@ -593,8 +580,7 @@ async def remove_reaction_by_id_and_user_id_and_name(
 
         message = Messages.get_message_by_id(message_id)
 
-        await sio.emit(
-            "channel-events",
+        await channel_event_emitter.emit(
             {
                 "channel_id": channel.id,
                 "message_id": message.id,
@@ -657,8 +643,7 @@ async def delete_message_by_id(
 
     try:
         Messages.delete_message_by_id(message_id)
-        await sio.emit(
-            "channel-events",
+        await channel_event_emitter.emit(
             {
                 "channel_id": channel.id,
                 "message_id": message.id,
@@ -680,8 +665,7 @@ async def delete_message_by_id(
             parent_message = Messages.get_message_by_id(message.parent_id)
 
             if parent_message:
-                await sio.emit(
-                    "channel-events",
+                await channel_event_emitter.emit(
                     {
                         "channel_id": channel.id,
                         "message_id": parent_message.id,
@@ -1,3 +1,4 @@
+import asyncio
 import json
 import logging
 from typing import Optional
@@ -17,12 +18,18 @@ from open_webui.models.folders import Folders
 from open_webui.config import ENABLE_ADMIN_CHAT_ACCESS, ENABLE_ADMIN_EXPORT
 from open_webui.constants import ERROR_MESSAGES
 from open_webui.env import SRC_LOG_LEVELS
-from fastapi import APIRouter, Depends, HTTPException, Request, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
 from pydantic import BaseModel
 
 
 from open_webui.utils.auth import get_admin_user, get_verified_user
 from open_webui.utils.access_control import has_permission
+from open_webui.utils.files import (
+    copy_chat_images,
+    externalize_chat_images,
+    inline_chat_images,
+)
+from open_webui.utils.misc import CURSOR_PATTERN, parse_cursor
 
 log = logging.getLogger(__name__)
 log.setLevel(SRC_LOG_LEVELS["MODELS"])
@@ -37,9 +44,15 @@ router = APIRouter()
 @router.get("/", response_model=list[ChatTitleIdResponse])
 @router.get("/list", response_model=list[ChatTitleIdResponse])
 async def get_session_user_chat_list(
-    user=Depends(get_verified_user), page: Optional[int] = None
+    user=Depends(get_verified_user),
+    page: Optional[int] = None,
+    cursor: Optional[str] = Query(None, pattern=CURSOR_PATTERN),
 ):
-    if page is not None:
+    if cursor is not None:
+        return Chats.get_chat_title_id_list_by_user_id(
+            user.id, limit=60, cursor=parse_cursor(cursor)
+        )
+    elif page is not None:
         limit = 60
         skip = (page - 1) * limit
 
@@ -79,6 +92,7 @@ async def get_user_chat_list_by_user_id(
     user=Depends(get_admin_user),
     skip: int = 0,
     limit: int = 50,
+    cursor: Optional[str] = Query(None, pattern=CURSOR_PATTERN),
 ):
     if not ENABLE_ADMIN_CHAT_ACCESS:
         raise HTTPException(
@@ -86,7 +100,11 @@ async def get_user_chat_list_by_user_id(
             detail=ERROR_MESSAGES.ACCESS_PROHIBITED,
         )
     return Chats.get_chat_list_by_user_id(
-        user_id, include_archived=True, skip=skip, limit=limit
+        user_id,
+        include_archived=True,
+        skip=skip,
+        limit=limit,
+        cursor=parse_cursor(cursor),
     )
 
 
@@ -99,6 +117,10 @@ async def get_user_chat_list_by_user_id(
 async def create_new_chat(form_data: ChatForm, user=Depends(get_verified_user)):
     try:
         chat = Chats.insert_new_chat(user.id, form_data)
+        if await asyncio.to_thread(
+            externalize_chat_images, chat.chat, user.id, chat.id
+        ):
+            chat = Chats.update_chat_by_id(chat.id, chat.chat)
         return ChatResponse(**chat.model_dump())
     except Exception as e:
         log.exception(e)
@@ -117,6 +139,11 @@ async def import_chat(form_data: ChatImportForm, user=Depends(get_verified_user)
     try:
         chat = Chats.import_chat(user.id, form_data)
         if chat:
+            if await asyncio.to_thread(
+                externalize_chat_images, chat.chat, user.id, chat.id
+            ):
+                chat = Chats.update_chat_by_id(chat.id, chat.chat)
+
             tags = chat.meta.get("tags", [])
             for tag_id in tags:
                 tag_id = tag_id.replace(" ", "_").lower()
@@ -194,12 +221,9 @@ async def get_chats_by_folder_id(folder_id: str, user=Depends(get_verified_user)
 ############################
 
 
-@router.get("/pinned", response_model=list[ChatResponse])
+@router.get("/pinned", response_model=list[ChatTitleIdResponse])
 async def get_user_pinned_chats(user=Depends(get_verified_user)):
-    return [
-        ChatResponse(**chat.model_dump())
-        for chat in Chats.get_pinned_chats_by_user_id(user.id)
-    ]
+    return Chats.get_pinned_chats_by_user_id(user.id)
 
 
 ############################
@@ -207,12 +231,16 @@ async def get_user_pinned_chats(user=Depends(get_verified_user)):
 ############################
 
 
+async def get_export_chats(chats: list, user) -> list[ChatResponse]:
+    # Exports carry their images, file URLs don't resolve on other instances
+    for chat in chats:
+        await asyncio.to_thread(inline_chat_images, chat.chat, user)
+    return [ChatResponse(**chat.model_dump()) for chat in chats]
+
+
 @router.get("/all", response_model=list[ChatResponse])
 async def get_user_chats(user=Depends(get_verified_user)):
-    return [
-        ChatResponse(**chat.model_dump())
-        for chat in Chats.get_chats_by_user_id(user.id)
-    ]
+    return await get_export_chats(Chats.get_chats_by_user_id(user.id), user)
 
 
 ############################
@@ -222,10 +250,7 @@ async def get_user_chats(user=Depends(get_verified_user)):
 
 @router.get("/all/archived", response_model=list[ChatResponse])
 async def get_user_archived_chats(user=Depends(get_verified_user)):
-    return [
-        ChatResponse(**chat.model_dump())
-        for chat in Chats.get_archived_chats_by_user_id(user.id)
-    ]
+    return await get_export_chats(Chats.get_archived_chats_by_user_id(user.id), user)
 
 
 ############################
@@ -257,7 +282,7 @@ async def get_all_user_chats_in_db(user=Depends(get_admin_user)):
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail=ERROR_MESSAGES.ACCESS_PROHIBITED,
         )
-    return [ChatResponse(**chat.model_dump()) for chat in Chats.get_chats()]
+    return await get_export_chats(Chats.get_chats(), user)
 
 
 ############################
@@ -341,10 +366,14 @@ async def get_user_chat_list_by_tag_name(
 
 
 @router.get("/{id}", response_model=Optional[ChatResponse])
-async def get_chat_by_id(id: str, user=Depends(get_verified_user)):
+async def get_chat_by_id(
+    id: str, export: bool = False, user=Depends(get_verified_user)
+):
     chat = Chats.get_chat_by_id_and_user_id(id, user.id)
 
     if chat:
+        if export:
+            return (await get_export_chats([chat], user))[0]
         return ChatResponse(**chat.model_dump())
 
     else:
@@ -365,6 +394,7 @@ async def update_chat_by_id(
     chat = Chats.get_chat_by_id_and_user_id(id, user.id)
     if chat:
         updated_chat = {**chat.chat, **form_data.chat}
+        await asyncio.to_thread(externalize_chat_images, updated_chat, user.id, id)
         chat = Chats.update_chat_by_id(id, updated_chat)
         return ChatResponse(**chat.model_dump())
     else:
@@ -565,6 +595,8 @@ async def clone_chat_by_id(
         }
 
         chat = Chats.insert_new_chat(user.id, ChatForm(**{"chat": updated_chat}))
+        if await asyncio.to_thread(copy_chat_images, chat.chat, user, chat.id):
+            chat = Chats.update_chat_by_id(chat.id, chat.chat)
         return ChatResponse(**chat.model_dump())
     else:
         raise HTTPException(
@@ -594,6 +626,8 @@ async def clone_shared_chat_by_id(id: str, user=Depends(get_verified_user)):
         }
 
         chat = Chats.insert_new_chat(user.id, ChatForm(**{"chat": updated_chat}))
+        if await asyncio.to_thread(copy_chat_images, chat.chat, user, chat.id):
+            chat = Chats.update_chat_by_id(chat.id, chat.chat)
         return ChatResponse(**chat.model_dump())
     else:
         raise HTTPException(
@@ -25,6 +25,7 @@ from open_webui.models.files import (
     FileModelResponse,
     Files,
 )
+from open_webui.models.chats import Chats
 from open_webui.models.knowledge import Knowledges
 
 from open_webui.routers.knowledge import get_knowledge, get_knowledge_list
@@ -32,6 +33,7 @@ from open_webui.routers.retrieval import ProcessFileForm, process_file
 from open_webui.routers.audio import transcribe
 from open_webui.storage.provider import Storage
 from open_webui.utils.auth import get_admin_user, get_verified_user
+from open_webui.utils.misc import CURSOR_PATTERN, parse_cursor
 from pydantic import BaseModel
 
 log = logging.getLogger(__name__)
@@ -59,6 +61,12 @@ def has_access_to_file(
         )
 
     has_access = False
+
+    # Images moved out of chats stay readable while one of those chats is shared
+    chat_ids = file.meta.get("chat_ids") if file.meta else None
+    if access_type == "read" and chat_ids and Chats.has_shared_chat_by_ids(chat_ids):
+        return True
+
     knowledge_base_id = file.meta.get("collection_name") if file.meta else None
 
     if knowledge_base_id:
@@ -165,11 +173,18 @@ def upload_file(
 
 
 @router.get("/", response_model=list[FileModelResponse])
-async def list_files(user=Depends(get_verified_user), content: bool = Query(True)):
+async def list_files(
+    user=Depends(get_verified_user),
+    content: bool = Query(True),
+    limit: Optional[int] = None,
+    cursor: Optional[str] = Query(None, pattern=CURSOR_PATTERN),
+):
     if user.role == "admin":
-        files = Files.get_files()
+        files = Files.get_files(limit=limit, cursor=parse_cursor(cursor))
     else:
-        files = Files.get_files_by_user_id(user.id)
+        files = Files.get_files_by_user_id(
+            user.id, limit=limit, cursor=parse_cursor(cursor)
+        )
 
     if not content:
         for file in files:
@@ -9,7 +9,12 @@ from open_webui.models.functions import (
     FunctionResponse,
     Functions,
 )
-from open_webui.utils.plugin import load_function_module_by_id, replace_imports
+from open_webui.utils.plugin import (
+    broadcast_plugin_update,
+    invalidate_plugin,
+    load_function_module_by_id,
+    replace_imports,
+)
 from open_webui.config import CACHE_DIR
 from open_webui.constants import ERROR_MESSAGES
 from fastapi import APIRouter, Depends, HTTPException, Request, status
@@ -194,6 +199,7 @@ async def update_function_by_id(
         function = Functions.update_function_by_id(id, updated)
 
         if function:
+            await broadcast_plugin_update("function", id)
             return function
         else:
             raise HTTPException(
@@ -220,9 +226,8 @@ async def delete_function_by_id(
     result = Functions.delete_function_by_id(id)
 
     if result:
-        FUNCTIONS = request.app.state.FUNCTIONS
-        if id in FUNCTIONS:
-            del FUNCTIONS[id]
+        invalidate_plugin(request.app, "function", id)
+        await broadcast_plugin_update("function", id)
 
     return result
 
@@ -6,7 +6,7 @@ import logging
 import mimetypes
 import re
 from pathlib import Path
-from typing import Optional
+from typing import BinaryIO, Callable, Optional
 
 import requests
 from fastapi import APIRouter, Depends, HTTPException, Request, UploadFile
@@ -14,11 +14,17 @@ from open_webui.config import CACHE_DIR
 from open_webui.constants import ERROR_MESSAGES
 from open_webui.env import ENABLE_FORWARD_USER_INFO_HEADERS, SRC_LOG_LEVELS
 from open_webui.routers.files import upload_file
+from open_webui.tasks import create_task
 from open_webui.utils.auth import get_admin_user, get_verified_user
+from open_webui.utils.images.client import (
+    get_image_generation_client,
+    get_image_generation_metrics,
+)
 from open_webui.utils.images.comfyui import (
     ComfyUIGenerateImageForm,
     ComfyUIWorkflow,
     comfyui_generate_image,
+    get_comfyui_client,
 )
 from pydantic import BaseModel
 
@@ -450,10 +456,10 @@ def load_url_image_data(url, headers=None):
         return None
 
 
-def upload_image(request, image_metadata, image_data, content_type, user):
+def upload_image(request, image_metadata, image_data: BinaryIO, content_type, user):
     image_format = mimetypes.guess_extension(content_type)
     file = UploadFile(
-        file=io.BytesIO(image_data),
+        file=image_data,
         filename=f"generated-image{image_format}",  # will be converted to a unique ID on upload_file
         headers={
             "content-type": content_type,
@@ -464,11 +470,70 @@ def upload_image(request, image_metadata, image_data, content_type, user):
     return url
 
 
+@router.get("/jobs")
+async def get_image_generation_jobs(user=Depends(get_admin_user)):
+    return get_image_generation_metrics()
+
+
+async def run_image_generation(coroutine, chat_id: Optional[str] = None):
+    """
+    Runs a generation as a task of the chat, so stopping the chat's tasks
+    cancels the generation and the job it holds on the image server.
+    """
+    if not chat_id:
+        return await coroutine
+
+    _, task = create_task(coroutine, id=chat_id)
+    try:
+        return await task
+    except asyncio.CancelledError:
+        if asyncio.current_task().cancelling():
+            raise
+        raise Exception("Image generation was stopped.")
+
+
+async def upload_image_from_url(request, client, url, image_metadata, user):
+    file, content_type = await client.download(url)
+    with file:
+        return await asyncio.to_thread(
+            upload_image, request, image_metadata, file, content_type, user
+        )
+
+
+async def automatic1111_generate_image(request: Request, data: dict, user):
+    client = get_image_generation_client(
+        request.app.state.config.AUTOMATIC1111_BASE_URL,
+        {"authorization": get_automatic1111_api_auth(request)},
+        # Automatic1111 runs one generation at a time and /interrupt stops
+        # whichever is running, so only ever send it one job
+        max_concurrent=1,
+    )
+    async with client.job(user.id):
+        try:
+            return await client.post_json("/sdapi/v1/txt2img", json=data)
+        except asyncio.CancelledError:
+            try:
+                await client.post_json("/sdapi/v1/interrupt")
+            except Exception as e:
+                log.warning(f"Could not interrupt Automatic1111 generation: {e}")
+            raise
+
+
 @router.post("/generations")
 async def image_generations(
     request: Request,
     form_data: GenerateImageForm,
     user=Depends(get_verified_user),
+):
+    return await generate_images(request, form_data, user)
+
+
+async def generate_images(
+    request: Request,
+    form_data: GenerateImageForm,
+    user,
+    event_emitter: Optional[Callable] = None,
+    chat_id: Optional[str] = None,
 ):
     width, height = tuple(map(int, request.app.state.config.IMAGE_SIZE.split("x")))
 
@@ -522,7 +587,9 @@ async def image_generations(
                 else:
                     image_data, content_type = load_b64_image_data(image["b64_json"])
 
-                url = upload_image(request, data, image_data, content_type, user)
+                url = upload_image(
+                    request, data, io.BytesIO(image_data), content_type, user
+                )
                 images.append({"url": url})
             return images
 
@@ -556,7 +623,9 @@ async def image_generations(
                 image_data, content_type = load_b64_image_data(
                     image["bytesBase64Encoded"]
                 )
-                url = upload_image(request, data, image_data, content_type, user)
+                url = upload_image(
+                    request, data, io.BytesIO(image_data), content_type, user
+                )
                 images.append({"url": url})
 
             return images
@@ -586,30 +655,32 @@ async def image_generations(
                     **data,
                 }
             )
-            res = await comfyui_generate_image(
-                request.app.state.config.IMAGE_GENERATION_MODEL,
-                form_data,
-                user.id,
+            res = await run_image_generation(
+                comfyui_generate_image(
+                    request.app.state.config.IMAGE_GENERATION_MODEL,
+                    form_data,
+                    user.id,
+                    request.app.state.config.COMFYUI_BASE_URL,
+                    request.app.state.config.COMFYUI_API_KEY,
+                    event_emitter=event_emitter,
+                ),
+                chat_id,
+            )
+            log.debug(f"res: {res}")
+
+            client = get_comfyui_client(
                 request.app.state.config.COMFYUI_BASE_URL,
                 request.app.state.config.COMFYUI_API_KEY,
             )
-            log.debug(f"res: {res}")
 
             images = []
 
             for image in res["data"]:
-                headers = None
-                if request.app.state.config.COMFYUI_API_KEY:
-                    headers = {
-                        "Authorization": f"Bearer {request.app.state.config.COMFYUI_API_KEY}"
-                    }
-
-                image_data, content_type = load_url_image_data(image["url"], headers)
-                url = upload_image(
+                url = await upload_image_from_url(
                     request,
+                    client,
+                    image["url"],
                     form_data.model_dump(exclude_none=True),
-                    image_data,
-                    content_type,
                     user,
                 )
                 images.append({"url": url})
@@ -619,7 +690,7 @@ async def image_generations(
             or request.app.state.config.IMAGE_GENERATION_ENGINE == ""
         ):
             if form_data.model:
-                set_image_model(form_data.model)
+                await asyncio.to_thread(set_image_model, request, form_data.model)
 
             data = {
                 "prompt": form_data.prompt,
@@ -643,25 +714,20 @@ async def image_generations(
             if request.app.state.config.AUTOMATIC1111_SCHEDULER:
                 data["scheduler"] = request.app.state.config.AUTOMATIC1111_SCHEDULER
 
-            # Use asyncio.to_thread for the requests.post call
-            r = await asyncio.to_thread(
-                requests.post,
-                url=f"{request.app.state.config.AUTOMATIC1111_BASE_URL}/sdapi/v1/txt2img",
-                json=data,
-                headers={"authorization": get_automatic1111_api_auth(request)},
+            res = await run_image_generation(
+                automatic1111_generate_image(request, data, user), chat_id
             )
-
-            res = r.json()
             log.debug(f"res: {res}")
 
             images = []
 
             for image in res["images"]:
                 image_data, content_type = load_b64_image_data(image)
-                url = upload_image(
+                url = await asyncio.to_thread(
+                    upload_image,
                     request,
                     {**data, "info": res["info"]},
-                    image_data,
+                    io.BytesIO(image_data),
                     content_type,
                     user,
                 )
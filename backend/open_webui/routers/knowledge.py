@@ -1,6 +1,6 @@
 from typing import List, Optional
 from pydantic import BaseModel
-from fastapi import APIRouter, Depends, HTTPException, status, Request
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, status, Request
 import logging
 
 from open_webui.models.knowledge import (
@@ -9,6 +9,7 @@ from open_webui.models.knowledge import (
     KnowledgeResponse,
     KnowledgeUserResponse,
 )
+from open_webui.models.chunks import Chunks
 from open_webui.models.files import Files, FileModel
 from open_webui.retrieval.vector.connector import VECTOR_DB_CLIENT
 from open_webui.routers.retrieval import (
@@ -38,99 +39,87 @@ router = APIRouter()
 ############################
 
 
-@router.get("/", response_model=list[KnowledgeUserResponse])
-async def get_knowledge(user=Depends(get_verified_user)):
-    knowledge_bases = []
+def reconcile_knowledge_files(knowledge_ids: list[str]):
+    # Drop references to files that no longer exist
+    for knowledge in Knowledges.get_knowledge_by_ids(knowledge_ids):
+        data = knowledge.data or {}
+        file_ids = data.get("file_ids", [])
+        existing_file_ids = Files.get_existing_file_ids(file_ids)
 
-    if user.role == "admin":
-        knowledge_bases = Knowledges.get_knowledge_bases()
-    else:
-        knowledge_bases = Knowledges.get_knowledge_bases_by_user_id(user.id, "read")
+        if len(existing_file_ids) != len(set(file_ids)):
+            data["file_ids"] = [id for id in file_ids if id in existing_file_ids]
+            Knowledges.update_knowledge_data_by_id(id=knowledge.id, data=data)
+
+
+def get_knowledge_bases_with_files(
+    knowledge_bases, background_tasks: BackgroundTasks
+) -> list[KnowledgeUserResponse]:
+    # Fetch the files of all knowledge bases in one query
+    file_ids = {
+        file_id
+        for knowledge_base in knowledge_bases
+        for file_id in (knowledge_base.data or {}).get("file_ids", [])
+    }
+    files = {file.id: file for file in Files.get_file_metadatas_by_ids(list(file_ids))}
+
+    # Files come back newest first, keep that order within each knowledge base
+    file_order = {id: idx for idx, id in enumerate(files)}
 
-    # Get files for each knowledge base
     knowledge_with_files = []
+    missing_knowledge_ids = []
     for knowledge_base in knowledge_bases:
-        files = []
+        knowledge_files = []
         if knowledge_base.data:
-            files = Files.get_file_metadatas_by_ids(
-                knowledge_base.data.get("file_ids", [])
-            )
-
-            # Check if all files exist
-            if len(files) != len(knowledge_base.data.get("file_ids", [])):
-                missing_files = list(
-                    set(knowledge_base.data.get("file_ids", []))
-                    - set([file.id for file in files])
+            knowledge_file_ids = set(knowledge_base.data.get("file_ids", []))
+            knowledge_files = [
+                files[id]
+                for id in sorted(
+                    knowledge_file_ids & files.keys(), key=file_order.__getitem__
                 )
-                if missing_files:
-                    data = knowledge_base.data or {}
-                    file_ids = data.get("file_ids", [])
-
-                    for missing_file in missing_files:
-                        file_ids.remove(missing_file)
+            ]
 
-                    data["file_ids"] = file_ids
-                    Knowledges.update_knowledge_data_by_id(
-                        id=knowledge_base.id, data=data
-                    )
-
-                    files = Files.get_file_metadatas_by_ids(file_ids)
+            if len(knowledge_files) != len(knowledge_file_ids):
+                missing_knowledge_ids.append(knowledge_base.id)
 
         knowledge_with_files.append(
             KnowledgeUserResponse(
                 **knowledge_base.model_dump(),
-                files=files,
+                files=knowledge_files,
             )
         )
 
+    if missing_knowledge_ids:
+        background_tasks.add_task(reconcile_knowledge_files, missing_knowledge_ids)
+
     return knowledge_with_files
 
 
-@router.get("/list", response_model=list[KnowledgeUserResponse])
-async def get_knowledge_list(user=Depends(get_verified_user)):
+@router.get("/", response_model=list[KnowledgeUserResponse])
+async def get_knowledge(
+    background_tasks: BackgroundTasks, user=Depends(get_verified_user)
+):
     knowledge_bases = []
 
     if user.role == "admin":
         knowledge_bases = Knowledges.get_knowledge_bases()
     else:
-        knowledge_bases = Knowledges.get_knowledge_bases_by_user_id(user.id, "write")
+        knowledge_bases = Knowledges.get_knowledge_bases_by_user_id(user.id, "read")
 
-    # Get files for each knowledge base
-    knowledge_with_files = []
-    for knowledge_base in knowledge_bases:
-        files = []
-        if knowledge_base.data:
-            files = Files.get_file_metadatas_by_ids(
-                knowledge_base.data.get("file_ids", [])
-            )
+    return get_knowledge_bases_with_files(knowledge_bases, background_tasks)
 
-            # Check if all files exist
-            if len(files) != len(knowledge_base.data.get("file_ids", [])):
-                missing_files = list(
-                    set(knowledge_base.data.get("file_ids", []))
-                    - set([file.id for file in files])
-                )
-                if missing_files:
-                    data = knowledge_base.data or {}
-                    file_ids = data.get("file_ids", [])
 
-                    for missing_file in missing_files:
-                        file_ids.remove(missing_file)
-
-                    data["file_ids"] = file_ids
-                    Knowledges.update_knowledge_data_by_id(
-                        id=knowledge_base.id, data=data
-                    )
+@router.get("/list", response_model=list[KnowledgeUserResponse])
+async def get_knowledge_list(
+    background_tasks: BackgroundTasks, user=Depends(get_verified_user)
+):
+    knowledge_bases = []
 
-                    files = Files.get_file_metadatas_by_ids(file_ids)
+    if user.role == "admin":
+        knowledge_bases = Knowledges.get_knowledge_bases()
+    else:
+        knowledge_bases = Knowledges.get_knowledge_bases_by_user_id(user.id, "write")
 
-        knowledge_with_files.append(
-            KnowledgeUserResponse(
-                **knowledge_base.model_dump(),
-                files=files,
-            )
-        )
-    return knowledge_with_files
+    return get_knowledge_bases_with_files(knowledge_bases, background_tasks)
 
 
 ############################
@@ -187,6 +176,7 @@ async def reindex_knowledge_files(request: Request, user=Depends(get_verified_us
                     VECTOR_DB_CLIENT.delete_collection(
                         collection_name=knowledge_base.id
                     )
+                    Chunks.delete_references(knowledge_base.id)
             except Exception as e:
                 log.error(f"Error deleting collection {knowledge_base.id}: {str(e)}")
                 raise HTTPException(
@@ -438,6 +428,7 @@ def update_file_from_knowledge_by_id(
     VECTOR_DB_CLIENT.delete(
         collection_name=knowledge.id, filter={"file_id": form_data.file_id}
     )
+    Chunks.delete_references(knowledge.id, form_data.file_id)
 
     # Add content to the vector database
     try:
@@ -509,6 +500,7 @@ def remove_file_from_knowledge_by_id(
         VECTOR_DB_CLIENT.delete(
             collection_name=knowledge.id, filter={"file_id": form_data.file_id}
         )
+        Chunks.delete_references(knowledge.id, form_data.file_id)
     except Exception as e:
         log.debug("This was most likely caused by bypassing embedding processing")
         log.debug(e)
@@ -519,6 +511,7 @@ def remove_file_from_knowledge_by_id(
         file_collection = f"file-{form_data.file_id}"
         if VECTOR_DB_CLIENT.has_collection(collection_name=file_collection):
             VECTOR_DB_CLIENT.delete_collection(collection_name=file_collection)
+            Chunks.delete_references(file_collection)
     except Exception as e:
         log.debug("This was most likely caused by bypassing embedding processing")
         log.debug(e)
@@ -617,6 +610,7 @@ async def delete_knowledge_by_id(id: str, user=Depends(get_verified_user)):
     # Clean up vector DB
     try:
         VECTOR_DB_CLIENT.delete_collection(collection_name=id)
+        Chunks.delete_references(id)
     except Exception as e:
         log.debug(e)
         pass
@@ -650,6 +644,7 @@ async def reset_knowledge_by_id(id: str, user=Depends(get_verified_user)):
 
     try:
         VECTOR_DB_CLIENT.delete_collection(collection_name=id)
+        Chunks.delete_references(id)
     except Exception as e:
         log.debug(e)
         pass
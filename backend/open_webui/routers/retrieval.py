@@ -1,3 +1,5 @@
+import collections
+import itertools
 import json
 import logging
 import mimetypes
@@ -5,7 +7,6 @@ import os
 import shutil
 
 import uuid
-from datetime import datetime
 from pathlib import Path
 from typing import Iterator, List, Optional, Sequence, Union
 
@@ -23,12 +24,10 @@ from fastapi import (
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.concurrency import run_in_threadpool
 from pydantic import BaseModel
-import tiktoken
 
-
-from langchain.text_splitter import RecursiveCharacterTextSplitter, TokenTextSplitter
 from langchain_core.documents import Document
 
+from open_webui.models.chunks import Chunks, ChunkStatsResponse, calculate_chunk_hash
 from open_webui.models.files import FileModel, Files
 from open_webui.models.knowledge import Knowledges
 from open_webui.storage.provider import Storage
@@ -62,6 +61,7 @@ from open_webui.retrieval.web.exa import search_exa
 from open_webui.retrieval.web.perplexity import search_perplexity
 from open_webui.retrieval.web.sougou import search_sougou
 
+from open_webui.retrieval.splitters.main import get_text_splitter, sanitize_metadata
 from open_webui.retrieval.utils import (
     get_embedding_function,
     get_model_path,
@@ -85,6 +85,7 @@ from open_webui.config import (
     DEFAULT_LOCALE,
     RAG_EMBEDDING_CONTENT_PREFIX,
     RAG_EMBEDDING_QUERY_PREFIX,
+    ENABLE_RAG_CHUNK_DEDUPLICATION,
 )
 from open_webui.env import (
     SRC_LOG_LEVELS,
@@ -96,6 +97,9 @@ from open_webui.constants import ERROR_MESSAGES
 log = logging.getLogger(__name__)
 log.setLevel(SRC_LOG_LEVELS["RAG"])
 
+# Number of chunks handed to the embedding function at a time while splitting
+EMBEDDING_STREAM_BATCH_SIZE = 64
+
 ##########################################
 #
 # Utility functions
@@ -835,58 +839,63 @@ def save_docs_to_vector_db(
                 log.info(f"Document with hash {metadata['hash']} already exists")
                 raise ValueError(ERROR_MESSAGES.DUPLICATE_CONTENT)
 
-    if split:
-        if request.app.state.config.TEXT_SPLITTER in ["", "character"]:
-            text_splitter = RecursiveCharacterTextSplitter(
-                chunk_size=request.app.state.config.CHUNK_SIZE,
-                chunk_overlap=request.app.state.config.CHUNK_OVERLAP,
-                add_start_index=True,
-            )
-        elif request.app.state.config.TEXT_SPLITTER == "token":
-            log.info(
-                f"Using token text splitter: {request.app.state.config.TIKTOKEN_ENCODING_NAME}"
-            )
-
-            tiktoken.get_encoding(str(request.app.state.config.TIKTOKEN_ENCODING_NAME))
-            text_splitter = TokenTextSplitter(
-                encoding_name=str(request.app.state.config.TIKTOKEN_ENCODING_NAME),
-                chunk_size=request.app.state.config.CHUNK_SIZE,
-                chunk_overlap=request.app.state.config.CHUNK_OVERLAP,
-                add_start_index=True,
-            )
-        else:
-            raise ValueError(ERROR_MESSAGES.DEFAULT("Invalid text splitter"))
-
-        docs = text_splitter.split_documents(docs)
-
-    if len(docs) == 0:
-        raise ValueError(ERROR_MESSAGES.EMPTY_CONTENT)
+    embedding_config = json.dumps(
+        {
+            "engine": request.app.state.config.RAG_EMBEDDING_ENGINE,
+            "model": request.app.state.config.RAG_EMBEDDING_MODEL,
+        }
+    )
 
-    texts = [doc.page_content for doc in docs]
-    metadatas = [
+    # Everything that changes a chunk's vector, reused vectors must match it
+    chunk_embedding_config = json.dumps(
         {
-            **doc.metadata,
-            **(metadata if metadata else {}),
-            "embedding_config": json.dumps(
-                {
-                    "engine": request.app.state.config.RAG_EMBEDDING_ENGINE,
-                    "model": request.app.state.config.RAG_EMBEDDING_MODEL,
-                }
+            "engine": request.app.state.config.RAG_EMBEDDING_ENGINE,
+            "model": request.app.state.config.RAG_EMBEDDING_MODEL,
+            "url": (
+                request.app.state.config.RAG_OPENAI_API_BASE_URL
+                if request.app.state.config.RAG_EMBEDDING_ENGINE == "openai"
+                else (
+                    request.app.state.config.RAG_OLLAMA_BASE_URL
+                    if request.app.state.config.RAG_EMBEDDING_ENGINE == "ollama"
+                    else None
+                )
             ),
+            "prefix": RAG_EMBEDDING_CONTENT_PREFIX,
         }
-        for doc in docs
-    ]
+    )
 
-    # ChromaDB does not like datetime formats
-    # for meta-data so convert them to string.
-    for metadata in metadatas:
-        for key, value in metadata.items():
-            if (
-                isinstance(value, datetime)
-                or isinstance(value, list)
-                or isinstance(value, dict)
-            ):
-                metadata[key] = str(value)
+    def _build_metadata(doc_metadata: dict) -> dict:
+        # Built once per source document and shared by all of its chunks
+        return sanitize_metadata(
+            {
+                **doc_metadata,
+                **(metadata if metadata else {}),
+                "embedding_config": embedding_config,
+            }
+        )
+
+    if split:
+        text_splitter = get_text_splitter(
+            request.app.state.config.TEXT_SPLITTER,
+            chunk_size=request.app.state.config.CHUNK_SIZE,
+            chunk_overlap=request.app.state.config.CHUNK_OVERLAP,
+            encoding_name=request.app.state.config.TIKTOKEN_ENCODING_NAME,
+        )
+        chunks = text_splitter.split_documents(docs, metadata_fn=_build_metadata)
+    else:
+        chunks = (
+            Document(
+                page_content=doc.page_content, metadata=_build_metadata(doc.metadata)
+            )
+            for doc in docs
+        )
+
+    # Peek at the first chunk so empty content is rejected before
+    # the existing collection is touched
+    first_chunk = next(chunks, None)
+    if first_chunk is None:
+        raise ValueError(ERROR_MESSAGES.EMPTY_CONTENT)
+    chunks = itertools.chain([first_chunk], chunks)
 
     try:
         if VECTOR_DB_CLIENT.has_collection(collection_name=collection_name):
@@ -894,6 +903,7 @@ def save_docs_to_vector_db(
 
             if overwrite:
                 VECTOR_DB_CLIENT.delete_collection(collection_name=collection_name)
+                Chunks.delete_references(collection_name)
                 log.info(f"deleting existing collection {collection_name}")
             elif add is False:
                 log.info(
@@ -919,21 +929,67 @@ def save_docs_to_vector_db(
             request.app.state.config.RAG_EMBEDDING_BATCH_SIZE,
         )
 
-        embeddings = embedding_function(
-            list(map(lambda x: x.replace("\n", " "), texts)),
-            prefix=RAG_EMBEDDING_CONTENT_PREFIX,
-            user=user,
+        # Embed chunks batch by batch as the splitter produces them, the
+        # embedding function still splits each batch by RAG_EMBEDDING_BATCH_SIZE
+        batch_size = max(
+            int(request.app.state.config.RAG_EMBEDDING_BATCH_SIZE),
+            EMBEDDING_STREAM_BATCH_SIZE,
         )
 
-        items = [
-            {
-                "id": str(uuid.uuid4()),
-                "text": text,
-                "vector": embeddings[idx],
-                "metadata": metadatas[idx],
-            }
-            for idx, text in enumerate(texts)
-        ]
+        items = []
+        for batch in iter(lambda: list(itertools.islice(chunks, batch_size)), []):
+            if ENABLE_RAG_CHUNK_DEDUPLICATION and Chunks.is_supported():
+                # Chunks are content-addressed, identical chunks across files,
+                # collections and users are only ever embedded once
+                hashes = [
+                    calculate_chunk_hash(doc.page_content, chunk_embedding_config)
+                    for doc in batch
+                ]
+                vectors = Chunks.get_vectors_by_ids(hashes)
+
+                missing = {}
+                for chunk_hash, doc in zip(hashes, batch):
+                    if chunk_hash not in vectors:
+                        missing.setdefault(chunk_hash, doc.page_content)
+
+                new_vectors = {}
+                if missing:
+                    embeddings = embedding_function(
+                        [text.replace("\n", " ") for text in missing.values()],
+                        prefix=RAG_EMBEDDING_CONTENT_PREFIX,
+                        user=user,
+                    )
+                    new_vectors = dict(zip(missing.keys(), embeddings))
+                    vectors.update(new_vectors)
+
+                log.debug(
+                    f"save_docs_to_vector_db: embedded {len(missing)} of {len(batch)} chunks"
+                )
+                Chunks.upsert_chunks(
+                    chunk_embedding_config,
+                    vectors,
+                    collections.Counter(hashes),
+                    collection_name,
+                    (metadata or {}).get("file_id", ""),
+                )
+
+                embeddings = [vectors[chunk_hash] for chunk_hash in hashes]
+            else:
+                embeddings = embedding_function(
+                    [doc.page_content.replace("\n", " ") for doc in batch],
+                    prefix=RAG_EMBEDDING_CONTENT_PREFIX,
+                    user=user,
+                )
+
+            items.extend(
+                {
+                    "id": str(uuid.uuid4()),
+                    "text": doc.page_content,
+                    "vector": embeddings[idx],
+                    "metadata": doc.metadata,
+                }
+                for idx, doc in enumerate(batch)
+            )
 
         VECTOR_DB_CLIENT.insert(
             collection_name=collection_name,
@@ -973,6 +1029,7 @@ def process_file(
             try:
                 # /files/{file_id}/data/content/update
                 VECTOR_DB_CLIENT.delete_collection(collection_name=f"file-{file.id}")
+                Chunks.delete_references(f"file-{file.id}")
             except:
                 # Audio file upload pipeline
                 pass
@@ -1679,6 +1736,7 @@ def delete_entries_from_collection(form_data: DeleteForm, user=Depends(get_admin
                 collection_name=form_data.collection_name,
                 metadata={"hash": hash},
             )
+            Chunks.delete_references(form_data.collection_name, form_data.file_id)
             return {"status": True}
         else:
             return {"status": False}
@@ -1687,10 +1745,46 @@ def delete_entries_from_collection(form_data: DeleteForm, user=Depends(get_admin
         return {"status": False}
 
 
+@router.get("/vector/index")
+def get_vector_index_status(user=Depends(get_admin_user)):
+    status_data = VECTOR_DB_CLIENT.get_index_status()
+    if status_data is None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=ERROR_MESSAGES.DEFAULT("Vector index management is not supported"),
+        )
+    return status_data
+
+
+@router.post("/vector/index/rebuild")
+def rebuild_vector_index(user=Depends(get_admin_user)):
+    try:
+        status_data = VECTOR_DB_CLIENT.rebuild_vector_index()
+    except Exception as e:
+        log.exception(e)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=ERROR_MESSAGES.DEFAULT(e),
+        )
+
+    if status_data is None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=ERROR_MESSAGES.DEFAULT("Vector index management is not supported"),
+        )
+    return status_data
+
+
+@router.get("/chunks/stats", response_model=ChunkStatsResponse)
+def get_chunk_stats(user=Depends(get_admin_user)):
+    return Chunks.get_stats()
+
+
 @router.post("/reset/db")
 def reset_vector_db(user=Depends(get_admin_user)):
     VECTOR_DB_CLIENT.reset()
     Knowledges.delete_all_knowledge()
+    Chunks.delete_all_chunks()
 
 
 @router.post("/reset/uploads")
@@ -10,11 +10,16 @@ from open_webui.models.tools import (
     ToolUserResponse,
     Tools,
 )
-from open_webui.utils.plugin import load_tool_module_by_id, replace_imports
+from open_webui.utils.plugin import (
+    broadcast_plugin_update,
+    invalidate_plugin,
+    load_tool_module_by_id,
+    replace_imports,
+)
 from open_webui.config import CACHE_DIR
 from open_webui.constants import ERROR_MESSAGES
 from fastapi import APIRouter, Depends, HTTPException, Request, status
-from open_webui.utils.tools import get_tool_specs
+from open_webui.utils.tools import get_tool_specs, invalidate_tool_spec_cache
 from open_webui.utils.auth import get_admin_user, get_verified_user
 from open_webui.utils.access_control import has_access, has_permission
 from open_webui.env import SRC_LOG_LEVELS
@@ -35,14 +40,11 @@ router = APIRouter()
 @router.get("/", response_model=list[ToolUserResponse])
 async def get_tools(request: Request, user=Depends(get_verified_user)):
 
-    if not request.app.state.TOOL_SERVERS:
-        # If the tool servers are not set, we need to set them
-        # This is done only once when the server starts
-        # This is done to avoid loading the tool servers every time
-
-        request.app.state.TOOL_SERVERS = await get_tool_servers_data(
-            request.app.state.config.TOOL_SERVER_CONNECTIONS
-        )
+    # Specs are served from cache and refreshed in the background once stale,
+    # so this only waits on servers that have never been fetched
+    request.app.state.TOOL_SERVERS = await get_tool_servers_data(
+        request.app.state.config.TOOL_SERVER_CONNECTIONS
+    )
 
     tools = Tools.get_tools()
     for server in request.app.state.TOOL_SERVERS:
@@ -231,6 +233,7 @@ async def update_tools_by_id(
 
         TOOLS = request.app.state.TOOLS
         TOOLS[id] = tool_module
+        invalidate_tool_spec_cache(id)
 
         specs = get_tool_specs(TOOLS[id])
 
@@ -243,6 +246,7 @@ async def update_tools_by_id(
         tools = Tools.update_tool_by_id(id, updated)
 
         if tools:
+            await broadcast_plugin_update("tool", id)
             return tools
         else:
             raise HTTPException(
@@ -285,9 +289,9 @@ async def delete_tools_by_id(
 
     result = Tools.delete_tool_by_id(id)
     if result:
-        TOOLS = request.app.state.TOOLS
-        if id in TOOLS:
-            del TOOLS[id]
+        invalidate_plugin(request.app, "tool", id)
+        invalidate_tool_spec_cache(id)
+        await broadcast_plugin_update("tool", id)
 
     return result
 
@@ -387,6 +391,7 @@ async def update_tools_valves_by_id(
         form_data = {k: v for k, v in form_data.items() if v is not None}
         valves = Valves(**form_data)
         Tools.update_tool_valves_by_id(id, valves.model_dump())
+        invalidate_tool_spec_cache(id)
         return valves.model_dump()
     except Exception as e:
         log.exception(f"Failed to update tool valves by id {id}: {e}")
@@ -16,11 +16,12 @@ from open_webui.models.users import (
 from open_webui.socket.main import get_active_status_by_user_id
 from open_webui.constants import ERROR_MESSAGES
 from open_webui.env import SRC_LOG_LEVELS
-from fastapi import APIRouter, Depends, HTTPException, Request, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
 from pydantic import BaseModel
 
 from open_webui.utils.auth import get_admin_user, get_password_hash, get_verified_user
 from open_webui.utils.access_control import get_permissions
+from open_webui.utils.misc import CURSOR_PATTERN, parse_cursor
 
 
 log = logging.getLogger(__name__)
@@ -37,9 +38,10 @@ router = APIRouter()
 async def get_users(
     skip: Optional[int] = None,
     limit: Optional[int] = None,
+    cursor: Optional[str] = Query(None, pattern=CURSOR_PATTERN),
     user=Depends(get_admin_user),
 ):
-    return Users.get_users(skip, limit)
+    return Users.get_users(skip, limit, cursor=parse_cursor(cursor))
 
 
 ############################
@@ -20,9 +20,16 @@ from open_webui.env import (
     WEBSOCKET_REDIS_LOCK_TIMEOUT,
     WEBSOCKET_SENTINEL_PORT,
     WEBSOCKET_SENTINEL_HOSTS,
+    WEBSOCKET_PRESENCE_BROADCAST_INTERVAL,
+    CHAT_EVENT_FRAME_INTERVAL,
 )
 from open_webui.utils.auth import decode_token
-from open_webui.socket.utils import RedisDict, RedisLock
+from open_webui.socket.utils import (
+    LocalPresence,
+    RedisDict,
+    RedisLock,
+    RedisPresence,
+)
 
 from open_webui.env import (
     GLOBAL_LOG_LEVEL,
@@ -77,13 +84,8 @@ if WEBSOCKET_MANAGER == "redis":
         redis_url=WEBSOCKET_REDIS_URL,
         redis_sentinels=redis_sentinels,
     )
-    USER_POOL = RedisDict(
-        "open-webui:user_pool",
-        redis_url=WEBSOCKET_REDIS_URL,
-        redis_sentinels=redis_sentinels,
-    )
-    USAGE_POOL = RedisDict(
-        "open-webui:usage_pool",
+    PRESENCE = RedisPresence(
+        "open-webui:presence",
         redis_url=WEBSOCKET_REDIS_URL,
         redis_sentinels=redis_sentinels,
     )
@@ -99,8 +101,7 @@ if WEBSOCKET_MANAGER == "redis":
     release_func = clean_up_lock.release_lock
 else:
     SESSION_POOL = {}
-    USER_POOL = {}
-    USAGE_POOL = {}
+    PRESENCE = LocalPresence()
     aquire_func = release_func = renew_func = lambda: True
 
 
@@ -115,36 +116,71 @@ async def periodic_usage_pool_cleanup():
                 log.error(f"Unable to renew cleanup lock. Exiting usage pool cleanup.")
                 raise Exception("Unable to renew usage pool cleanup lock.")
 
+            # Drop sessions whose last heartbeat is older than the timeout
             now = int(time.time())
-            send_usage = False
-            for model_id, connections in list(USAGE_POOL.items()):
-                # Creating a list of sids to remove if they have timed out
-                expired_sids = [
-                    sid
-                    for sid, details in connections.items()
-                    if now - details["updated_at"] > TIMEOUT_DURATION
-                ]
-
-                for sid in expired_sids:
-                    del connections[sid]
-
-                if not connections:
-                    log.debug(f"Cleaning up model {model_id} from usage pool")
-                    del USAGE_POOL[model_id]
-                else:
-                    USAGE_POOL[model_id] = connections
-
-                send_usage = True
-
-            if send_usage:
-                # Emit updated usage information after cleaning
-                await sio.emit("usage", {"models": get_models_in_use()})
+            for model_id in PRESENCE.expire(now - TIMEOUT_DURATION - 1):
+                log.debug(f"Cleaning up model {model_id} from usage pool")
+                presence_broadcaster.model_changed(model_id, False)
 
             await asyncio.sleep(TIMEOUT_DURATION)
     finally:
         release_func()
 
 
+class PresenceBroadcaster:
+    """
+    Collects presence changes and broadcasts them as deltas at most once per
+    WEBSOCKET_PRESENCE_BROADCAST_INTERVAL seconds. Clients get a full
+    snapshot once when they connect.
+    """
+
+    def __init__(self, interval: float = WEBSOCKET_PRESENCE_BROADCAST_INTERVAL):
+        self.interval = interval
+        self.users: dict[str, bool] = {}
+        self.models: dict[str, bool] = {}
+        self.task = None
+
+    def user_changed(self, user_id: str, active: bool):
+        self.users[user_id] = active
+        self.schedule()
+
+    def model_changed(self, model_id: str, in_use: bool):
+        self.models[model_id] = in_use
+        self.schedule()
+
+    def schedule(self):
+        if self.task is None:
+            self.task = asyncio.create_task(self.flush())
+
+    async def flush(self):
+        try:
+            await asyncio.sleep(self.interval)
+        finally:
+            self.task = None
+            users, self.users = self.users, {}
+            models, self.models = self.models, {}
+
+            if users:
+                await sio.emit(
+                    "user-list",
+                    {
+                        "added": [id for id, active in users.items() if active],
+                        "removed": [id for id, active in users.items() if not active],
+                    },
+                )
+            if models:
+                await sio.emit(
+                    "usage",
+                    {
+                        "added": [id for id, in_use in models.items() if in_use],
+                        "removed": [id for id, in_use in models.items() if not in_use],
+                    },
+                )
+
+
+presence_broadcaster = PresenceBroadcaster()
+
+
 app = socketio.ASGIApp(
     sio,
     socketio_path="/ws/socket.io",
@@ -153,24 +189,31 @@ app = socketio.ASGIApp(
 
 def get_models_in_use():
     # List models that are currently in use
-    models_in_use = list(USAGE_POOL.keys())
-    return models_in_use
+    return PRESENCE.get_model_ids()
+
+
+async def emit_presence_snapshot(sid):
+    await sio.emit("user-list", {"user_ids": PRESENCE.get_user_ids()}, to=sid)
+    await sio.emit("usage", {"models": get_models_in_use()}, to=sid)
+
+
+async def add_user_session(user, sid):
+    SESSION_POOL[sid] = user.model_dump()
+    if PRESENCE.add_session(user.id, sid):
+        presence_broadcaster.user_changed(user.id, True)
+
+    # Chat events for the user are emitted to this room
+    await sio.enter_room(sid, f"user:{user.id}")
 
 
 @sio.on("usage")
 async def usage(sid, data):
     model_id = data["model"]
-    # Record the timestamp for the last update
-    current_time = int(time.time())
-
-    # Store the new usage data and task
-    USAGE_POOL[model_id] = {
-        **(USAGE_POOL[model_id] if model_id in USAGE_POOL else {}),
-        sid: {"updated_at": current_time},
-    }
 
-    # Broadcast the usage data to all clients
-    await sio.emit("usage", {"models": get_models_in_use()})
+    # Record the timestamp for the last update, only a model that was not in
+    # use before changes what clients see
+    if PRESENCE.heartbeat(model_id, sid, int(time.time())):
+        presence_broadcaster.model_changed(model_id, True)
 
 
 @sio.event
@@ -183,15 +226,10 @@ async def connect(sid, environ, auth):
             user = Users.get_user_by_id(data["id"])
 
         if user:
-            SESSION_POOL[sid] = user.model_dump()
-            if user.id in USER_POOL:
-                USER_POOL[user.id] = USER_POOL[user.id] + [sid]
-            else:
-                USER_POOL[user.id] = [sid]
+            await add_user_session(user, sid)
 
             # print(f"user {user.name}({user.id}) connected with session ID {sid}")
-            await sio.emit("user-list", {"user_ids": list(USER_POOL.keys())})
-            await sio.emit("usage", {"models": get_models_in_use()})
+            await emit_presence_snapshot(sid)
 
 
 @sio.on("user-join")
@@ -209,11 +247,7 @@ async def user_join(sid, data):
     if not user:
         return
 
-    SESSION_POOL[sid] = user.model_dump()
-    if user.id in USER_POOL:
-        USER_POOL[user.id] = USER_POOL[user.id] + [sid]
-    else:
-        USER_POOL[user.id] = [sid]
+    await add_user_session(user, sid)
 
     # Join all the channels
     channels = Channels.get_channels_by_user_id(user.id)
@@ -223,7 +257,7 @@ async def user_join(sid, data):
 
     # print(f"user {user.name}({user.id}) connected with session ID {sid}")
 
-    await sio.emit("user-list", {"user_ids": list(USER_POOL.keys())})
+    await sio.emit("user-list", {"user_ids": PRESENCE.get_user_ids()}, to=sid)
     return {"id": user.id, "name": user.name}
 
 
@@ -278,7 +312,7 @@ async def channel_events(sid, data):
 
 @sio.on("user-list")
 async def user_list(sid):
-    await sio.emit("user-list", {"user_ids": list(USER_POOL.keys())})
+    await sio.emit("user-list", {"user_ids": PRESENCE.get_user_ids()}, to=sid)
 
 
 @sio.event
@@ -287,80 +321,230 @@ async def disconnect(sid):
         user = SESSION_POOL[sid]
         del SESSION_POOL[sid]
 
-        user_id = user["id"]
-        USER_POOL[user_id] = [_sid for _sid in USER_POOL[user_id] if _sid != sid]
-
-        if len(USER_POOL[user_id]) == 0:
-            del USER_POOL[user_id]
-
-        await sio.emit("user-list", {"user_ids": list(USER_POOL.keys())})
+        if PRESENCE.remove_session(user["id"], sid):
+            presence_broadcaster.user_changed(user["id"], False)
     else:
         pass
         # print(f"Unknown session ID {sid} disconnected")
 
 
-def get_event_emitter(request_info, update_db=True):
-    async def __event_emitter__(event_data):
-        user_id = request_info["user_id"]
-
-        session_ids = list(
-            set(
-                USER_POOL.get(user_id, [])
-                + (
-                    [request_info.get("session_id")]
-                    if request_info.get("session_id")
-                    else []
-                )
-            )
+# Events passed to emitters versus frames actually sent to clients
+CHAT_EVENT_METRICS = {"source_events": 0, "emitted_frames": 0}
+
+
+def get_chat_event_metrics():
+    source_events = CHAT_EVENT_METRICS["source_events"]
+    return {
+        **CHAT_EVENT_METRICS,
+        "frames_per_event": (
+            CHAT_EVENT_METRICS["emitted_frames"] / source_events
+            if source_events
+            else 0.0
+        ),
+    }
+
+
+def update_chat_from_event(request_info, event_data):
+    if "type" in event_data and event_data["type"] == "status":
+        Chats.add_message_status_to_chat_by_id_and_message_id(
+            request_info["chat_id"],
+            request_info["message_id"],
+            event_data.get("data", {}),
+        )
+
+    if "type" in event_data and event_data["type"] == "message":
+        message = Chats.get_message_by_id_and_message_id(
+            request_info["chat_id"],
+            request_info["message_id"],
         )
 
-        for session_id in session_ids:
-            await sio.emit(
-                "chat-events",
+        if message:
+            content = message.get("content", "")
+            content += event_data.get("data", {}).get("content", "")
+
+            Chats.upsert_message_to_chat_by_id_and_message_id(
+                request_info["chat_id"],
+                request_info["message_id"],
                 {
-                    "chat_id": request_info.get("chat_id", None),
-                    "message_id": request_info.get("message_id", None),
-                    "data": event_data,
+                    "content": content,
                 },
-                to=session_id,
             )
 
-        if update_db:
-            if "type" in event_data and event_data["type"] == "status":
-                Chats.add_message_status_to_chat_by_id_and_message_id(
-                    request_info["chat_id"],
-                    request_info["message_id"],
-                    event_data.get("data", {}),
-                )
+    if "type" in event_data and event_data["type"] == "replace":
+        content = event_data.get("data", {}).get("content", "")
 
-            if "type" in event_data and event_data["type"] == "message":
-                message = Chats.get_message_by_id_and_message_id(
-                    request_info["chat_id"],
-                    request_info["message_id"],
-                )
+        Chats.upsert_message_to_chat_by_id_and_message_id(
+            request_info["chat_id"],
+            request_info["message_id"],
+            {
+                "content": content,
+            },
+        )
 
-                if message:
-                    content = message.get("content", "")
-                    content += event_data.get("data", {}).get("content", "")
 
-                    Chats.upsert_message_to_chat_by_id_and_message_id(
-                        request_info["chat_id"],
-                        request_info["message_id"],
-                        {
-                            "content": content,
-                        },
-                    )
+def merge_chat_events(pending, event_data):
+    """
+    Returns a single event equivalent to emitting pending and then
+    event_data, or None when they can't be combined.
+    """
+    event_type = event_data.get("type")
+    if pending.get("type") != event_type:
+        return None
 
-            if "type" in event_data and event_data["type"] == "replace":
-                content = event_data.get("data", {}).get("content", "")
+    data = event_data.get("data") or {}
+    pending_data = pending.get("data") or {}
 
-                Chats.upsert_message_to_chat_by_id_and_message_id(
-                    request_info["chat_id"],
-                    request_info["message_id"],
-                    {
-                        "content": content,
-                    },
-                )
+    # Content deltas are appended
+    if event_type in ("chat:message:delta", "message"):
+        return {
+            **event_data,
+            "data": {"content": pending_data["content"] + data["content"]},
+        }
+
+    # Content snapshots replace each other
+    if event_type == "chat:completion":
+        return event_data
+
+    return None
+
+
+def is_coalescable_chat_event(event_data):
+    data = event_data.get("data")
+    return (
+        event_data.get("type") in ("chat:completion", "chat:message:delta", "message")
+        and isinstance(data, dict)
+        and set(data.keys()) == {"content"}
+    )
+
+
+class ChatEventBuffer:
+    """
+    Holds back streamed content events of one message for up to
+    frame_interval seconds and coalesces them into one frame. Every emitter
+    of the message (tools, pipes, the response itself) shares the buffer, so
+    a held back frame can't arrive after another emitter's later events.
+    """
+
+    def __init__(self, key, frame_interval):
+        self.key = key
+        self.frame_interval = frame_interval
+        # (event_data, emit, target) of the held back frame
+        self.pending = None
+        self.flush_task = None
+        self.lock = asyncio.Lock()
+        self.active = 0
+
+    async def flush(self):
+        async with self.lock:
+            if self.pending is not None:
+                (event_data, emit, _), self.pending = self.pending, None
+                await emit(event_data)
+
+    async def flush_later(self):
+        self.active += 1
+        try:
+            await asyncio.sleep(self.frame_interval)
+            self.flush_task = None
+            await self.flush()
+        finally:
+            self.release()
+
+    async def add(self, event_data, emit, target):
+        self.active += 1
+        try:
+            while True:
+                if self.pending is None:
+                    self.pending = (event_data, emit, target)
+                    break
+
+                # Frames for different recipients or db updates stay apart
+                if self.pending[2] == target:
+                    merged = merge_chat_events(self.pending[0], event_data)
+                    if merged is not None:
+                        self.pending = (merged, emit, target)
+                        break
+
+                await self.flush()
+
+            if self.flush_task is None:
+                self.flush_task = asyncio.create_task(self.flush_later())
+        finally:
+            self.release()
+
+    async def send(self, event_data, emit):
+        # Anything else goes out right away, after what is held back
+        self.active += 1
+        try:
+            await self.flush()
+            async with self.lock:
+                await emit(event_data)
+        finally:
+            self.release()
+
+    def release(self):
+        self.active -= 1
+        if (
+            self.active == 0
+            and self.pending is None
+            and self.flush_task is None
+            and CHAT_EVENT_BUFFERS.get(self.key) is self
+        ):
+            del CHAT_EVENT_BUFFERS[self.key]
+
+
+# (chat_id, message_id) -> buffer, while events of the message are held back
+CHAT_EVENT_BUFFERS: dict[tuple, ChatEventBuffer] = {}
+
+
+def get_chat_event_buffer(key, frame_interval) -> ChatEventBuffer:
+    if key is None:
+        return ChatEventBuffer(None, frame_interval)
+
+    if key not in CHAT_EVENT_BUFFERS:
+        CHAT_EVENT_BUFFERS[key] = ChatEventBuffer(key, frame_interval)
+    return CHAT_EVENT_BUFFERS[key]
+
+
+def get_event_emitter(
+    request_info, update_db=True, frame_interval=CHAT_EVENT_FRAME_INTERVAL
+):
+    # Every session of the user joins its user room on connect, the requesting
+    # session is addressed directly in case it hasn't joined yet
+    recipients = [f"user:{request_info['user_id']}"]
+    if request_info.get("session_id"):
+        recipients.append(request_info["session_id"])
+
+    chat_id = request_info.get("chat_id", None)
+    message_id = request_info.get("message_id", None)
+    key = (chat_id, message_id) if chat_id and message_id else None
+    target = (tuple(recipients), update_db)
+
+    # Without a message to share it with, the emitter keeps its own buffer
+    own_buffer = get_chat_event_buffer(None, frame_interval) if key is None else None
+
+    async def emit(event_data):
+        CHAT_EVENT_METRICS["emitted_frames"] += 1
+        await sio.emit(
+            "chat-events",
+            {
+                "chat_id": chat_id,
+                "message_id": message_id,
+                "data": event_data,
+            },
+            to=recipients,
+        )
+
+        if update_db:
+            await asyncio.to_thread(update_chat_from_event, request_info, event_data)
+
+    async def __event_emitter__(event_data):
+        CHAT_EVENT_METRICS["source_events"] += 1
+        buffer = own_buffer or get_chat_event_buffer(key, frame_interval)
+
+        if frame_interval > 0 and is_coalescable_chat_event(event_data):
+            await buffer.add(event_data, emit, target)
+        else:
+            await buffer.send(event_data, emit)
 
     return __event_emitter__
 
@@ -406,6 +590,4 @@ def get_user_ids_from_room(room):
 
 
 def get_active_status_by_user_id(user_id):
-    if user_id in USER_POOL:
-        return True
-    return False
+    return PRESENCE.is_user_active(user_id)
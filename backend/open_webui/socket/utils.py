@@ -89,3 +89,173 @@ class RedisDict:
         if key not in self:
             self[key] = default
         return self[key]
+
+
+# Returns 1 when this is the user's first session
+ADD_SESSION_SCRIPT = """
+redis.call('SADD', KEYS[1], ARGV[1])
+return redis.call('SADD', KEYS[2], ARGV[2])
+"""
+
+# Returns 1 when this was the user's last session
+REMOVE_SESSION_SCRIPT = """
+redis.call('SREM', KEYS[1], ARGV[1])
+if redis.call('SCARD', KEYS[1]) == 0 then
+    return redis.call('SREM', KEYS[2], ARGV[2])
+end
+return 0
+"""
+
+# Returns 1 when the model was not in use before
+HEARTBEAT_SCRIPT = """
+redis.call('ZADD', KEYS[1], ARGV[2], ARGV[1])
+return redis.call('SADD', KEYS[2], ARGV[3])
+"""
+
+# Returns the models that are no longer in use, KEYS[i + 1] is the key of
+# the model ARGV[i + 1]
+EXPIRE_SCRIPT = """
+local removed = {}
+for i = 2, #KEYS do
+    redis.call('ZREMRANGEBYSCORE', KEYS[i], '-inf', ARGV[1])
+    if redis.call('ZCARD', KEYS[i]) == 0 then
+        redis.call('DEL', KEYS[i])
+        if redis.call('SREM', KEYS[1], ARGV[i]) == 1 then
+            table.insert(removed, ARGV[i])
+        end
+    end
+end
+return removed
+"""
+
+
+class RedisPresence:
+    """
+    Users online and models in use, kept in Redis sets and sorted sets.
+
+    Every user has a set of session ids, and every model a sorted set of
+    session ids scored by their last heartbeat. Updates run as Lua scripts
+    so they are atomic across workers and report whether they changed the
+    set of active users or models.
+    """
+
+    def __init__(self, name, redis_url, redis_sentinels=[]):
+        # Hash tag keeps all keys in one slot for the scripts on Redis Cluster
+        self.prefix = "{" + name + "}"
+        self.users_key = f"{self.prefix}:users"
+        self.models_key = f"{self.prefix}:models"
+        self.redis = get_redis_connection(
+            redis_url, redis_sentinels, decode_responses=True
+        )
+
+        self.add_session_script = self.redis.register_script(ADD_SESSION_SCRIPT)
+        self.remove_session_script = self.redis.register_script(REMOVE_SESSION_SCRIPT)
+        self.heartbeat_script = self.redis.register_script(HEARTBEAT_SCRIPT)
+        self.expire_script = self.redis.register_script(EXPIRE_SCRIPT)
+
+    def get_user_key(self, user_id):
+        return f"{self.prefix}:user:{user_id}"
+
+    def get_model_key(self, model_id):
+        return f"{self.prefix}:model:{model_id}"
+
+    def add_session(self, user_id, sid) -> bool:
+        return bool(
+            self.add_session_script(
+                keys=[self.get_user_key(user_id), self.users_key],
+                args=[sid, user_id],
+            )
+        )
+
+    def remove_session(self, user_id, sid) -> bool:
+        return bool(
+            self.remove_session_script(
+                keys=[self.get_user_key(user_id), self.users_key],
+                args=[sid, user_id],
+            )
+        )
+
+    def get_session_ids(self, user_id) -> list[str]:
+        return list(self.redis.smembers(self.get_user_key(user_id)))
+
+    def get_user_ids(self) -> list[str]:
+        return list(self.redis.smembers(self.users_key))
+
+    def is_user_active(self, user_id) -> bool:
+        return bool(self.redis.sismember(self.users_key, user_id))
+
+    def heartbeat(self, model_id, sid, timestamp) -> bool:
+        return bool(
+            self.heartbeat_script(
+                keys=[self.get_model_key(model_id), self.models_key],
+                args=[sid, timestamp, model_id],
+            )
+        )
+
+    def get_model_ids(self) -> list[str]:
+        return list(self.redis.smembers(self.models_key))
+
+    def expire(self, cutoff) -> list[str]:
+        # Scripts may only touch the keys they are given, so the models are
+        # read first. One added meanwhile has a fresh heartbeat anyway.
+        model_ids = self.get_model_ids()
+        if not model_ids:
+            return []
+
+        return self.expire_script(
+            keys=[self.models_key, *map(self.get_model_key, model_ids)],
+            args=[cutoff, *model_ids],
+        )
+
+
+class LocalPresence:
+    """
+    In-process counterpart of RedisPresence for single worker deployments.
+    """
+
+    def __init__(self):
+        self.users: dict[str, set[str]] = {}
+        self.models: dict[str, dict[str, int]] = {}
+
+    def add_session(self, user_id, sid) -> bool:
+        first = user_id not in self.users
+        self.users.setdefault(user_id, set()).add(sid)
+        return first
+
+    def remove_session(self, user_id, sid) -> bool:
+        sessions = self.users.get(user_id)
+        if sessions is None:
+            return False
+        sessions.discard(sid)
+        if not sessions:
+            del self.users[user_id]
+            return True
+        return False
+
+    def get_session_ids(self, user_id) -> list[str]:
+        return list(self.users.get(user_id, ()))
+
+    def get_user_ids(self) -> list[str]:
+        return list(self.users.keys())
+
+    def is_user_active(self, user_id) -> bool:
+        return user_id in self.users
+
+    def heartbeat(self, model_id, sid, timestamp) -> bool:
+        first = model_id not in self.models
+        self.models.setdefault(model_id, {})[sid] = timestamp
+        return first
+
+    def get_model_ids(self) -> list[str]:
+        return list(self.models.keys())
+
+    def expire(self, cutoff) -> list[str]:
+        removed = []
+        for model_id, sessions in list(self.models.items()):
+            for sid, timestamp in list(sessions.items()):
+                if timestamp <= cutoff:
+                    del sessions[sid]
+            if not sessions:
+                del self.models[model_id]
+                removed.append(model_id)
+        return removed
@@ -1,14 +1,138 @@
 # tasks.py
 import asyncio
-from typing import Dict
+import json
+import logging
+import time
+from typing import Dict, Optional
 from uuid import uuid4
 
+from open_webui.env import (
+    REDIS_URL,
+    REDIS_SENTINEL_HOSTS,
+    REDIS_SENTINEL_PORT,
+    SRC_LOG_LEVELS,
+    TASK_HEARTBEAT_INTERVAL,
+    TASK_REGISTRY_TIMEOUT,
+)
+from open_webui.utils.redis import (
+    get_async_redis_connection,
+    get_sentinels_from_env,
+    listen_to_channel,
+)
+
+log = logging.getLogger(__name__)
+log.setLevel(SRC_LOG_LEVELS["MAIN"])
+
 # A dictionary to keep track of active tasks
 tasks: Dict[str, asyncio.Task] = {}
 chat_tasks = {}
 
+# With Redis, tasks are also recorded in a registry shared by all workers:
+# a hash of task id -> owner, a set of task ids per chat, and a heartbeat
+# key per worker. Stop requests for tasks owned by another worker are sent
+# to it over pub/sub.
+TASKS_KEY = "open-webui:tasks"
+CHAT_TASKS_KEY = "open-webui:tasks:chat:{}"
+WORKER_KEY = "open-webui:tasks:worker:{}"
+STOP_CHANNEL = "open-webui:tasks:stop"
+WORKER_ID = str(uuid4())
+
+# Seconds to wait for the owning worker to confirm a stop
+STOP_TIMEOUT = 5
+
+redis = None
+registry_writes: set[asyncio.Task] = set()
+
+
+def get_redis():
+    global redis
+    if REDIS_URL and redis is None:
+        redis = get_async_redis_connection(
+            REDIS_URL,
+            get_sentinels_from_env(REDIS_SENTINEL_HOSTS, REDIS_SENTINEL_PORT),
+        )
+    return redis
+
+
+async def call_registry(command, default=None):
+    """
+    Runs command(redis) against the task registry, bounded by
+    TASK_REGISTRY_TIMEOUT. Returns default if Redis is slow or unavailable.
+    """
+    try:
+        return await asyncio.wait_for(command(get_redis()), TASK_REGISTRY_TIMEOUT)
+    except asyncio.TimeoutError:
+        log.warning("Task registry timed out")
+        return default
+    except Exception as e:
+        log.warning(f"Task registry unavailable: {e}")
+        return default
+
+
+def write_registry(coroutine) -> asyncio.Task:
+    task = asyncio.create_task(coroutine)
+    registry_writes.add(task)
+    task.add_done_callback(registry_writes.discard)
+    return task
+
+
+async def register_task(task_id: str, id=None):
+    entry = {"worker_id": WORKER_ID, "chat_id": id, "created_at": int(time.time())}
 
-def cleanup_task(task_id: str, id=None):
+    async def command(redis):
+        async with redis.pipeline(transaction=True) as pipe:
+            pipe.hset(TASKS_KEY, task_id, json.dumps(entry))
+            if id:
+                pipe.sadd(CHAT_TASKS_KEY.format(id), task_id)
+            await pipe.execute()
+
+    await call_registry(command)
+
+
+async def unregister_tasks(entries: dict[str, dict]):
+    async def command(redis):
+        async with redis.pipeline(transaction=True) as pipe:
+            pipe.hdel(TASKS_KEY, *entries.keys())
+            for task_id, entry in entries.items():
+                if entry.get("chat_id"):
+                    pipe.srem(CHAT_TASKS_KEY.format(entry["chat_id"]), task_id)
+            await pipe.execute()
+
+    if entries:
+        await call_registry(command)
+
+
+async def get_live_entries(redis, entries: dict) -> dict[str, dict]:
+    """
+    Parses registry entries and drops those of workers whose heartbeat has
+    expired, along with their tasks.
+    """
+    entries = {
+        task_id: json.loads(entry) for task_id, entry in entries.items() if entry
+    }
+    if not entries:
+        return {}
+
+    worker_ids = list({entry["worker_id"] for entry in entries.values()})
+    heartbeats = await redis.mget([WORKER_KEY.format(id) for id in worker_ids])
+    live_worker_ids = {
+        worker_id
+        for worker_id, heartbeat in zip(worker_ids, heartbeats)
+        if heartbeat or worker_id == WORKER_ID
+    }
+
+    dead = {
+        task_id: entry
+        for task_id, entry in entries.items()
+        if entry["worker_id"] not in live_worker_ids
+    }
+    if dead:
+        write_registry(unregister_tasks(dead))
+
+    return {task_id: entry for task_id, entry in entries.items() if task_id not in dead}
+
+
+def cleanup_task(task_id: str, id=None, registration: Optional[asyncio.Task] = None):
     """
     Remove a completed or canceled task from the global `tasks` dictionary.
     """
@@ -20,6 +144,14 @@ def cleanup_task(task_id: str, id=None):
         if not chat_tasks[id]:  # If no tasks left for this ID, remove the entry
             chat_tasks.pop(id, None)
 
+    if registration:
+
+        async def unregister():
+            await registration
+            await unregister_tasks({task_id: {"chat_id": id}})
+
+        write_registry(unregister())
+
 
 def create_task(coroutine, id=None):
     """
@@ -28,8 +160,11 @@ def create_task(coroutine, id=None):
     task_id = str(uuid4())  # Generate a unique ID for the task
     task = asyncio.create_task(coroutine)  # Create the task
 
+    # Recorded in the shared registry alongside, so the task starts right away
+    registration = write_registry(register_task(task_id, id)) if get_redis() else None
+
     # Add a done callback for cleanup
-    task.add_done_callback(lambda t: cleanup_task(task_id, id))
+    task.add_done_callback(lambda t: cleanup_task(task_id, id, registration))
     tasks[task_id] = task
 
     # If an ID is provided, associate the task with that ID
@@ -48,18 +183,46 @@ def get_task(task_id: str):
     return tasks.get(task_id)
 
 
-def list_tasks():
+async def list_tasks():
     """
-    List all currently active task IDs.
+    List all currently active task IDs, across all workers.
     """
+    if get_redis():
+
+        async def command(redis):
+            return await get_live_entries(redis, await redis.hgetall(TASKS_KEY))
+
+        entries = await call_registry(command)
+        if entries is not None:
+            return list(entries.keys() | tasks.keys())
+
     return list(tasks.keys())
 
 
-def list_task_ids_by_chat_id(id):
+async def list_task_ids_by_chat_id(id):
     """
-    List all tasks associated with a specific ID.
+    List all tasks associated with a specific ID, across all workers.
     """
-    return chat_tasks.get(id, [])
+    local_task_ids = chat_tasks.get(id, [])
+    if get_redis():
+
+        async def command(redis):
+            task_ids = list(await redis.smembers(CHAT_TASKS_KEY.format(id)))
+            if not task_ids:
+                return {}
+            entries = await redis.hmget(TASKS_KEY, task_ids)
+
+            # Finished tasks whose removal from the chat's set was lost
+            missing = [tid for tid, entry in zip(task_ids, entries) if not entry]
+            if missing:
+                await redis.srem(CHAT_TASKS_KEY.format(id), *missing)
+            return await get_live_entries(redis, dict(zip(task_ids, entries)))
+
+        entries = await call_registry(command)
+        if entries is not None:
+            return list(dict.fromkeys([*local_task_ids, *entries.keys()]))
+
+    return local_task_ids
 
 
 async def stop_task(task_id: str):
@@ -68,6 +231,8 @@ async def stop_task(task_id: str):
     """
     task = tasks.get(task_id)
     if not task:
+        if get_redis():
+            return await stop_remote_task(task_id)
         raise ValueError(f"Task with ID {task_id} not found.")
 
     task.cancel()  # Request task cancellation
@@ -79,3 +244,68 @@ async def stop_task(task_id: str):
         return {"status": True, "message": f"Task {task_id} successfully stopped."}
 
     return {"status": False, "message": f"Failed to stop task {task_id}."}
+
+
+async def stop_remote_task(task_id: str):
+    """
+    Asks the worker that owns the task to cancel it, and waits a bounded time
+    for the task to leave the registry.
+    """
+
+    async def command(redis):
+        return await get_live_entries(
+            redis, {task_id: await redis.hget(TASKS_KEY, task_id)}
+        )
+
+    if not await call_registry(command, default={}):
+        raise ValueError(f"Task with ID {task_id} not found.")
+
+    await call_registry(lambda redis: redis.publish(STOP_CHANNEL, task_id))
+
+    deadline = time.monotonic() + STOP_TIMEOUT
+    while time.monotonic() < deadline:
+        await asyncio.sleep(0.1)
+        if not await call_registry(
+            lambda redis: redis.hexists(TASKS_KEY, task_id), default=True
+        ):
+            return {"status": True, "message": f"Task {task_id} successfully stopped."}
+
+    return {"status": False, "message": f"Failed to stop task {task_id}."}
+
+
+async def listen_for_task_stops():
+    if not get_redis():
+        return
+
+    async def handle(task_id):
+        task = tasks.get(task_id)
+        if task:
+            log.info(f"Stopping task {task_id} on request")
+            task.cancel()
+
+    await listen_to_channel(get_redis(), STOP_CHANNEL, handle)
+
+
+async def periodic_task_heartbeat():
+    if not get_redis():
+        return
+
+    while True:
+        await call_registry(
+            lambda redis: redis.set(
+                WORKER_KEY.format(WORKER_ID),
+                int(time.time()),
+                ex=TASK_HEARTBEAT_INTERVAL * 3,
+            )
+        )
+        await asyncio.sleep(TASK_HEARTBEAT_INTERVAL)
+
+
+async def close_task_registry():
+    if not get_redis():
+        return
+
+    # Our tasks stop with this worker, drop them instead of waiting for the
+    # heartbeat to expire
+    await call_registry(lambda redis: redis.delete(WORKER_KEY.format(WORKER_ID)))
+    await redis.aclose()
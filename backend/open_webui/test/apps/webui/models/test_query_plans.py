@@ -0,0 +1,363 @@
+"""
+Checks that the hot per-user and per-channel model queries are served by the
+secondary indexes, by running EXPLAIN on the SQL they actually issue.
+
+Runs against a temporary SQLite database unless DATABASE_URL is set, the
+seeded rows are deleted again afterwards. On Postgres sequential scans are
+disabled for the session so a missing index shows up as a "Seq Scan" even
+on a small table.
+"""
+
+import os
+import re
+import sys
+import tempfile
+import time
+import uuid
+
+import pytest
+from sqlalchemy import event
+
+# The database URL is read when open_webui is imported
+if "DATABASE_URL" not in os.environ:
+    if "open_webui.env" in sys.modules:
+        pytest.skip(
+            "open_webui was imported with the default database, set DATABASE_URL",
+            allow_module_level=True,
+        )
+    data_dir = tempfile.mkdtemp(prefix="query-plans-")
+    os.environ["DATABASE_URL"] = f"sqlite:///{data_dir}/webui.db"
+
+import open_webui.config  # noqa: E402,F401  runs migrations
+from open_webui.internal.db import engine, get_db  # noqa: E402
+from open_webui.models.chats import Chat, Chats  # noqa: E402
+from open_webui.models.feedbacks import Feedback, Feedbacks  # noqa: E402
+from open_webui.models.files import File, Files  # noqa: E402
+from open_webui.models.folders import Folder, Folders  # noqa: E402
+from open_webui.models.groups import Group, GroupMember, Groups  # noqa: E402
+from open_webui.models.memories import Memory, Memories  # noqa: E402
+from open_webui.models.messages import Message, MessageReaction, Messages  # noqa: E402
+from open_webui.models.tags import Tag, Tags  # noqa: E402
+
+USERS = 20
+ROWS_PER_USER = 25
+
+PREFIX = f"plan-{uuid.uuid4().hex[:8]}"
+USER_ID = f"{PREFIX}-user-0"
+CHANNEL_ID = f"{PREFIX}-channel-0"
+FOLDER_ID = f"{PREFIX}-folder-0"
+MESSAGE_ID = f"{PREFIX}-message-0-0"
+
+
+def seed():
+    now = int(time.time())
+    user_ids = [f"{PREFIX}-user-{idx}" for idx in range(USERS)]
+
+    chats, files, memories, feedbacks, tags, folders = [], [], [], [], [], []
+    messages, reactions, groups, members = [], [], [], []
+    for user_idx, user_id in enumerate(user_ids):
+        folder_id = f"{PREFIX}-folder-{user_idx}"
+        channel_id = f"{PREFIX}-channel-{user_idx}"
+        folders.append(
+            {
+                "id": folder_id,
+                "user_id": user_id,
+                "name": "folder",
+                "created_at": now,
+                "updated_at": now,
+            }
+        )
+        groups.append(
+            {
+                "id": f"{PREFIX}-group-{user_idx}",
+                "user_id": user_id,
+                "name": "group",
+                "description": "",
+                "user_ids": [user_id],
+                "created_at": now,
+                "updated_at": now,
+            }
+        )
+        members.append(
+            {
+                "group_id": f"{PREFIX}-group-{user_idx}",
+                "user_id": user_id,
+                "created_at": now,
+            }
+        )
+
+        for idx in range(ROWS_PER_USER):
+            row_id = f"{PREFIX}-{user_idx}-{idx}"
+            chats.append(
+                {
+                    "id": row_id,
+                    "user_id": user_id,
+                    "title": "chat",
+                    "chat": {},
+                    "archived": idx % 5 == 0,
+                    "pinned": False,
+                    "folder_id": folder_id if idx % 2 else None,
+                    "created_at": now,
+                    "updated_at": now - idx,
+                }
+            )
+            files.append(
+                {
+                    "id": row_id,
+                    "user_id": user_id,
+                    "filename": "a.txt",
+                    "created_at": now,
+                    "updated_at": now,
+                }
+            )
+            memories.append(
+                {
+                    "id": row_id,
+                    "user_id": user_id,
+                    "content": "memory",
+                    "created_at": now,
+                    "updated_at": now,
+                }
+            )
+            feedbacks.append(
+                {
+                    "id": row_id,
+                    "user_id": user_id,
+                    "type": "rating",
+                    "created_at": now,
+                    "updated_at": now,
+                }
+            )
+            tags.append({"id": f"tag-{idx}", "name": f"tag {idx}", "user_id": user_id})
+
+            message_id = f"{PREFIX}-message-{user_idx}-{idx}"
+            messages.append(
+                {
+                    "id": message_id,
+                    "user_id": user_id,
+                    "channel_id": channel_id,
+                    "parent_id": (
+                        None if idx % 5 == 0 else f"{PREFIX}-message-{user_idx}-0"
+                    ),
+                    "content": "message",
+                    "created_at": now * 1_000_000_000 + idx,
+                    "updated_at": now * 1_000_000_000 + idx,
+                }
+            )
+            reactions.append(
+                {
+                    "id": row_id,
+                    "user_id": user_id,
+                    "message_id": f"{PREFIX}-message-{user_idx}-0",
+                    "name": f"emoji-{idx}",
+                    "created_at": now,
+                }
+            )
+
+    with get_db() as db:
+        for model, rows in [
+            (Chat, chats),
+            (File, files),
+            (Memory, memories),
+            (Feedback, feedbacks),
+            (Tag, tags),
+            (Folder, folders),
+            (Message, messages),
+            (MessageReaction, reactions),
+            (Group, groups),
+            (GroupMember, members),
+        ]:
+            db.bulk_insert_mappings(model, rows)
+        db.commit()
+
+    with engine.connect() as conn:
+        conn.exec_driver_sql("ANALYZE")
+        conn.commit()
+
+
+def unseed():
+    with get_db() as db:
+        for model in [
+            Chat,
+            File,
+            Memory,
+            Feedback,
+            Tag,
+            Folder,
+            Message,
+            MessageReaction,
+            Group,
+            GroupMember,
+        ]:
+            db.query(model).filter(model.user_id.like(f"{PREFIX}-%")).delete(
+                synchronize_session=False
+            )
+        db.commit()
+
+
+def capture_statements(fn) -> list[tuple[str, object]]:
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, many):
+        if statement.lstrip().upper().startswith("SELECT"):
+            statements.append((statement, parameters))
+
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        fn()
+    finally:
+        event.remove(engine, "before_cursor_execute", before_cursor_execute)
+    return statements
+
+
+def explain(statement: str, parameters) -> list[str]:
+    with engine.connect() as conn:
+        if engine.dialect.name == "sqlite":
+            rows = conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters)
+            return [row[-1] for row in rows]
+
+        conn.exec_driver_sql("SET enable_seqscan = off")
+        rows = conn.exec_driver_sql(f"EXPLAIN {statement}", parameters)
+        plan = [row[0] for row in rows]
+        conn.rollback()
+        return plan
+
+
+def assert_uses_index(fn, table: str, indexes: set[str], ordered: bool = False):
+    plans = [
+        explain(statement, parameters)
+        for statement, parameters in capture_statements(fn)
+    ]
+    plans = [
+        plan for plan in plans if any(re.search(rf"\b{table}\b", line) for line in plan)
+    ]
+    assert plans, f"no query touched {table}"
+
+    # Primary key lookups made along the way are fine too
+    indexes = indexes | {f"sqlite_autoindex_{table}_1", f"{table}_pkey"}
+
+    for plan in plans:
+        text = "\n".join(plan)
+        if engine.dialect.name == "sqlite":
+            assert not re.search(rf"\bSCAN {table}\b", text), text
+            if ordered:
+                assert "USE TEMP B-TREE FOR ORDER BY" not in text, text
+        else:
+            assert not re.search(rf"Seq Scan on {table}\b", text), text
+
+        assert any(index in text for index in indexes), text
+
+
+@pytest.fixture(scope="module", autouse=True)
+def seeded():
+    seed()
+    try:
+        yield
+    finally:
+        unseed()
+
+
+def test_chat_list_by_user_id():
+    assert_uses_index(
+        lambda: Chats.get_chat_list_by_user_id(USER_ID),
+        "chat",
+        {"chat_user_id_updated_at_idx"},
+        ordered=True,
+    )
+
+
+def test_chat_title_id_list_by_user_id():
+    assert_uses_index(
+        lambda: Chats.get_chat_title_id_list_by_user_id(USER_ID),
+        "chat",
+        {"chat_user_id_folder_id_updated_at_idx"},
+        ordered=True,
+    )
+
+
+def test_chats_by_folder_id_and_user_id():
+    assert_uses_index(
+        lambda: Chats.get_chats_by_folder_id_and_user_id(FOLDER_ID, USER_ID),
+        "chat",
+        {"chat_user_id_folder_id_updated_at_idx"},
+        ordered=True,
+    )
+
+
+def test_messages_by_channel_id():
+    assert_uses_index(
+        lambda: Messages.get_messages_by_channel_id(CHANNEL_ID),
+        "message",
+        {"message_channel_id_parent_id_created_at_idx"},
+        ordered=True,
+    )
+
+
+def test_messages_by_parent_id():
+    assert_uses_index(
+        lambda: Messages.get_messages_by_parent_id(CHANNEL_ID, MESSAGE_ID),
+        "message",
+        {"message_channel_id_parent_id_created_at_idx"},
+        ordered=True,
+    )
+
+
+def test_replies_by_message_id():
+    assert_uses_index(
+        lambda: Messages.get_replies_by_message_id(MESSAGE_ID),
+        "message",
+        {"message_parent_id_created_at_idx"},
+        ordered=True,
+    )
+
+
+def test_reactions_by_message_id():
+    assert_uses_index(
+        lambda: Messages.get_reactions_by_message_id(MESSAGE_ID),
+        "message_reaction",
+        {"message_reaction_message_id_idx"},
+    )
+
+
+def test_files_by_user_id():
+    assert_uses_index(
+        lambda: Files.get_files_by_user_id(USER_ID), "file", {"file_user_id_idx"}
+    )
+
+
+def test_memories_by_user_id():
+    assert_uses_index(
+        lambda: Memories.get_memories_by_user_id(USER_ID),
+        "memory",
+        {"memory_user_id_idx"},
+    )
+
+
+def test_feedbacks_by_user_id():
+    assert_uses_index(
+        lambda: Feedbacks.get_feedbacks_by_user_id(USER_ID),
+        "feedback",
+        {"feedback_user_id_idx"},
+    )
+
+
+def test_tags_by_user_id():
+    assert_uses_index(
+        lambda: Tags.get_tags_by_user_id(USER_ID), "tag", {"tag_user_id_idx"}
+    )
+
+
+def test_folders_by_parent_id_and_user_id():
+    assert_uses_index(
+        lambda: Folders.get_folders_by_parent_id_and_user_id(FOLDER_ID, USER_ID),
+        "folder",
+        {"folder_user_id_parent_id_idx"},
+    )
+
+
+def test_groups_by_member_id():
+    assert_uses_index(
+        lambda: Groups.get_groups_by_member_id(USER_ID),
+        "group_member",
+        {"group_member_user_id_idx"},
+    )
@@ -0,0 +1,162 @@
+import random
+import types
+
+import pytest
+import tiktoken
+from langchain_core.documents import Document
+from langchain_text_splitters import (
+    RecursiveCharacterTextSplitter,
+    TokenTextSplitter,
+)
+
+from open_webui.retrieval.splitters.main import (
+    RecursiveCharacterSplitter,
+    TextSplitter,
+    TokenSplitter,
+    get_text_splitter,
+    sanitize_metadata,
+)
+
+
+def build_text(seed: int) -> str:
+    # Paragraphs, lines and words of uneven length, with a few long words and
+    # non-ASCII characters
+    rng = random.Random(seed)
+    words = ["a", "bb", "ccc", "dough", "ferment", "ü", "日本語", "x" * 40]
+    paragraphs = []
+    for _ in range(rng.randint(1, 6)):
+        lines = []
+        for _ in range(rng.randint(1, 4)):
+            lines.append(" ".join(rng.choices(words, k=rng.randint(1, 20))))
+        paragraphs.append("\n".join(lines))
+    return "\n\n".join(paragraphs)
+
+
+@pytest.fixture
+def encoding(monkeypatch):
+    # Small offline byte-level BPE, so the test needs no downloaded encoding
+    ranks = {bytes([i]): i for i in range(256)}
+    for token in [b"ou", b"gh", b"ough", b"er", b"me", b"men", b" a", b"\xc3\xbc"]:
+        ranks.setdefault(token, len(ranks))
+    test_encoding = tiktoken.Encoding(
+        name="splitter_test",
+        pat_str=r"""'s|'t|'re|'ve|'m|'ll|'d| ?\p{L}+| ?\p{N}+| ?[^\s\p{L}\p{N}]+|\s+""",
+        mergeable_ranks=ranks,
+        special_tokens={},
+    )
+
+    get_encoding = tiktoken.get_encoding
+    monkeypatch.setattr(
+        tiktoken,
+        "get_encoding",
+        lambda name: test_encoding if name == "splitter_test" else get_encoding(name),
+    )
+    return "splitter_test"
+
+
+def test_get_text_splitter():
+    assert isinstance(get_text_splitter("", 100, 10), RecursiveCharacterSplitter)
+    assert isinstance(
+        get_text_splitter("character", 100, 10), RecursiveCharacterSplitter
+    )
+    with pytest.raises(ValueError):
+        get_text_splitter("invalid", 100, 10)
+    with pytest.raises(ValueError):
+        RecursiveCharacterSplitter(chunk_size=10, chunk_overlap=20)
+    with pytest.raises(TypeError):
+        TextSplitter()
+
+
+def test_split_text_is_lazy():
+    splitter = RecursiveCharacterSplitter(chunk_size=10, chunk_overlap=0)
+    chunks = splitter.split_text("one two three four five six")
+    assert isinstance(chunks, types.GeneratorType)
+    assert list(chunks) == ["one two", "three", "four five", "six"]
+
+
+def test_split_text_overlap():
+    splitter = RecursiveCharacterSplitter(chunk_size=10, chunk_overlap=4)
+    assert list(splitter.split_text("aaa bbb ccc ddd")) == [
+        "aaa bbb",
+        "bbb ccc",
+        "ccc ddd",
+    ]
+
+
+def test_split_text_separators():
+    splitter = RecursiveCharacterSplitter(chunk_size=12, chunk_overlap=0)
+    text = "first para\n\nsecond para\nwith lines"
+    assert list(splitter.split_text(text)) == [
+        "first para",
+        "second para",
+        "with lines",
+    ]
+
+
+@pytest.mark.parametrize(
+    "chunk_size,chunk_overlap", [(1, 0), (7, 3), (25, 0), (50, 10), (200, 50)]
+)
+@pytest.mark.parametrize("separators", [None, ["\n", " "], [" ", ""], ["ü", "\n\n"]])
+def test_character_splitter_matches_langchain(chunk_size, chunk_overlap, separators):
+    kwargs = {"chunk_size": chunk_size, "chunk_overlap": chunk_overlap}
+    if separators:
+        kwargs["separators"] = separators
+    splitter = RecursiveCharacterSplitter(**kwargs)
+    langchain_splitter = RecursiveCharacterTextSplitter(add_start_index=True, **kwargs)
+
+    for seed in range(20):
+        docs = [Document(page_content=build_text(seed), metadata={"seed": seed})]
+        assert [
+            (doc.page_content, doc.metadata) for doc in splitter.split_documents(docs)
+        ] == [
+            (doc.page_content, doc.metadata)
+            for doc in langchain_splitter.split_documents(docs)
+        ]
+
+
+@pytest.mark.parametrize(
+    "chunk_size,chunk_overlap", [(1, 0), (5, 2), (16, 0), (32, 8), (100, 99)]
+)
+def test_token_splitter_matches_langchain(encoding, chunk_size, chunk_overlap):
+    kwargs = {"chunk_size": chunk_size, "chunk_overlap": chunk_overlap}
+    splitter = TokenSplitter(encoding_name=encoding, **kwargs)
+    langchain_splitter = TokenTextSplitter(
+        encoding_name=encoding, add_start_index=True, **kwargs
+    )
+
+    for seed in range(20):
+        docs = [Document(page_content=build_text(seed), metadata={"seed": seed})]
+        assert [
+            (doc.page_content, doc.metadata) for doc in splitter.split_documents(docs)
+        ] == [
+            (doc.page_content, doc.metadata)
+            for doc in langchain_splitter.split_documents(docs)
+        ]
+
+
+def test_split_documents_metadata():
+    splitter = RecursiveCharacterSplitter(chunk_size=10, chunk_overlap=0)
+    docs = [Document(page_content="one two three", metadata={"name": "a"})]
+
+    calls = []
+
+    def build_metadata(metadata):
+        calls.append(metadata)
+        return {**metadata, "extra": True}
+
+    chunks = list(splitter.split_documents(docs, metadata_fn=build_metadata))
+    assert len(calls) == 1
+    assert [chunk.page_content for chunk in chunks] == ["one two", "three"]
+    assert [chunk.metadata for chunk in chunks] == [
+        {"name": "a", "extra": True, "start_index": 0},
+        {"name": "a", "extra": True, "start_index": 8},
+    ]
+
+
+def test_sanitize_metadata():
+    assert sanitize_metadata({"a": [1], "b": {"c": 1}, "d": 1, "e": None}) == {
+        "a": "[1]",
+        "b": "{'c': 1}",
+        "d": 1,
+        "e": None,
+    }
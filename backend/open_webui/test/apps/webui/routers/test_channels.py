@@ -0,0 +1,63 @@
+from test.util.abstract_integration_test import AbstractPostgresTest
+from test.util.mock_user import mock_webui_user
+
+# Message timestamps are time_ns, beyond what a JS number holds exactly
+CREATED_AT = 1792366860753172393
+
+
+class TestChannels(AbstractPostgresTest):
+    BASE_PATH = "/api/v1/channels"
+
+    def setup_class(cls):
+        super().setup_class()
+
+    def setup_method(self):
+        super().setup_method()
+        from open_webui.internal.db import get_db
+        from open_webui.models.channels import ChannelForm, Channels
+        from open_webui.models.messages import Message
+        from open_webui.models.users import Users
+
+        Users.insert_new_user(id="1", name="user 1", email="user1@openwebui.com")
+        self.channel = Channels.insert_new_channel(
+            None, ChannelForm(name="channel"), "1"
+        )
+
+        # Neighbouring timestamps round to the same JS number, some are equal
+        with get_db() as db:
+            db.bulk_insert_mappings(
+                Message,
+                [
+                    {
+                        "id": f"message-{idx:02}",
+                        "user_id": "1",
+                        "channel_id": self.channel.id,
+                        "content": f"message {idx}",
+                        "created_at": CREATED_AT + idx // 2 * 37,
+                        "updated_at": CREATED_AT + idx // 2 * 37,
+                    }
+                    for idx in range(25)
+                ],
+            )
+            db.commit()
+
+    def test_get_channel_messages_by_cursor(self):
+        ids, cursor = [], None
+        for _ in range(10):
+            query_params = {"limit": 7, **({"cursor": cursor} if cursor else {})}
+            with mock_webui_user(id="1", role="admin"):
+                response = self.fast_api_client.get(
+                    self.create_url(
+                        f"/{self.channel.id}/messages", query_params=query_params
+                    )
+                )
+            assert response.status_code == 200
+
+            messages = response.json()
+            if not messages:
+                break
+            ids.extend(message["id"] for message in messages)
+            cursor = messages[-1]["cursor"]
+            assert isinstance(cursor, str)
+
+        assert ids == [f"message-{idx:02}" for idx in reversed(range(25))]
@@ -39,6 +39,25 @@ class TestChats(AbstractPostgresTest):
         assert first_chat["created_at"] is not None
         assert first_chat["updated_at"] is not None
 
+    def test_get_session_user_chat_list_by_cursor(self):
+        first_chat = self.chats.get_chat_list_by_user_id("2")[0]
+
+        with mock_webui_user(id="2"):
+            response = self.fast_api_client.get(
+                self.create_url(
+                    "/",
+                    query_params={"cursor": f"{first_chat.updated_at}:{first_chat.id}"},
+                )
+            )
+        assert response.status_code == 200
+        assert response.json() == []
+
+        with mock_webui_user(id="2"):
+            response = self.fast_api_client.get(
+                self.create_url("/", query_params={"cursor": "invalid"})
+            )
+        assert response.status_code == 422
+
     def test_delete_all_user_chats(self):
         with mock_webui_user(id="2"):
             response = self.fast_api_client.delete(self.create_url("/"))
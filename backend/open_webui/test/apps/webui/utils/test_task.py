@@ -0,0 +1,147 @@
+"""
+Golden tests for the task prompt templates.
+
+The expected outputs in task_templates.golden.json were recorded from the
+original re.sub/str.replace implementation. Any change to them is a change
+in the prompts sent to task models. To re-record after an intended change:
+
+    python -m test.apps.webui.utils.test_task
+"""
+
+import json
+from datetime import datetime
+from pathlib import Path
+
+import pytest
+
+from open_webui.config import (
+    DEFAULT_RAG_TEMPLATE,
+    DEFAULT_TAGS_GENERATION_PROMPT_TEMPLATE,
+    DEFAULT_TITLE_GENERATION_PROMPT_TEMPLATE,
+)
+from open_webui.utils import task
+
+GOLDEN_PATH = Path(__file__).parent / "task_templates.golden.json"
+
+USER = {"name": "Ada", "location": "London"}
+MESSAGES = [
+    {"role": "user", "content": "How do I bake bread?"},
+    {"role": "assistant", "content": "Mix flour, water, salt and yeast."},
+    {"role": "user", "content": [{"type": "text", "text": "How long to proof?"}]},
+    {"role": "assistant", "content": "About two hours."},
+    {"role": "user", "content": "And at what temperature?"},
+]
+VARIABLES_TEMPLATE = (
+    "{{prompt}}|{{PROMPT:START:4}}|{{prompt:end:5}}|{{prompt:middletruncate:9}}|"
+    "{{prompt:middletruncate:999}}|{{MESSAGES:START:1}}|{{MESSAGES:END:2}}|"
+    "{{MESSAGES:MIDDLETRUNCATE:2}}|{{MESSAGES:MIDDLETRUNCATE:3}}|"
+    "{{MESSAGES:MIDDLETRUNCATE:99}}|{{messages}}|{{CURRENT_DATE}} "
+    "{{CURRENT_TIME}} {{CURRENT_DATETIME}} {{CURRENT_WEEKDAY}} {{USER_NAME}} "
+    "{{USER_LOCATION}} {{TYPE}}"
+)
+CONTEXT = '<source id="1">Bread needs [query] answered. {{QUERY}}</source>'
+
+CASES = {
+    "prompt_template": lambda: task.prompt_template(VARIABLES_TEMPLATE, "Ada"),
+    "prompt_template_unknown_user": lambda: task.prompt_template(VARIABLES_TEMPLATE),
+    "prompt_template_cascade": lambda: task.prompt_template(
+        "{{USER_NAME}} in {{USER_LOCATION}}", "{{USER_LOCATION}}", "{{CURRENT_DATE}}"
+    ),
+    "replace_prompt_variable": lambda: task.replace_prompt_variable(
+        VARIABLES_TEMPLATE, "abcdefghijklmnop"
+    ),
+    "replace_messages_variable": lambda: task.replace_messages_variable(
+        VARIABLES_TEMPLATE, MESSAGES
+    ),
+    "replace_messages_variable_none": lambda: task.replace_messages_variable(
+        VARIABLES_TEMPLATE, None
+    ),
+    "title_default": lambda: task.title_generation_template(
+        DEFAULT_TITLE_GENERATION_PROMPT_TEMPLATE, MESSAGES, USER
+    ),
+    "title_variables": lambda: task.title_generation_template(
+        VARIABLES_TEMPLATE, MESSAGES, USER
+    ),
+    "title_no_user": lambda: task.title_generation_template(
+        VARIABLES_TEMPLATE, MESSAGES
+    ),
+    "title_cascade": lambda: task.title_generation_template(
+        "{{prompt}} / {{MESSAGES:END:1}}",
+        [{"role": "user", "content": "{{MESSAGES}} {{CURRENT_WEEKDAY}} {{USER_NAME}}"}],
+        {"name": "{{CURRENT_DATE}}"},
+    ),
+    "title_no_user_message": lambda: task.title_generation_template(
+        "{{prompt}}|{{MESSAGES}}", [{"role": "assistant", "content": "Hi"}]
+    ),
+    "tags_default": lambda: task.tags_generation_template(
+        DEFAULT_TAGS_GENERATION_PROMPT_TEMPLATE, MESSAGES, USER
+    ),
+    "image_prompt": lambda: task.image_prompt_generation_template(
+        VARIABLES_TEMPLATE, MESSAGES, USER
+    ),
+    "query": lambda: task.query_generation_template(VARIABLES_TEMPLATE, MESSAGES, USER),
+    "emoji": lambda: task.emoji_generation_template(
+        VARIABLES_TEMPLATE, "I love {{CURRENT_DATE}}", USER
+    ),
+    "autocomplete": lambda: task.autocomplete_generation_template(
+        VARIABLES_TEMPLATE, "Once upon a", MESSAGES, "search query", USER
+    ),
+    "autocomplete_no_messages": lambda: task.autocomplete_generation_template(
+        VARIABLES_TEMPLATE, "{{TYPE}}", None, None
+    ),
+    "moa": lambda: task.moa_response_generation_template(
+        "{{prompt}}|{{PROMPT}}|{{prompt:start:3}}|{{prompt:middletruncate:6}}"
+        "\n{{responses}}",
+        "What is {{responses}}?",
+        ["first", "second {{prompt}}"],
+    ),
+    "rag_default": lambda: task.rag_template(
+        DEFAULT_RAG_TEMPLATE, CONTEXT, "how to proof"
+    ),
+    "rag_empty_template": lambda: task.rag_template("  ", "Plain context", "q"),
+    "rag_brackets": lambda: task.rag_template(
+        "[context]\n{{CONTEXT}}\nQ: [query] / {{QUERY}} on {{CURRENT_DATE}}",
+        CONTEXT,
+        "proof time",
+    ),
+    "rag_plain_context": lambda: task.rag_template(
+        "[context]\nQ: [query] / {{QUERY}}", "Nothing special", "q [query] {{QUERY}}"
+    ),
+    "rag_nested_context": lambda: task.rag_template(
+        "[context]|{{CONTEXT}}|[query]", "A {{CONTEXT}} B [query]", "{{QUERY}}"
+    ),
+    "rag_no_placeholders": lambda: task.rag_template("Just text", CONTEXT, "q"),
+}
+
+
+class FrozenDatetime(datetime):
+    @classmethod
+    def now(cls, tz=None):
+        return cls(2024, 2, 29, 13, 5, 9)
+
+
+def render_cases() -> dict[str, str]:
+    return {name: case() for name, case in CASES.items()}
+
+
+@pytest.fixture(autouse=True)
+def frozen_time(monkeypatch):
+    monkeypatch.setattr(task, "datetime", FrozenDatetime)
+
+
+@pytest.mark.parametrize("name", CASES)
+def test_task_template_golden(name):
+    golden = json.loads(GOLDEN_PATH.read_text())
+    assert CASES[name]() == golden[name]
+
+
+def test_task_templates_are_cached():
+    task.title_generation_template(DEFAULT_TITLE_GENERATION_PROMPT_TEMPLATE, MESSAGES)
+    hits = task.compile_template.cache_info().hits
+    task.title_generation_template(DEFAULT_TITLE_GENERATION_PROMPT_TEMPLATE, MESSAGES)
+    assert task.compile_template.cache_info().hits == hits + 1
+
+
+if __name__ == "__main__":
+    task.datetime = FrozenDatetime
+    GOLDEN_PATH.write_text(json.dumps(render_cases(), indent=2, ensure_ascii=False))
@@ -0,0 +1,143 @@
+"""
+Latency and memory of the chat list queries with heavy chat histories.
+
+Seeds a scratch database with one user owning --chats chats of roughly
+--size-kb of message history each, then times each listing method and
+records the Python heap peak while it runs. The "full rows" line loads and
+validates whole Chat rows, which is what the listings did before they
+switched to column projections.
+
+    python -m open_webui.test.benchmarks.chat_listing --chats 1000 --size-kb 512
+
+Uses a temporary SQLite database unless --url points somewhere else. The
+database must be disposable: it is migrated and filled with fake rows.
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+import uuid
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--url", default=None)
+    parser.add_argument("--chats", type=int, default=1000)
+    parser.add_argument("--size-kb", type=int, default=512)
+    parser.add_argument("--repeat", type=int, default=3)
+    return parser.parse_args()
+
+
+args = parse_args()
+
+# The database URL is read when open_webui is imported
+if args.url:
+    os.environ["DATABASE_URL"] = args.url
+else:
+    data_dir = tempfile.mkdtemp(prefix="chat-bench-")
+    os.environ["DATA_DIR"] = data_dir
+    os.environ["DATABASE_URL"] = f"sqlite:///{data_dir}/webui.db"
+
+import open_webui.config  # noqa: E402,F401  runs migrations
+from open_webui.internal.db import get_db  # noqa: E402
+from open_webui.models.chats import Chat, ChatModel, Chats  # noqa: E402
+
+USER_ID = str(uuid.uuid4())
+FOLDER_ID = str(uuid.uuid4())
+
+
+def seed():
+    now = int(time.time())
+
+    # ~1 KB per message
+    content = "lorem ipsum dolor sit amet " * 38
+    messages = [
+        {
+            "id": str(idx),
+            "role": "user" if idx % 2 == 0 else "assistant",
+            "content": content,
+        }
+        for idx in range(args.size_kb)
+    ]
+
+    with get_db() as db:
+        for start in range(0, args.chats, 100):
+            db.bulk_insert_mappings(
+                Chat,
+                [
+                    {
+                        "id": str(uuid.uuid4()),
+                        "user_id": USER_ID,
+                        "title": f"chat {idx}",
+                        "chat": {"title": f"chat {idx}", "messages": messages},
+                        "archived": idx % 10 == 0,
+                        "pinned": idx % 50 == 1,
+                        "folder_id": FOLDER_ID if idx % 4 == 0 else None,
+                        "meta": {"tags": ["bench"]},
+                        "created_at": now,
+                        "updated_at": now - idx,
+                    }
+                    for idx in range(start, min(start + 100, args.chats))
+                ],
+            )
+            db.commit()
+
+
+def get_full_chat_rows():
+    with get_db() as db:
+        return [
+            ChatModel.model_validate(chat)
+            for chat in db.query(Chat)
+            .filter_by(user_id=USER_ID)
+            .order_by(Chat.updated_at.desc())
+        ]
+
+
+def run(name, fn):
+    latencies, peak, size = [], 0, 0
+    for _ in range(args.repeat):
+        tracemalloc.start()
+        start = time.perf_counter()
+        size = len(fn())
+        latencies.append((time.perf_counter() - start) * 1000)
+        peak = max(peak, tracemalloc.get_traced_memory()[1])
+        tracemalloc.stop()
+
+    print(
+        f"{name:<20} rows={size:<6} p50={statistics.median(latencies):.1f}ms "
+        f"peak={peak / 1024 / 1024:.1f}MiB"
+    )
+
+
+def main():
+    start = time.perf_counter()
+    seed()
+    print(
+        f"seeded {args.chats} chats of ~{args.size_kb} KB "
+        f"in {time.perf_counter() - start:.1f}s"
+    )
+
+    run("full rows", get_full_chat_rows)
+    run(
+        "list",
+        lambda: Chats.get_chat_list_by_user_id(USER_ID, include_archived=True, limit=0),
+    )
+    run("title list", lambda: Chats.get_chat_title_id_list_by_user_id(USER_ID))
+    run("archived", lambda: Chats.get_archived_chat_list_by_user_id(USER_ID))
+    run("pinned", lambda: Chats.get_pinned_chats_by_user_id(USER_ID))
+    run(
+        "folder",
+        lambda: Chats.get_chats_by_folder_id_and_user_id(FOLDER_ID, USER_ID),
+    )
+    run(
+        "tag",
+        lambda: Chats.get_chat_list_by_user_id_and_tag_name(USER_ID, "bench"),
+    )
+
+
+if __name__ == "__main__":
+    sys.exit(main())
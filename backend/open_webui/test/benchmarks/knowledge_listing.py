@@ -0,0 +1,213 @@
+"""
+Latency and query count of the knowledge base listing endpoints.
+
+Seeds a scratch database with users, groups, knowledge bases and files,
+then times the admin listing and a member's read/write listings, counting
+the SQL statements each one issues.
+
+    python -m open_webui.test.benchmarks.knowledge_listing --knowledge 1000 --files 20000
+
+Uses a temporary SQLite database unless --url points somewhere else. The
+database must be disposable: it is migrated and filled with fake rows.
+"""
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+import uuid
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--url", default=None)
+    parser.add_argument("--knowledge", type=int, default=1000)
+    parser.add_argument("--files", type=int, default=20000)
+    parser.add_argument("--users", type=int, default=100)
+    parser.add_argument("--groups", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=42)
+    return parser.parse_args()
+
+
+args = parse_args()
+
+# The database URL is read when open_webui is imported
+if args.url:
+    os.environ["DATABASE_URL"] = args.url
+else:
+    data_dir = tempfile.mkdtemp(prefix="knowledge-bench-")
+    os.environ["DATA_DIR"] = data_dir
+    os.environ["DATABASE_URL"] = f"sqlite:///{data_dir}/webui.db"
+
+from fastapi import BackgroundTasks  # noqa: E402
+from sqlalchemy import event  # noqa: E402
+
+import open_webui.config  # noqa: E402,F401  runs migrations
+from open_webui.internal.db import engine, get_db  # noqa: E402
+from open_webui.models.files import File  # noqa: E402
+from open_webui.models.groups import Group, GroupMember  # noqa: E402
+from open_webui.models.knowledge import Knowledge, Knowledges  # noqa: E402
+from open_webui.models.users import User  # noqa: E402
+from open_webui.routers.knowledge import get_knowledge_bases_with_files  # noqa: E402
+
+QUERIES = 0
+
+
+@event.listens_for(engine, "before_cursor_execute")
+def count_queries(*_):
+    global QUERIES
+    QUERIES += 1
+
+
+def seed():
+    now = int(time.time())
+    user_ids = [str(uuid.uuid4()) for _ in range(args.users)]
+    group_ids = [str(uuid.uuid4()) for _ in range(args.groups)]
+    file_ids = [str(uuid.uuid4()) for _ in range(args.files)]
+
+    members = {
+        group_id: random.sample(user_ids, max(1, args.users // 10))
+        for group_id in group_ids
+    }
+
+    with get_db() as db:
+        db.bulk_insert_mappings(
+            User,
+            [
+                {
+                    "id": user_id,
+                    "name": f"user {idx}",
+                    "email": f"user{idx}@example.com",
+                    "role": "user",
+                    "profile_image_url": "",
+                    "last_active_at": now,
+                    "created_at": now,
+                    "updated_at": now,
+                }
+                for idx, user_id in enumerate(user_ids)
+            ],
+        )
+        db.bulk_insert_mappings(
+            Group,
+            [
+                {
+                    "id": group_id,
+                    "user_id": user_ids[0],
+                    "name": f"group {idx}",
+                    "description": "",
+                    "user_ids": members[group_id],
+                    "permissions": {},
+                    "created_at": now,
+                    "updated_at": now,
+                }
+                for idx, group_id in enumerate(group_ids)
+            ],
+        )
+        db.bulk_insert_mappings(
+            GroupMember,
+            [
+                {"group_id": group_id, "user_id": user_id, "created_at": now}
+                for group_id, user_ids_ in members.items()
+                for user_id in user_ids_
+            ],
+        )
+        db.bulk_insert_mappings(
+            File,
+            [
+                {
+                    "id": file_id,
+                    "user_id": random.choice(user_ids),
+                    "filename": f"{file_id}.txt",
+                    "meta": {"name": f"{file_id}.txt", "size": 1024},
+                    "created_at": now,
+                    "updated_at": now - idx,
+                }
+                for idx, file_id in enumerate(file_ids)
+            ],
+        )
+
+        knowledge_rows = []
+        for idx in range(args.knowledge):
+            access = random.random()
+            if access < 0.2:
+                access_control = None
+            elif access < 0.5:
+                access_control = {}
+            else:
+                access_control = {
+                    "read": {
+                        "group_ids": random.sample(group_ids, 2),
+                        "user_ids": random.sample(user_ids, 2),
+                    },
+                    "write": {"group_ids": [], "user_ids": random.sample(user_ids, 1)},
+                }
+
+            # Roughly every tenth knowledge base references a deleted file
+            kb_file_ids = random.sample(file_ids, args.files // args.knowledge)
+            if idx % 10 == 0:
+                kb_file_ids.append(str(uuid.uuid4()))
+
+            knowledge_rows.append(
+                {
+                    "id": str(uuid.uuid4()),
+                    "user_id": random.choice(user_ids),
+                    "name": f"knowledge {idx}",
+                    "description": "",
+                    "data": {"file_ids": kb_file_ids},
+                    "access_control": access_control,
+                    "created_at": now,
+                    "updated_at": now - idx,
+                }
+            )
+        db.bulk_insert_mappings(Knowledge, knowledge_rows)
+        db.commit()
+
+    return user_ids, members
+
+
+def run(name, fn):
+    global QUERIES
+    latencies, queries, size = [], 0, 0
+    for _ in range(args.repeat):
+        QUERIES = 0
+        start = time.perf_counter()
+        size = len(get_knowledge_bases_with_files(fn(), BackgroundTasks()))
+        latencies.append((time.perf_counter() - start) * 1000)
+        queries = QUERIES
+
+    print(
+        f"{name:<24} rows={size:<6} queries={queries:<4} "
+        f"p50={statistics.median(latencies):.1f}ms max={max(latencies):.1f}ms"
+    )
+
+
+def main():
+    random.seed(args.seed)
+
+    start = time.perf_counter()
+    user_ids, members = seed()
+    print(
+        f"seeded {args.knowledge} knowledge bases and {args.files} files "
+        f"in {time.perf_counter() - start:.1f}s"
+    )
+
+    # A user that belongs to at least one group
+    member_id = next(iter(members.values()))[0]
+
+    run("admin", Knowledges.get_knowledge_bases)
+    run(
+        "user read",
+        lambda: Knowledges.get_knowledge_bases_by_user_id(member_id, "read"),
+    )
+    run(
+        "user write",
+        lambda: Knowledges.get_knowledge_bases_by_user_id(member_id, "write"),
+    )
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,110 @@
+"""
+Rendering time and memory of the RAG prompt template with large contexts.
+
+Builds a context of roughly --tokens tokens (4 characters each) out of
+<source> blocks and renders it into the default RAG template. The
+"sequential" line fills the template in with one str.replace pass per
+placeholder, which is what rag_template did before templates were compiled
+into cached segments. The "+query" lines use a context that itself contains
+[query] placeholders, which forces the extra query passes.
+
+    python -m open_webui.test.benchmarks.task_templates --tokens 100000
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+import uuid
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--tokens", type=int, default=100000)
+    parser.add_argument("--repeat", type=int, default=20)
+    return parser.parse_args()
+
+
+args = parse_args()
+
+# open_webui.config migrates a database on import
+os.environ.setdefault("DATA_DIR", tempfile.mkdtemp(prefix="task-bench-"))
+
+from open_webui.config import DEFAULT_RAG_TEMPLATE  # noqa: E402
+from open_webui.utils.task import prompt_template, rag_template  # noqa: E402
+
+QUERY = "How long should bread dough proof at room temperature?"
+
+
+def build_context(with_query: bool = False) -> str:
+    # ~250 tokens per source
+    text = "Dough rises as yeast ferments the sugars in the flour. " * 18
+    if with_query:
+        text += "Answer [query] here."
+
+    sources = []
+    for idx in range(args.tokens // 250):
+        sources.append(f'<source id="{idx}">{text}</source>')
+    return "\n".join(sources)
+
+
+def sequential_rag_template(template: str, context: str, query: str) -> str:
+    template = prompt_template(template)
+
+    query_placeholders = []
+    for placeholder in ("[query]", "{{QUERY}}"):
+        if placeholder in context:
+            query_placeholder = "{{QUERY" + str(uuid.uuid4()) + "}}"
+            template = template.replace(placeholder, query_placeholder)
+            query_placeholders.append(query_placeholder)
+
+    template = template.replace("[context]", context)
+    template = template.replace("{{CONTEXT}}", context)
+    template = template.replace("[query]", query)
+    template = template.replace("{{QUERY}}", query)
+
+    for query_placeholder in query_placeholders:
+        template = template.replace(query_placeholder, query)
+    return template
+
+
+def run(name, fn):
+    latencies, size = [], 0
+    for _ in range(args.repeat):
+        start = time.perf_counter()
+        size = len(fn())
+        latencies.append((time.perf_counter() - start) * 1000)
+
+    # Measured separately, tracing slows down the timed runs
+    tracemalloc.start()
+    fn()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    print(
+        f"{name:<20} chars={size:<9} p50={statistics.median(latencies):.2f}ms "
+        f"peak={peak / 1024 / 1024:.1f}MiB"
+    )
+
+
+def main():
+    context = build_context()
+    query_context = build_context(with_query=True)
+    print(f"context of ~{args.tokens} tokens ({len(context) / 1024:.0f} KB)")
+
+    for label, ctx in (("", context), ("+query", query_context)):
+        assert rag_template(DEFAULT_RAG_TEMPLATE, ctx, QUERY) == (
+            sequential_rag_template(DEFAULT_RAG_TEMPLATE, ctx, QUERY)
+        )
+        run(
+            f"sequential{label}",
+            lambda: sequential_rag_template(DEFAULT_RAG_TEMPLATE, ctx, QUERY),
+        )
+        run(f"rag{label}", lambda: rag_template(DEFAULT_RAG_TEMPLATE, ctx, QUERY))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,12 +1,43 @@
+import time
 from typing import Optional, Union, List, Dict, Any
 from open_webui.models.users import Users, UserModel
-from open_webui.models.groups import Groups
+from open_webui.models.groups import Groups, GroupModel
 
 
 from open_webui.config import DEFAULT_USER_PERMISSIONS
+from open_webui.env import ACCESS_CONTROL_CACHE_TTL
+from sqlalchemy import String, or_
 import json
 
 
+# user id -> (loaded at, Groups.version, groups)
+USER_GROUPS_CACHE: Dict[str, tuple[float, int, List[GroupModel]]] = {}
+
+
+def get_user_groups(user_id: str) -> List[GroupModel]:
+    """
+    Groups the user is a member of, cached for ACCESS_CONTROL_CACHE_TTL seconds.
+    Group changes made through this worker invalidate the cache immediately.
+    """
+    now = time.monotonic()
+    cached = USER_GROUPS_CACHE.get(user_id)
+    if (
+        cached
+        and now - cached[0] < ACCESS_CONTROL_CACHE_TTL
+        and cached[1] == Groups.version
+    ):
+        return cached[2]
+
+    version = Groups.version
+    groups = Groups.get_groups_by_member_id(user_id)
+    USER_GROUPS_CACHE[user_id] = (now, version, groups)
+    return groups
+
+
+def get_user_group_ids(user_id: str) -> set[str]:
+    return {group.id for group in get_user_groups(user_id)}
+
+
 def fill_missing_permissions(
     permissions: Dict[str, Any], default_permissions: Dict[str, Any]
 ) -> Dict[str, Any]:
@@ -53,7 +84,7 @@ def get_permissions(
                     )  # Use the most permissive value (True > False)
         return permissions
 
-    user_groups = Groups.get_groups_by_member_id(user_id)
+    user_groups = get_user_groups(user_id)
 
     # Deep copy default permissions to avoid modifying the original dict
     permissions = json.loads(json.dumps(default_permissions))
@@ -93,7 +124,7 @@ def has_permission(
     permission_hierarchy = permission_key.split(".")
 
     # Retrieve user group permissions
-    user_groups = Groups.get_groups_by_member_id(user_id)
+    user_groups = get_user_groups(user_id)
 
     for group in user_groups:
         group_permissions = group.permissions
@@ -115,17 +146,36 @@ def has_access(
     if access_control is None:
         return type == "read"
 
-    user_groups = Groups.get_groups_by_member_id(user_id)
-    user_group_ids = [group.id for group in user_groups]
+    user_group_ids = get_user_group_ids(user_id)
     permission_access = access_control.get(type, {})
     permitted_group_ids = permission_access.get("group_ids", [])
     permitted_user_ids = permission_access.get("user_ids", [])
 
-    return user_id in permitted_user_ids or any(
-        group_id in permitted_group_ids for group_id in user_group_ids
+    return user_id in permitted_user_ids or not user_group_ids.isdisjoint(
+        permitted_group_ids
     )
 
 
+def get_access_control_filter(
+    access_control_column, user_id_column, user_id: str, type: str = "write"
+):
+    """
+    SQL pre-filter for rows a user may access: rows they own, public rows when
+    reading, and rows whose access_control mentions the user or one of their
+    groups. The JSON is only string-matched, so rows still need has_access.
+    """
+    access_control = access_control_column.cast(String)
+
+    clauses = [user_id_column == user_id]
+    if type == "read":
+        clauses += [access_control_column.is_(None), access_control == "null"]
+    clauses += [
+        access_control.like(f'%"{id}"%')
+        for id in [user_id, *get_user_group_ids(user_id)]
+    ]
+    return or_(*clauses)
+
+
 # Get all users with access to a resource
 def get_users_with_access(
     type: str = "write", access_control: Optional[dict] = None
@@ -1,5 +1,6 @@
+import asyncio
 from contextlib import asynccontextmanager
-from dataclasses import asdict, dataclass
+from dataclasses import asdict, dataclass, replace
 from enum import Enum
 import re
 from typing import (
@@ -24,9 +25,15 @@ from asgiref.typing import (
 from loguru import logger
 from starlette.requests import Request
 
-from open_webui.env import AUDIT_LOG_LEVEL, MAX_BODY_LOG_SIZE
-from open_webui.utils.auth import get_current_user, get_http_authorization_cred
-from open_webui.models.users import UserModel
+from open_webui.env import (
+    AUDIT_LOG_BATCH_SIZE,
+    AUDIT_LOG_FLUSH_INTERVAL,
+    AUDIT_LOG_LEVEL,
+    AUDIT_LOG_QUEUE_SIZE,
+    MAX_BODY_LOG_SIZE,
+)
+from open_webui.utils.auth import decode_token, get_http_authorization_cred
+from open_webui.models.users import UserModel, Users
 
 
 if TYPE_CHECKING:
@@ -88,6 +95,114 @@ class AuditLogger:
         )
 
 
+def resolve_audit_user(token: str) -> Optional[UserModel]:
+    # Only used when no dependency resolved the user during the request
+    if token.startswith("sk-"):
+        return Users.get_user_by_api_key(token)
+
+    data = decode_token(token)
+    if data is not None and "id" in data:
+        return Users.get_user_by_id(data["id"])
+    return None
+
+
+class AuditLogSink:
+    """
+    Bounded queue of audit entries drained by a background writer. Requests only enqueue; entries are written in batches off the event loop. When the queue is full new entries are dropped and counted instead of slowing down requests.
+    """
+
+    def __init__(
+        self,
+        audit_logger: AuditLogger,
+        *,
+        max_size: int = AUDIT_LOG_QUEUE_SIZE,
+        batch_size: int = AUDIT_LOG_BATCH_SIZE,
+        flush_interval: float = AUDIT_LOG_FLUSH_INTERVAL,
+    ):
+        self.audit_logger = audit_logger
+        self.max_size = max_size
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+
+        self.queue: Optional[asyncio.Queue] = None
+        self.task: Optional[asyncio.Task] = None
+        self.metrics = {"enqueued": 0, "written": 0, "dropped": 0, "failed": 0}
+
+    def put(self, entry: AuditLogEntry, token: Optional[str] = None) -> None:
+        if self.task is None or self.task.done():
+            self.queue = asyncio.Queue(maxsize=self.max_size)
+            self.task = asyncio.create_task(self.run())
+
+        try:
+            self.queue.put_nowait((entry, token))
+            self.metrics["enqueued"] += 1
+        except asyncio.QueueFull:
+            self.metrics["dropped"] += 1
+
+    async def run(self) -> None:
+        dropped = 0
+        batch = []
+        try:
+            while True:
+                batch.append(await self.queue.get())
+                deadline = asyncio.get_running_loop().time() + self.flush_interval
+                while len(batch) < self.batch_size:
+                    timeout = deadline - asyncio.get_running_loop().time()
+                    if timeout <= 0:
+                        break
+                    try:
+                        batch.append(await asyncio.wait_for(self.queue.get(), timeout))
+                    except asyncio.TimeoutError:
+                        break
+
+                pending, batch = batch, []
+                await asyncio.to_thread(self.write_batch, pending)
+
+                if self.metrics["dropped"] > dropped:
+                    logger.warning(
+                        f"Audit log queue full, dropped {self.metrics['dropped'] - dropped} entries"
+                    )
+                    dropped = self.metrics["dropped"]
+        except asyncio.CancelledError:
+            # Flush whatever is left on shutdown
+            while not self.queue.empty():
+                batch.append(self.queue.get_nowait())
+            self.write_batch(batch)
+            raise
+
+    def write_batch(self, batch: list[tuple[AuditLogEntry, Optional[str]]]) -> None:
+        for entry, token in batch:
+            try:
+                if token is not None:
+                    user = resolve_audit_user(token)
+                    if user is None:
+                        continue
+                    entry = replace(
+                        entry,
+                        user=user.model_dump(include={"id", "name", "email", "role"}),
+                    )
+
+                self.audit_logger.write(entry)
+                self.metrics["written"] += 1
+            except Exception as e:
+                self.metrics["failed"] += 1
+                logger.error(f"Failed to log audit entry: {str(e)}")
+
+    async def close(self) -> None:
+        if self.task is None:
+            return
+
+        self.task.cancel()
+        try:
+            await self.task
+        except asyncio.CancelledError:
+            pass
+        self.task = None
+
+
+audit_log_sink = AuditLogSink(AuditLogger(logger))
+
+
 class AuditContext:
     """
     Captures and aggregates the HTTP request and response bodies during the processing of a request. It ensures that only a configurable maximum amount of data is stored to prevent excessive memory usage.
@@ -134,11 +249,16 @@ class AuditLoggingMiddleware:
         audit_level: AuditLevel = AuditLevel.NONE,
     ) -> None:
         self.app = app
-        self.audit_logger = AuditLogger(logger)
+        self.audit_log_sink = audit_log_sink
         self.excluded_paths = excluded_paths or []
         self.max_body_size = max_body_size
         self.audit_level = audit_level
 
+        # match either /api/<resource>/...(for the endpoint /api/chat case) or /api/v1/<resource>/...
+        self.excluded_paths_pattern = re.compile(
+            r"^/api(?:/v1)?/(" + "|".join(self.excluded_paths) + r")\b"
+        )
+
     async def __call__(
         self,
         scope: ASGIScope,
@@ -148,6 +268,8 @@ class AuditLoggingMiddleware:
         if scope["type"] != "http":
             return await self.app(scope, receive, send)
 
+        # Shared with the inner request so the resolved user is visible here
+        scope.setdefault("state", {})
         request = Request(scope=cast(MutableMapping, scope))
 
         if self._should_skip_auditing(request):
@@ -190,14 +312,6 @@ class AuditLoggingMiddleware:
         finally:
             await self._log_audit_entry(request, context)
 
-    async def _get_authenticated_user(self, request: Request) -> UserModel:
-
-        auth_header = request.headers.get("Authorization")
-        assert auth_header
-        user = get_current_user(request, None, get_http_authorization_cred(auth_header))
-
-        return user
-
     def _should_skip_auditing(self, request: Request) -> bool:
         if (
             request.method not in {"POST", "PUT", "PATCH", "DELETE"}
@@ -205,11 +319,7 @@ class AuditLoggingMiddleware:
             or not request.headers.get("authorization")
         ):
             return True
-        # match either /api/<resource>/...(for the endpoint /api/chat case) or /api/v1/<resource>/...
-        pattern = re.compile(
-            r"^/api(?:/v1)?/(" + "|".join(self.excluded_paths) + r")\b"
-        )
-        if pattern.match(request.url.path):
+        if self.excluded_paths_pattern.match(request.url.path):
             return True
 
         return False
@@ -229,11 +339,22 @@ class AuditLoggingMiddleware:
 
     async def _log_audit_entry(self, request: Request, context: AuditContext):
         try:
-            user = await self._get_authenticated_user(request)
+            # Reuse the user resolved by the auth dependency, otherwise let the
+            # background writer look it up from the token
+            user: Optional[UserModel] = getattr(request.state, "user", None)
+            token = None
+            if user is None:
+                token = get_http_authorization_cred(
+                    request.headers.get("Authorization")
+                ).credentials
 
             entry = AuditLogEntry(
                 id=str(uuid.uuid4()),
-                user=user.model_dump(include={"id", "name", "email", "role"}),
+                user=(
+                    user.model_dump(include={"id", "name", "email", "role"})
+                    if user
+                    else {}
+                ),
                 audit_level=self.audit_level.value,
                 verb=request.method,
                 request_uri=str(request.url),
@@ -244,6 +365,6 @@ class AuditLoggingMiddleware:
                 response_object=context.response_body.decode("utf-8", errors="replace"),
             )
 
-            self.audit_logger.write(entry)
+            self.audit_log_sink.put(entry, token)
         except Exception as e:
             logger.error(f"Failed to log audit entry: {str(e)}")
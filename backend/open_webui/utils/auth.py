@@ -194,7 +194,9 @@ def get_current_user(
                     status.HTTP_403_FORBIDDEN, detail=ERROR_MESSAGES.API_KEY_NOT_ALLOWED
                 )
 
-        return get_current_user_by_api_key(token)
+        user = get_current_user_by_api_key(token)
+        request.state.user = user
+        return user
 
     # auth by jwt token
     try:
@@ -217,6 +219,9 @@ def get_current_user(
             # to prevent blocking the request
             if background_tasks:
                 background_tasks.add_task(Users.update_user_last_active_by_id, user.id)
+
+        # Kept on the request so the audit middleware doesn't look it up again
+        request.state.user = user
         return user
     else:
         raise HTTPException(
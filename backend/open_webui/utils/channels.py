@@ -0,0 +1,230 @@
+import asyncio
+import logging
+import time
+from typing import Optional
+
+from open_webui.models.channels import Channels, ChannelModel
+from open_webui.models.users import UserModel
+from open_webui.socket.main import sio, get_user_ids_from_room
+from open_webui.utils.access_control import has_access, get_users_with_access
+from open_webui.utils.webhook import post_webhook
+from open_webui.env import (
+    SRC_LOG_LEVELS,
+    CHANNEL_ACCESS_CACHE_TTL,
+    CHANNEL_EVENT_BATCH_WINDOW,
+    CHANNEL_NOTIFICATION_QUEUE_SIZE,
+)
+
+log = logging.getLogger(__name__)
+log.setLevel(SRC_LOG_LEVELS["MAIN"])
+
+
+####################
+# Channel access
+####################
+
+# channel id -> (loaded at, channel)
+CHANNEL_CACHE: dict[str, tuple[float, ChannelModel]] = {}
+
+# (channel id, user id, type) -> (checked at, allowed)
+CHANNEL_ACCESS_CACHE: dict[tuple[str, str, str], tuple[float, bool]] = {}
+
+
+def invalidate_channel_cache(channel_id: Optional[str] = None):
+    if channel_id is None:
+        CHANNEL_CACHE.clear()
+        CHANNEL_ACCESS_CACHE.clear()
+        return
+
+    CHANNEL_CACHE.pop(channel_id, None)
+    for key in [key for key in CHANNEL_ACCESS_CACHE if key[0] == channel_id]:
+        CHANNEL_ACCESS_CACHE.pop(key, None)
+
+
+async def get_channel(channel_id: str) -> Optional[ChannelModel]:
+    now = time.monotonic()
+    cached = CHANNEL_CACHE.get(channel_id)
+    if cached and now - cached[0] < CHANNEL_ACCESS_CACHE_TTL:
+        return cached[1]
+
+    channel = await asyncio.to_thread(Channels.get_channel_by_id, channel_id)
+    if channel:
+        CHANNEL_CACHE[channel_id] = (now, channel)
+    return channel
+
+
+async def has_channel_access(
+    user: UserModel, channel: ChannelModel, type: str = "read"
+) -> bool:
+    if user.role == "admin":
+        return True
+
+    key = (channel.id, user.id, type)
+    now = time.monotonic()
+    cached = CHANNEL_ACCESS_CACHE.get(key)
+    if cached and now - cached[0] < CHANNEL_ACCESS_CACHE_TTL:
+        return cached[1]
+
+    allowed = await asyncio.to_thread(
+        has_access, user.id, type=type, access_control=channel.access_control
+    )
+    CHANNEL_ACCESS_CACHE[key] = (now, allowed)
+    return allowed
+
+
+####################
+# Channel events
+####################
+
+
+class ChannelEventEmitter:
+    """
+    Buffers channel events per room for CHANNEL_EVENT_BATCH_WINDOW seconds.
+    Updates to the same message that replace each other (reply counts,
+    edits, reactions) are coalesced so only the latest one is emitted.
+    """
+
+    # The client replaces the whole message on each of these, so they all
+    # supersede one another
+    COALESCED_TYPES = {
+        "message:reply",
+        "message:update",
+        "message:reaction:add",
+        "message:reaction:remove",
+    }
+
+    def __init__(self, window: float = CHANNEL_EVENT_BATCH_WINDOW):
+        self.window = window
+        self.buffers: dict[str, dict[tuple, dict]] = {}
+        self.tasks: dict[str, asyncio.Task] = {}
+        self.sequence = 0
+
+    def get_event_key(self, event: dict) -> tuple:
+        event_type = event.get("data", {}).get("type")
+        if event_type in self.COALESCED_TYPES:
+            return ("message", event.get("message_id"))
+
+        self.sequence += 1
+        return (event_type, self.sequence)
+
+    async def emit(self, event: dict, to: str):
+        room = to
+        if self.window <= 0:
+            await sio.emit("channel-events", event, to=room)
+            return
+
+        buffer = self.buffers.setdefault(room, {})
+        key = self.get_event_key(event)
+
+        # The latest event replaces the earlier one and takes its place in
+        # the order, after any events buffered in between
+        buffer.pop(key, None)
+        buffer[key] = event
+
+        if room not in self.tasks:
+            self.tasks[room] = asyncio.create_task(self.flush(room))
+
+    async def flush(self, room: str):
+        try:
+            await asyncio.sleep(self.window)
+        finally:
+            self.tasks.pop(room, None)
+            events = self.buffers.pop(room, {})
+
+            for event in events.values():
+                try:
+                    await sio.emit("channel-events", event, to=room)
+                except Exception as e:
+                    log.exception(f"Error emitting channel event to {room}: {e}")
+
+    async def close(self):
+        for task in list(self.tasks.values()):
+            task.cancel()
+        await asyncio.gather(*self.tasks.values(), return_exceptions=True)
+
+
+channel_event_emitter = ChannelEventEmitter()
+
+
+####################
+# Channel notifications
+####################
+
+
+def send_notification(name, webui_url, channel, message, active_user_ids):
+    users = get_users_with_access("read", channel.access_control)
+
+    for user in users:
+        if user.id in active_user_ids:
+            continue
+        else:
+            if user.settings:
+                webhook_url = user.settings.ui.get("notifications", {}).get(
+                    "webhook_url", None
+                )
+
+                if webhook_url:
+                    post_webhook(
+                        name,
+                        webhook_url,
+                        f"#{channel.name} - {webui_url}/channels/{channel.id}\n\n{message.content}",
+                        {
+                            "action": "channel",
+                            "message": message.content,
+                            "title": channel.name,
+                            "url": f"{webui_url}/channels/{channel.id}",
+                        },
+                    )
+
+
+class ChannelNotificationWorker:
+    """
+    Sends webhook notifications for new channel messages from a background
+    task, so posting a message never waits on the member fan-out.
+    """
+
+    def __init__(self, max_size: int = CHANNEL_NOTIFICATION_QUEUE_SIZE):
+        self.max_size = max_size
+        self.queue: Optional[asyncio.Queue] = None
+        self.task: Optional[asyncio.Task] = None
+        self.dropped = 0
+
+    def put(self, name: str, webui_url: str, channel, message):
+        if self.task is None or self.task.done():
+            self.queue = asyncio.Queue(maxsize=self.max_size)
+            self.task = asyncio.create_task(self.run())
+
+        try:
+            self.queue.put_nowait((name, webui_url, channel, message))
+        except asyncio.QueueFull:
+            self.dropped += 1
+            log.warning(
+                f"Channel notification queue full, dropped {self.dropped} notifications"
+            )
+
+    async def run(self):
+        while True:
+            name, webui_url, channel, message = await self.queue.get()
+            try:
+                active_user_ids = await asyncio.to_thread(
+                    get_user_ids_from_room, f"channel:{channel.id}"
+                )
+                await asyncio.to_thread(
+                    send_notification,
+                    name,
+                    webui_url,
+                    channel,
+                    message,
+                    active_user_ids,
+                )
+            except Exception as e:
+                log.exception(f"Error sending channel notification: {e}")
+
+    async def close(self):
+        if self.task is not None:
+            self.task.cancel()
+            await asyncio.gather(self.task, return_exceptions=True)
+            self.task = None
+
+
+channel_notification_worker = ChannelNotificationWorker()
@@ -42,6 +42,7 @@ from open_webui.models.models import Models
 
 from open_webui.utils.plugin import load_function_module_by_id
 from open_webui.utils.models import get_all_models, check_model_access
+from open_webui.utils.files import inline_image_files
 from open_webui.utils.payload import convert_payload_openai_to_ollama
 from open_webui.utils.response import (
     convert_response_ollama_to_openai,
@@ -188,6 +189,10 @@ async def generate_chat_completion(
 
     model = models[model_id]
 
+    # Chats keep images as file URLs, which neither providers, direct
+    # connections nor pipes can fetch, so they get them inline
+    form_data = await inline_image_files(form_data, user)
+
     if getattr(request.state, "direct", False):
         return await generate_direct_chat_completion(
             request, form_data, user=user, models=models
@@ -253,6 +258,7 @@ async def generate_chat_completion(
             return await generate_function_chat_completion(
                 request, form_data, user=user, models=models
             )
+
         if model.get("owned_by") == "ollama":
             # Using /ollama/api/chat endpoint
             form_data = convert_payload_openai_to_ollama(form_data)
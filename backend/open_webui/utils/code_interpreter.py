@@ -1,14 +1,21 @@
 import asyncio
 import json
 import logging
+import time
 import uuid
+from collections import deque
 from typing import Optional
 
 import aiohttp
 import websockets
 from pydantic import BaseModel
 
-from open_webui.env import SRC_LOG_LEVELS
+from open_webui.env import (
+    SRC_LOG_LEVELS,
+    JUPYTER_KERNEL_POOL_SIZE,
+    JUPYTER_KERNEL_IDLE_TIMEOUT,
+    JUPYTER_KERNEL_MAX_SESSIONS,
+)
 
 logger = logging.getLogger(__name__)
 logger.setLevel(SRC_LOG_LEVELS["MAIN"])
@@ -24,187 +31,392 @@ class ResultModel(BaseModel):
     result: Optional[str] = ""
 
 
-class JupyterCodeExecuter:
+class JupyterKernel:
+    def __init__(self, kernel_id: str):
+        self.id = kernel_id
+        self.lock = asyncio.Lock()
+        self.last_used = time.monotonic()
+
+
+class JupyterKernelPool:
     """
-    Execute code in jupyter notebook
+    Pool of kernels on one Jupyter server
+
+    Kernels are started ahead of time so executions don't wait for kernel
+    start-up. A kernel bound to a session key (e.g. a chat id) is kept, with
+    its state, until it has been idle for JUPYTER_KERNEL_IDLE_TIMEOUT seconds.
+    Kernels used without a session key are restarted before they go back to
+    the warm pool, so no state leaks between executions.
     """
 
     def __init__(
         self,
         base_url: str,
-        code: str,
         token: str = "",
         password: str = "",
-        timeout: int = 60,
+        pool_size: int = JUPYTER_KERNEL_POOL_SIZE,
+        idle_timeout: int = JUPYTER_KERNEL_IDLE_TIMEOUT,
+        max_sessions: int = JUPYTER_KERNEL_MAX_SESSIONS,
     ):
         """
         :param base_url: Jupyter server URL (e.g., "http://localhost:8888")
-        :param code: Code to execute
         :param token: Jupyter authentication token (optional)
         :param password: Jupyter password (optional)
-        :param timeout: WebSocket timeout in seconds (default: 60s)
+        :param pool_size: Number of warm kernels kept ready
+        :param idle_timeout: Seconds before an idle session kernel is shut down
+        :param max_sessions: Maximum number of kernels bound to session keys
         """
         self.base_url = base_url.rstrip("/")
-        self.code = code
         self.token = token
         self.password = password
-        self.timeout = timeout
-        self.kernel_id = ""
-        self.session = aiohttp.ClientSession(base_url=self.base_url)
+        self.pool_size = pool_size
+        self.idle_timeout = idle_timeout
+        self.max_sessions = max_sessions
+
+        self.session: Optional[aiohttp.ClientSession] = None
+        self.signed_in = False
+        self.sign_in_lock = asyncio.Lock()
         self.params = {}
-        self.result = ResultModel()
 
-    async def __aenter__(self):
-        return self
+        self.warm: deque[JupyterKernel] = deque()
+        self.sessions: dict[str, JupyterKernel] = {}
+        self.starting = 0
+        self.background_tasks: set[asyncio.Task] = set()
 
-    async def __aexit__(self, exc_type, exc_val, exc_tb):
-        if self.kernel_id:
-            try:
-                async with self.session.delete(
-                    f"/api/kernels/{self.kernel_id}", params=self.params
+        self.metrics = {
+            "hits": 0,
+            "misses": 0,
+            "kernel_starts": 0,
+            "kernel_start_seconds_total": 0.0,
+            "kernel_start_seconds_last": 0.0,
+            "recycled": 0,
+            "evicted": 0,
+        }
+
+    def get_session(self) -> aiohttp.ClientSession:
+        if self.session is None or self.session.closed:
+            self.session = aiohttp.ClientSession(base_url=self.base_url)
+            self.signed_in = False
+        return self.session
+
+    async def sign_in(self, force: bool = False) -> None:
+        # Cookies and the XSRF token are kept on the session and reused
+        async with self.sign_in_lock:
+            session = self.get_session()
+            if self.signed_in and not force:
+                return
+
+            # password authentication
+            if self.password and not self.token:
+                async with session.get("/login") as response:
+                    response.raise_for_status()
+                    xsrf_token = response.cookies["_xsrf"].value
+                    if not xsrf_token:
+                        raise ValueError("_xsrf token not found")
+                    session.cookie_jar.update_cookies(response.cookies)
+                    session.headers.update({"X-XSRFToken": xsrf_token})
+                async with session.post(
+                    "/login",
+                    data={"_xsrf": xsrf_token, "password": self.password},
+                    allow_redirects=False,
                 ) as response:
                     response.raise_for_status()
+                    session.cookie_jar.update_cookies(response.cookies)
+
+            # token authentication
+            if self.token:
+                self.params.update({"token": self.token})
+
+            self.signed_in = True
+
+    async def request(self, method: str, url: str) -> Optional[dict]:
+        await self.sign_in()
+        for attempt in range(2):
+            async with self.get_session().request(
+                method, url, params=self.params
+            ) as response:
+                # Expired login, sign in again once
+                if response.status == 403 and attempt == 0:
+                    await self.sign_in(force=True)
+                    continue
+                response.raise_for_status()
+                if response.content_type == "application/json":
+                    return await response.json()
+                return None
+
+    async def start_kernel(self) -> JupyterKernel:
+        start = time.monotonic()
+        kernel_data = await self.request("POST", "/api/kernels")
+        elapsed = time.monotonic() - start
+
+        self.metrics["kernel_starts"] += 1
+        self.metrics["kernel_start_seconds_total"] += elapsed
+        self.metrics["kernel_start_seconds_last"] = elapsed
+        logger.debug(f"Started jupyter kernel {kernel_data['id']} in {elapsed:.2f}s")
+        return JupyterKernel(kernel_data["id"])
+
+    async def delete_kernel(self, kernel: JupyterKernel) -> None:
+        try:
+            await self.request("DELETE", f"/api/kernels/{kernel.id}")
+        except Exception as err:
+            logger.exception("close kernel failed, %s", err)
+
+    def run_in_background(self, coroutine) -> None:
+        task = asyncio.create_task(coroutine)
+        self.background_tasks.add(task)
+        task.add_done_callback(self.background_tasks.discard)
+
+    async def fill(self) -> None:
+        while len(self.warm) + self.starting < self.pool_size:
+            self.starting += 1
+            try:
+                self.warm.append(await self.start_kernel())
             except Exception as err:
-                logger.exception("close kernel failed, %s", err)
-        await self.session.close()
+                logger.exception("start warm kernel failed, %s", err)
+                break
+            finally:
+                self.starting -= 1
 
-    async def run(self) -> ResultModel:
+    async def recycle(self, kernel: JupyterKernel) -> None:
+        # Reset the kernel state before handing it to someone else
+        if len(self.warm) + self.starting >= self.pool_size:
+            await self.delete_kernel(kernel)
+            return
+
+        self.starting += 1
         try:
-            await self.sign_in()
-            await self.init_kernel()
-            await self.execute_code()
+            await self.request("POST", f"/api/kernels/{kernel.id}/restart")
+            kernel.last_used = time.monotonic()
+            self.warm.append(kernel)
+            self.metrics["recycled"] += 1
         except Exception as err:
-            logger.exception("execute code failed, %s", err)
-            self.result.stderr = f"Error: {err}"
-        return self.result
+            logger.exception("restart kernel failed, %s", err)
+            await self.delete_kernel(kernel)
+        finally:
+            self.starting -= 1
 
-    async def sign_in(self) -> None:
-        # password authentication
-        if self.password and not self.token:
-            async with self.session.get("/login") as response:
-                response.raise_for_status()
-                xsrf_token = response.cookies["_xsrf"].value
-                if not xsrf_token:
-                    raise ValueError("_xsrf token not found")
-                self.session.cookie_jar.update_cookies(response.cookies)
-                self.session.headers.update({"X-XSRFToken": xsrf_token})
-            async with self.session.post(
-                "/login",
-                data={"_xsrf": xsrf_token, "password": self.password},
-                allow_redirects=False,
-            ) as response:
-                response.raise_for_status()
-                self.session.cookie_jar.update_cookies(response.cookies)
+    def evict_idle(self) -> None:
+        now = time.monotonic()
+        for session_key, kernel in list(self.sessions.items()):
+            if now - kernel.last_used > self.idle_timeout and not kernel.lock.locked():
+                del self.sessions[session_key]
+                self.metrics["evicted"] += 1
+                self.run_in_background(self.delete_kernel(kernel))
 
-        # token authentication
-        if self.token:
-            self.params.update({"token": self.token})
+        # Drop the least recently used sessions over the limit, except those
+        # still executing
+        idle = sorted(
+            (key for key, kernel in self.sessions.items() if not kernel.lock.locked()),
+            key=lambda key: self.sessions[key].last_used,
+        )
+        for session_key in idle[: max(len(self.sessions) - self.max_sessions, 0)]:
+            kernel = self.sessions.pop(session_key)
+            self.metrics["evicted"] += 1
+            self.run_in_background(self.delete_kernel(kernel))
 
-    async def init_kernel(self) -> None:
-        async with self.session.post(
-            url="/api/kernels", params=self.params
-        ) as response:
-            response.raise_for_status()
-            kernel_data = await response.json()
-            self.kernel_id = kernel_data["id"]
+    async def acquire(self, session_key: Optional[str]) -> JupyterKernel:
+        self.evict_idle()
 
-    def init_ws(self) -> (str, dict):
+        kernel = self.sessions.get(session_key) if session_key else None
+        if kernel is None and self.warm:
+            kernel = self.warm.popleft()
+
+        if kernel is not None:
+            self.metrics["hits"] += 1
+        else:
+            self.metrics["misses"] += 1
+            kernel = await self.start_kernel()
+
+            # Another execution for the session got a kernel in the meantime
+            if session_key and session_key in self.sessions:
+                if len(self.warm) < self.pool_size:
+                    self.warm.append(kernel)
+                else:
+                    self.run_in_background(self.delete_kernel(kernel))
+                kernel = self.sessions[session_key]
+
+        if session_key:
+            self.sessions[session_key] = kernel
+
+        self.run_in_background(self.fill())
+        return kernel
+
+    def release(self, kernel: JupyterKernel, session_key: Optional[str]) -> None:
+        kernel.last_used = time.monotonic()
+        if not session_key:
+            self.run_in_background(self.recycle(kernel))
+
+    def init_ws(self, kernel: JupyterKernel) -> (str, dict):
         ws_base = self.base_url.replace("http", "ws")
         ws_params = "?" + "&".join([f"{key}={val}" for key, val in self.params.items()])
-        websocket_url = f"{ws_base}/api/kernels/{self.kernel_id}/channels{ws_params if len(ws_params) > 1 else ''}"
+        websocket_url = f"{ws_base}/api/kernels/{kernel.id}/channels{ws_params if len(ws_params) > 1 else ''}"
         ws_headers = {}
         if self.password and not self.token:
             ws_headers = {
                 "Cookie": "; ".join(
                     [
                         f"{cookie.key}={cookie.value}"
-                        for cookie in self.session.cookie_jar
+                        for cookie in self.get_session().cookie_jar
                     ]
                 ),
-                **self.session.headers,
+                **self.get_session().headers,
             }
         return websocket_url, ws_headers
 
-    async def execute_code(self) -> None:
-        # initialize ws
-        websocket_url, ws_headers = self.init_ws()
-        # execute
-        async with websockets.connect(
-            websocket_url, additional_headers=ws_headers
-        ) as ws:
-            await self.execute_in_jupyter(ws)
-
-    async def execute_in_jupyter(self, ws) -> None:
-        # send message
-        msg_id = uuid.uuid4().hex
-        await ws.send(
-            json.dumps(
-                {
-                    "header": {
-                        "msg_id": msg_id,
-                        "msg_type": "execute_request",
-                        "username": "user",
-                        "session": uuid.uuid4().hex,
-                        "date": "",
-                        "version": "5.3",
-                    },
-                    "parent_header": {},
-                    "metadata": {},
-                    "content": {
-                        "code": self.code,
-                        "silent": False,
-                        "store_history": True,
-                        "user_expressions": {},
-                        "allow_stdin": False,
-                        "stop_on_error": True,
-                    },
-                    "channel": "shell",
-                }
-            )
+    async def execute(
+        self, code: str, timeout: int = 60, session_key: Optional[str] = None
+    ) -> ResultModel:
+        result = ResultModel()
+        kernel = None
+        try:
+            kernel = await self.acquire(session_key)
+            async with kernel.lock:
+                websocket_url, ws_headers = self.init_ws(kernel)
+                async with websockets.connect(
+                    websocket_url, additional_headers=ws_headers
+                ) as ws:
+                    result = await execute_in_jupyter(ws, code, timeout)
+
+                if result.stderr.endswith("Execution timed out."):
+                    # Stop the runaway cell so the kernel can be reused
+                    await self.request("POST", f"/api/kernels/{kernel.id}/interrupt")
+        except Exception as err:
+            logger.exception("execute code failed, %s", err)
+            result.stderr = f"Error: {err}"
+
+            # The kernel may be broken, don't hand it out again
+            if kernel is not None:
+                if session_key and self.sessions.get(session_key) is kernel:
+                    del self.sessions[session_key]
+                self.run_in_background(self.delete_kernel(kernel))
+            kernel = None
+        finally:
+            if kernel is not None:
+                self.release(kernel, session_key)
+        return result
+
+    def get_metrics(self) -> dict:
+        starts = self.metrics["kernel_starts"]
+        return {
+            **self.metrics,
+            "kernel_start_seconds_avg": (
+                self.metrics["kernel_start_seconds_total"] / starts if starts else 0.0
+            ),
+            "warm_kernels": len(self.warm),
+            "session_kernels": len(self.sessions),
+        }
+
+    async def close(self) -> None:
+        kernels = list(self.warm) + list(self.sessions.values())
+        self.warm.clear()
+        self.sessions.clear()
+        for kernel in kernels:
+            await self.delete_kernel(kernel)
+        if self.session is not None:
+            await self.session.close()
+
+
+async def execute_in_jupyter(ws, code: str, timeout: int) -> ResultModel:
+    # send message
+    msg_id = uuid.uuid4().hex
+    await ws.send(
+        json.dumps(
+            {
+                "header": {
+                    "msg_id": msg_id,
+                    "msg_type": "execute_request",
+                    "username": "user",
+                    "session": uuid.uuid4().hex,
+                    "date": "",
+                    "version": "5.3",
+                },
+                "parent_header": {},
+                "metadata": {},
+                "content": {
+                    "code": code,
+                    "silent": False,
+                    "store_history": True,
+                    "user_expressions": {},
+                    "allow_stdin": False,
+                    "stop_on_error": True,
+                },
+                "channel": "shell",
+            }
         )
-        # parse message
-        stdout, stderr, result = "", "", []
-        while True:
-            try:
-                # wait for message
-                message = await asyncio.wait_for(ws.recv(), self.timeout)
-                message_data = json.loads(message)
-                # msg id not match, skip
-                if message_data.get("parent_header", {}).get("msg_id") != msg_id:
-                    continue
-                # check message type
-                msg_type = message_data.get("msg_type")
-                match msg_type:
-                    case "stream":
-                        if message_data["content"]["name"] == "stdout":
-                            stdout += message_data["content"]["text"]
-                        elif message_data["content"]["name"] == "stderr":
-                            stderr += message_data["content"]["text"]
-                    case "execute_result" | "display_data":
-                        data = message_data["content"]["data"]
-                        if "image/png" in data:
-                            result.append(f"data:image/png;base64,{data['image/png']}")
-                        elif "text/plain" in data:
-                            result.append(data["text/plain"])
-                    case "error":
-                        stderr += "\n".join(message_data["content"]["traceback"])
-                    case "status":
-                        if message_data["content"]["execution_state"] == "idle":
-                            break
-
-            except asyncio.TimeoutError:
-                stderr += "\nExecution timed out."
-                break
-        self.result.stdout = stdout.strip()
-        self.result.stderr = stderr.strip()
-        self.result.result = "\n".join(result).strip() if result else ""
+    )
+    # parse message
+    stdout, stderr, result = "", "", []
+    while True:
+        try:
+            # wait for message
+            message = await asyncio.wait_for(ws.recv(), timeout)
+            message_data = json.loads(message)
+            # msg id not match, skip
+            if message_data.get("parent_header", {}).get("msg_id") != msg_id:
+                continue
+            # check message type
+            msg_type = message_data.get("msg_type")
+            match msg_type:
+                case "stream":
+                    if message_data["content"]["name"] == "stdout":
+                        stdout += message_data["content"]["text"]
+                    elif message_data["content"]["name"] == "stderr":
+                        stderr += message_data["content"]["text"]
+                case "execute_result" | "display_data":
+                    data = message_data["content"]["data"]
+                    if "image/png" in data:
+                        result.append(f"data:image/png;base64,{data['image/png']}")
+                    elif "text/plain" in data:
+                        result.append(data["text/plain"])
+                case "error":
+                    stderr += "\n".join(message_data["content"]["traceback"])
+                case "status":
+                    if message_data["content"]["execution_state"] == "idle":
+                        break
+
+        except asyncio.TimeoutError:
+            stderr += "\nExecution timed out."
+            break
+
+    return ResultModel(
+        stdout=stdout.strip(),
+        stderr=stderr.strip(),
+        result="\n".join(result).strip() if result else "",
+    )
+
+
+# One pool per Jupyter server and credentials
+JUPYTER_KERNEL_POOLS: dict[tuple, JupyterKernelPool] = {}
+
+
+def get_kernel_pool(base_url: str, token: str = "", password: str = ""):
+    key = (base_url.rstrip("/"), token or "", password or "")
+    if key not in JUPYTER_KERNEL_POOLS:
+        JUPYTER_KERNEL_POOLS[key] = JupyterKernelPool(base_url, token, password)
+    return JUPYTER_KERNEL_POOLS[key]
+
+
+def get_kernel_pool_metrics() -> list[dict]:
+    return [
+        {"url": base_url, **pool.get_metrics()}
+        for (base_url, _, _), pool in JUPYTER_KERNEL_POOLS.items()
+    ]
+
+
+async def close_kernel_pools() -> None:
+    for pool in JUPYTER_KERNEL_POOLS.values():
+        await pool.close()
+    JUPYTER_KERNEL_POOLS.clear()
 
 
 async def execute_code_jupyter(
-    base_url: str, code: str, token: str = "", password: str = "", timeout: int = 60
+    base_url: str,
+    code: str,
+    token: str = "",
+    password: str = "",
+    timeout: int = 60,
+    session_key: Optional[str] = None,
 ) -> dict:
-    async with JupyterCodeExecuter(
-        base_url, code, token, password, timeout
-    ) as executor:
-        result = await executor.run()
-        return result.model_dump()
+    pool = get_kernel_pool(base_url, token, password)
+    result = await pool.execute(code, timeout, session_key)
+    return result.model_dump()
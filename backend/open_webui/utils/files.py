@@ -0,0 +1,306 @@
+import asyncio
+import base64
+import binascii
+import hashlib
+import io
+import logging
+import mimetypes
+import re
+import uuid
+from typing import Optional
+
+from open_webui.config import get_config, save_config
+from open_webui.models.chats import Chats
+from open_webui.models.files import FileForm, Files
+from open_webui.models.users import UserModel
+from open_webui.storage.provider import Storage
+from open_webui.env import (
+    SRC_LOG_LEVELS,
+    CHAT_IMAGE_MIGRATION_BATCH_SIZE,
+)
+
+log = logging.getLogger(__name__)
+log.setLevel(SRC_LOG_LEVELS["MAIN"])
+
+
+IMAGE_DATA_URL_PATTERN = re.compile(r"^data:(image/[\w.+-]+);base64,(.+)$", re.DOTALL)
+IMAGE_FILE_URL_PATTERN = re.compile(r"^/api/v1/files/([\w-]+)/content$")
+
+
+def get_image_file_url(file_id: str) -> str:
+    return f"/api/v1/files/{file_id}/content"
+
+
+####################
+# Chat image ingestion
+####################
+
+
+def store_image_data_url(url: str, user_id: str, chat_id: str) -> Optional[str]:
+    """
+    Stores a base64 image data URL as a file and returns its file URL. Files
+    are addressed by owner and content, so the same image is stored once.
+    """
+    match = IMAGE_DATA_URL_PATTERN.match(url)
+    if not match:
+        return None
+
+    content_type, encoded = match.groups()
+    try:
+        data = base64.b64decode(encoded, validate=True)
+    except (binascii.Error, ValueError):
+        return None
+
+    digest = hashlib.sha256(data).hexdigest()
+    id = str(uuid.uuid5(uuid.NAMESPACE_URL, f"{user_id}:{digest}"))
+
+    file = Files.get_file_metadata_by_id(id)
+    if file:
+        # Shared chats grant read access to the images they reference
+        chat_ids = file.meta.get("chat_ids", [])
+        if chat_id not in chat_ids:
+            Files.update_file_metadata_by_id(id, {"chat_ids": chat_ids + [chat_id]})
+        return get_image_file_url(id)
+
+    name = f"image{mimetypes.guess_extension(content_type) or ''}"
+    _, path = Storage.upload_file(io.BytesIO(data), f"{id}_{name}")
+    file = Files.insert_new_file(
+        user_id,
+        FileForm(
+            id=id,
+            hash=digest,
+            filename=name,
+            path=path,
+            meta={
+                "name": name,
+                "content_type": content_type,
+                "size": len(data),
+                "chat_ids": [chat_id],
+            },
+        ),
+    )
+
+    # Lost a race with another request storing the same image
+    if file is None and Files.get_file_metadata_by_id(id) is None:
+        return None
+    return get_image_file_url(id)
+
+
+def replace_chat_image_urls(chat: dict, replace) -> bool:
+    """
+    Replaces the image URLs in the chat's messages with replace(url), in
+    place. Returns whether anything was replaced.
+    """
+    messages = list(chat.get("messages") or [])
+    messages.extend((chat.get("history") or {}).get("messages", {}).values())
+
+    changed = False
+    for message in messages:
+        if not isinstance(message, dict):
+            continue
+
+        for file in message.get("files") or []:
+            if isinstance(file, dict) and file.get("type") == "image":
+                url = replace(file.get("url"))
+                if url != file.get("url"):
+                    file["url"] = url
+                    changed = True
+
+        if isinstance(message.get("content"), list):
+            for item in message["content"]:
+                image_url = item.get("image_url") if isinstance(item, dict) else None
+                if isinstance(image_url, dict):
+                    url = replace(image_url.get("url"))
+                    if url != image_url.get("url"):
+                        image_url["url"] = url
+                        changed = True
+
+    return changed
+
+
+def externalize_chat_images(chat: dict, user_id: str, chat_id: str) -> bool:
+    """
+    Replaces inline base64 images in the chat's messages with file URLs, in
+    place. Returns whether anything was replaced.
+    """
+    stored = {}
+
+    def externalize(url: str) -> str:
+        if not isinstance(url, str) or not url.startswith("data:image/"):
+            return url
+
+        if url not in stored:
+            try:
+                stored[url] = store_image_data_url(url, user_id, chat_id) or url
+            except Exception as e:
+                log.exception(f"Error storing chat image: {e}")
+                stored[url] = url
+        return stored[url]
+
+    return replace_chat_image_urls(chat, externalize)
+
+
+def inline_chat_images(chat: dict, user: UserModel) -> bool:
+    """
+    Replaces the file URLs of images in the chat's messages with base64 data
+    URLs, in place, e.g. for exports. Returns whether anything was replaced.
+    """
+    data_urls = {}
+
+    def inline(url: str) -> str:
+        match = IMAGE_FILE_URL_PATTERN.match(url) if isinstance(url, str) else None
+        if not match:
+            return url
+
+        if url not in data_urls:
+            try:
+                data_urls[url] = read_image_file_data_url(match.group(1), user) or url
+            except Exception as e:
+                log.exception(f"Error reading chat image: {e}")
+                data_urls[url] = url
+        return data_urls[url]
+
+    return replace_chat_image_urls(chat, inline)
+
+
+def copy_chat_images(chat: dict, user: UserModel, chat_id: str) -> bool:
+    """
+    Stores the images of a chat copied from another one, e.g. a cloned shared
+    chat, as the user's own files. Returns whether anything was replaced.
+    """
+    inline_chat_images(chat, user)
+    return externalize_chat_images(chat, user.id, chat_id)
+
+
+def externalize_existing_chat_images(
+    batch_size: int = CHAT_IMAGE_MIGRATION_BATCH_SIZE,
+) -> int:
+    """
+    Moves inline images out of every stored chat. Chats are rewritten without
+    touching updated_at, and skipped if they changed in the meantime.
+    """
+    count = 0
+    after_id = None
+    while True:
+        chats = Chats.get_chats_with_inline_images(after_id, batch_size)
+        if not chats:
+            break
+
+        for chat in chats:
+            after_id = chat.id
+
+            # Shared snapshots belong to the chat they were shared from
+            user_id, chat_id = chat.user_id, chat.id
+            if user_id.startswith("shared-"):
+                original = Chats.get_chat_by_id(user_id.removeprefix("shared-"))
+                if not original:
+                    continue
+                user_id, chat_id = original.user_id, original.id
+
+            if externalize_chat_images(chat.chat, user_id, chat_id):
+                if Chats.replace_chat_json_by_id(chat.id, chat.chat, chat.updated_at):
+                    count += 1
+
+    return count
+
+
+async def run_chat_image_migration():
+    """Runs externalize_existing_chat_images once per deployment."""
+    if get_config().get("migrations", {}).get("chat_images"):
+        return
+
+    try:
+        count = await asyncio.to_thread(externalize_existing_chat_images)
+        log.info(f"Moved inline images out of {count} chats")
+    except Exception as e:
+        log.exception(f"Error moving inline images out of chats: {e}")
+        return
+
+    config = get_config()
+    save_config(
+        {
+            **config,
+            "migrations": {**config.get("migrations", {}), "chat_images": True},
+        }
+    )
+
+
+####################
+# Provider payloads
+####################
+
+
+def has_access_to_image_file(file, user: UserModel) -> bool:
+    if file.user_id == user.id or user.role == "admin":
+        return True
+
+    # Images of a shared chat are readable by anyone it's shared with
+    chat_ids = (file.meta or {}).get("chat_ids")
+    return bool(chat_ids) and Chats.has_shared_chat_by_ids(chat_ids)
+
+
+def read_image_file_data_url(file_id: str, user: UserModel) -> Optional[str]:
+    file = Files.get_file_by_id(file_id)
+    if not file or not file.path:
+        return None
+
+    if not has_access_to_image_file(file, user):
+        return None
+
+    with open(Storage.get_file(file.path), "rb") as f:
+        data = f.read()
+
+    content_type = file.meta.get("content_type") or "image/png"
+    return f"data:{content_type};base64,{base64.b64encode(data).decode()}"
+
+
+async def inline_image_files(form_data: dict, user: UserModel) -> dict:
+    """
+    Chats reference stored images by file URL, which providers cannot fetch.
+    Returns the payload with those URLs swapped back for base64 data URLs.
+    """
+    file_ids = set()
+    for message in form_data.get("messages", []):
+        if isinstance(message.get("content"), list):
+            for item in message["content"]:
+                url = (item.get("image_url") or {}).get("url", "")
+                if match := IMAGE_FILE_URL_PATTERN.match(url):
+                    file_ids.add(match.group(1))
+
+    if not file_ids:
+        return form_data
+
+    data_urls = {}
+    for file_id in file_ids:
+        try:
+            data_url = await asyncio.to_thread(read_image_file_data_url, file_id, user)
+        except Exception as e:
+            log.exception(f"Error reading image file {file_id}: {e}")
+            data_url = None
+
+        if data_url:
+            data_urls[get_image_file_url(file_id)] = data_url
+
+    messages = []
+    for message in form_data["messages"]:
+        if isinstance(message.get("content"), list):
+            message = {
+                **message,
+                "content": [
+                    (
+                        {
+                            **item,
+                            "image_url": {
+                                **item["image_url"],
+                                "url": data_urls[item["image_url"]["url"]],
+                            },
+                        }
+                        if (item.get("image_url") or {}).get("url") in data_urls
+                        else item
+                    )
+                    for item in message["content"]
+                ],
+            }
+        messages.append(message)
+
+    return {**form_data, "messages": messages}
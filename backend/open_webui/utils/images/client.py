@@ -0,0 +1,194 @@
+import asyncio
+import json
+import logging
+import tempfile
+import time
+import uuid
+from contextlib import asynccontextmanager
+from typing import Optional
+
+import aiohttp
+from open_webui.env import (
+    SRC_LOG_LEVELS,
+    IMAGE_GENERATION_MAX_CONCURRENT_JOBS,
+    IMAGE_GENERATION_MAX_QUEUED_JOBS,
+    IMAGE_GENERATION_TIMEOUT,
+)
+from pydantic import BaseModel
+
+log = logging.getLogger(__name__)
+log.setLevel(SRC_LOG_LEVELS["IMAGES"])
+
+# Generated images are kept in memory up to this size while downloading
+SPOOL_MAX_SIZE = 8 * 1024 * 1024
+
+
+class ImageGenerationQueueFull(Exception):
+    pass
+
+
+class ImageGenerationJob(BaseModel):
+    id: str
+    user_id: str
+    status: str = "queued"  # queued, running
+    created_at: float
+    started_at: Optional[float] = None
+
+
+class ImageGenerationClient:
+    """
+    Pooled connection to one ComfyUI or Automatic1111 server
+
+    Requests share one aiohttp session. At most max_concurrent jobs run against
+    the server at once and up to max_queued more wait for a slot; further jobs
+    are rejected instead of piling up behind a busy server.
+    """
+
+    def __init__(
+        self,
+        base_url: str,
+        headers: Optional[dict] = None,
+        max_concurrent: int = IMAGE_GENERATION_MAX_CONCURRENT_JOBS,
+        max_queued: int = IMAGE_GENERATION_MAX_QUEUED_JOBS,
+    ):
+        self.base_url = base_url.rstrip("/")
+        self.headers = headers or {}
+        self.max_concurrent = max_concurrent
+        self.max_queued = max_queued
+
+        self.session: Optional[aiohttp.ClientSession] = None
+        self.semaphore = asyncio.Semaphore(max_concurrent)
+        self.jobs: dict[str, ImageGenerationJob] = {}
+
+        self.metrics = {
+            "completed": 0,
+            "failed": 0,
+            "cancelled": 0,
+            "rejected": 0,
+            "wait_seconds_total": 0.0,
+        }
+
+    def get_session(self) -> aiohttp.ClientSession:
+        if self.session is None or self.session.closed:
+            self.session = aiohttp.ClientSession(
+                headers=self.headers,
+                timeout=aiohttp.ClientTimeout(total=IMAGE_GENERATION_TIMEOUT),
+                connector=aiohttp.TCPConnector(limit=self.max_concurrent * 2),
+                trust_env=True,
+            )
+        return self.session
+
+    def get_jobs(self, status: Optional[str] = None) -> list[ImageGenerationJob]:
+        return [job for job in self.jobs.values() if status in (None, job.status)]
+
+    @asynccontextmanager
+    async def job(self, user_id: str):
+        """Waits for a free slot on the server and tracks the job while it runs."""
+        if len(self.get_jobs("queued")) >= self.max_queued:
+            self.metrics["rejected"] += 1
+            raise ImageGenerationQueueFull(
+                "Too many image generations are waiting, try again later."
+            )
+
+        job = ImageGenerationJob(
+            id=str(uuid.uuid4()), user_id=user_id, created_at=time.time()
+        )
+        self.jobs[job.id] = job
+        try:
+            async with self.semaphore:
+                job.status = "running"
+                job.started_at = time.time()
+                self.metrics["wait_seconds_total"] += job.started_at - job.created_at
+
+                yield job
+            self.metrics["completed"] += 1
+        except asyncio.CancelledError:
+            self.metrics["cancelled"] += 1
+            raise
+        except Exception:
+            self.metrics["failed"] += 1
+            raise
+        finally:
+            self.jobs.pop(job.id, None)
+
+    async def get_json(self, path: str, **kwargs):
+        async with self.get_session().get(f"{self.base_url}{path}", **kwargs) as r:
+            r.raise_for_status()
+            return await r.json(content_type=None)
+
+    async def post_json(self, path: str, **kwargs):
+        async with self.get_session().post(f"{self.base_url}{path}", **kwargs) as r:
+            if r.status >= 400:
+                # Surface the server's own error message where there is one
+                try:
+                    data = await r.json(content_type=None)
+                    error = data.get("error", data.get("detail", data))
+                except Exception:
+                    error = await r.text()
+                raise Exception(f"{r.status}: {error}")
+
+            # Some endpoints, e.g. ComfyUI's /interrupt, answer with no body
+            text = await r.text()
+            return json.loads(text) if text else None
+
+    async def download(self, url: str) -> tuple[tempfile.SpooledTemporaryFile, str]:
+        """
+        Streams an image into a spooled temporary file, so large results are
+        never held in memory whole. Returns the file, rewound, and its type.
+        """
+        async with self.get_session().get(url) as r:
+            r.raise_for_status()
+            content_type = r.headers.get("content-type", "")
+            if content_type.split("/")[0] != "image":
+                raise Exception("Url does not point to an image.")
+
+            file = tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_SIZE)
+            async for chunk in r.content.iter_chunked(64 * 1024):
+                file.write(chunk)
+            file.seek(0)
+            return file, content_type
+
+    def get_metrics(self) -> dict:
+        return {
+            "queued": len(self.get_jobs("queued")),
+            "running": len(self.get_jobs("running")),
+            **self.metrics,
+        }
+
+    async def close(self):
+        if self.session is not None:
+            await self.session.close()
+
+
+# One client per image server and credentials
+IMAGE_GENERATION_CLIENTS: dict[tuple, ImageGenerationClient] = {}
+
+
+def get_image_generation_client(
+    base_url: str,
+    headers: Optional[dict] = None,
+    max_concurrent: int = IMAGE_GENERATION_MAX_CONCURRENT_JOBS,
+) -> ImageGenerationClient:
+    key = (
+        base_url.rstrip("/"),
+        tuple(sorted((headers or {}).items())),
+        max_concurrent,
+    )
+    if key not in IMAGE_GENERATION_CLIENTS:
+        IMAGE_GENERATION_CLIENTS[key] = ImageGenerationClient(
+            base_url, headers, max_concurrent=max_concurrent
+        )
+    return IMAGE_GENERATION_CLIENTS[key]
+
+
+def get_image_generation_metrics() -> list[dict]:
+    return [
+        {"url": client.base_url, **client.get_metrics()}
+        for client in IMAGE_GENERATION_CLIENTS.values()
+    ]
+
+
+async def close_image_generation_clients() -> None:
+    for client in IMAGE_GENERATION_CLIENTS.values():
+        await client.close()
+    IMAGE_GENERATION_CLIENTS.clear()
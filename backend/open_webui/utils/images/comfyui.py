@@ -3,11 +3,14 @@ import json
 import logging
 import random
 import urllib.parse
-import urllib.request
-from typing import Optional
+from typing import Callable, Optional
 
-import websocket  # NOTE: websocket-client (https://github.com/websocket-client/websocket-client)
+import aiohttp
 from open_webui.env import SRC_LOG_LEVELS
+from open_webui.utils.images.client import (
+    ImageGenerationClient,
+    get_image_generation_client,
+)
 from pydantic import BaseModel
 
 log = logging.getLogger(__name__)
@@ -16,34 +19,32 @@ log.setLevel(SRC_LOG_LEVELS["COMFYUI"])
 default_headers = {"User-Agent": "Mozilla/5.0"}
 
 
-def queue_prompt(prompt, client_id, base_url, api_key):
+def get_comfyui_client(base_url, api_key) -> ImageGenerationClient:
+    return get_image_generation_client(
+        base_url, {**default_headers, "Authorization": f"Bearer {api_key}"}
+    )
+
+
+async def queue_prompt(client: ImageGenerationClient, prompt, client_id):
     log.info("queue_prompt")
     p = {"prompt": prompt, "client_id": client_id}
-    data = json.dumps(p).encode("utf-8")
-    log.debug(f"queue_prompt data: {data}")
+    log.debug(f"queue_prompt data: {p}")
     try:
-        req = urllib.request.Request(
-            f"{base_url}/prompt",
-            data=data,
-            headers={**default_headers, "Authorization": f"Bearer {api_key}"},
-        )
-        response = urllib.request.urlopen(req).read()
-        return json.loads(response)
+        return await client.post_json("/prompt", json=p)
     except Exception as e:
         log.exception(f"Error while queuing prompt: {e}")
         raise e
 
 
-def get_image(filename, subfolder, folder_type, base_url, api_key):
-    log.info("get_image")
-    data = {"filename": filename, "subfolder": subfolder, "type": folder_type}
-    url_values = urllib.parse.urlencode(data)
-    req = urllib.request.Request(
-        f"{base_url}/view?{url_values}",
-        headers={**default_headers, "Authorization": f"Bearer {api_key}"},
-    )
-    with urllib.request.urlopen(req) as response:
-        return response.read()
+async def cancel_prompt(client: ImageGenerationClient, prompt_id, running):
+    log.info("cancel_prompt")
+    try:
+        await client.post_json("/queue", json={"delete": [prompt_id]})
+        # Only interrupt while our own prompt is the one executing
+        if running:
+            await client.post_json("/interrupt", json={"prompt_id": prompt_id})
+    except Exception as e:
+        log.exception(f"Error while cancelling prompt: {e}")
 
 
 def get_image_url(filename, subfolder, folder_type, base_url):
@@ -53,41 +54,69 @@ def get_image_url(filename, subfolder, folder_type, base_url):
     return f"{base_url}/view?{url_values}"
 
 
-def get_history(prompt_id, base_url, api_key):
+async def get_history(client: ImageGenerationClient, prompt_id):
     log.info("get_history")
+    return await client.get_json(f"/history/{prompt_id}")
 
-    req = urllib.request.Request(
-        f"{base_url}/history/{prompt_id}",
-        headers={**default_headers, "Authorization": f"Bearer {api_key}"},
-    )
-    with urllib.request.urlopen(req) as response:
-        return json.loads(response.read())
 
+async def get_images(
+    client: ImageGenerationClient,
+    ws: aiohttp.ClientWebSocketResponse,
+    prompt,
+    client_id,
+    event_emitter: Optional[Callable] = None,
+):
+    prompt_id = (await queue_prompt(client, prompt, client_id))["prompt_id"]
+    running = False
+    try:
+        async for msg in ws:
+            if msg.type in (aiohttp.WSMsgType.CLOSED, aiohttp.WSMsgType.ERROR):
+                raise Exception("ComfyUI closed the WebSocket connection.")
+            if msg.type != aiohttp.WSMsgType.TEXT:
+                continue  # previews are binary data
+
+            message = json.loads(msg.data)
+            data = message.get("data") or {}
+            if data.get("prompt_id", prompt_id) != prompt_id:
+                continue
+
+            if message["type"] == "execution_start":
+                running = True
+            elif message["type"] == "progress" and event_emitter:
+                await event_emitter(
+                    {
+                        "type": "status",
+                        "data": {
+                            "description": f"Generating an image ({data['value']}/{data['max']})",
+                            "done": False,
+                        },
+                    }
+                )
+            elif message["type"] == "execution_error":
+                raise Exception(data.get("exception_message", "Execution failed"))
+            elif message["type"] == "execution_success" or (
+                message["type"] == "executing" and data.get("node") is None
+            ):
+                break  # Execution is done
+        else:
+            raise Exception("ComfyUI closed the WebSocket connection.")
+    except asyncio.CancelledError:
+        await cancel_prompt(client, prompt_id, running)
+        raise
 
-def get_images(ws, prompt, client_id, base_url, api_key):
-    prompt_id = queue_prompt(prompt, client_id, base_url, api_key)["prompt_id"]
+    history = (await get_history(client, prompt_id))[prompt_id]
     output_images = []
-    while True:
-        out = ws.recv()
-        if isinstance(out, str):
-            message = json.loads(out)
-            if message["type"] == "executing":
-                data = message["data"]
-                if data["node"] is None and data["prompt_id"] == prompt_id:
-                    break  # Execution is done
-        else:
-            continue  # previews are binary data
-
-    history = get_history(prompt_id, base_url, api_key)[prompt_id]
-    for o in history["outputs"]:
-        for node_id in history["outputs"]:
-            node_output = history["outputs"][node_id]
-            if "images" in node_output:
-                for image in node_output["images"]:
-                    url = get_image_url(
-                        image["filename"], image["subfolder"], image["type"], base_url
-                    )
-                    output_images.append({"url": url})
+    for node_id in history["outputs"]:
+        node_output = history["outputs"][node_id]
+        if "images" in node_output:
+            for image in node_output["images"]:
+                url = get_image_url(
+                    image["filename"],
+                    image["subfolder"],
+                    image["type"],
+                    client.base_url,
+                )
+                output_images.append({"url": url})
     return {"data": output_images}
 
 
@@ -117,7 +146,12 @@ class ComfyUIGenerateImageForm(BaseModel):
 
 
 async def comfyui_generate_image(
-    model: str, payload: ComfyUIGenerateImageForm, client_id, base_url, api_key
+    model: str,
+    payload: ComfyUIGenerateImageForm,
+    client_id,
+    base_url,
+    api_key,
+    event_emitter: Optional[Callable] = None,
 ):
     ws_url = base_url.replace("http://", "ws://").replace("https://", "wss://")
     workflow = json.loads(payload.workflow.workflow)
@@ -169,25 +203,20 @@ async def comfyui_generate_image(
             for node_id in node.node_ids:
                 workflow[node_id]["inputs"][node.key] = node.value
 
-    try:
-        ws = websocket.WebSocket()
-        headers = {"Authorization": f"Bearer {api_key}"}
-        ws.connect(f"{ws_url}/ws?clientId={client_id}", header=headers)
-        log.info("WebSocket connection established.")
-    except Exception as e:
-        log.exception(f"Failed to connect to WebSocket server: {e}")
-        return None
-
-    try:
-        log.info("Sending workflow to WebSocket server.")
-        log.info(f"Workflow: {workflow}")
-        images = await asyncio.to_thread(
-            get_images, ws, workflow, client_id, base_url, api_key
-        )
-    except Exception as e:
-        log.exception(f"Error while receiving images: {e}")
-        images = None
-
-    ws.close()
-
-    return images
+    client = get_comfyui_client(base_url, api_key)
+    async with client.job(client_id) as job:
+        # A client id per job, ComfyUI only talks to the latest socket of an id
+        client_id = f"{client_id}-{job.id}"
+        try:
+            ws = await client.get_session().ws_connect(
+                f"{ws_url}/ws?clientId={client_id}"
+            )
+            log.info("WebSocket connection established.")
+        except Exception as e:
+            log.exception(f"Failed to connect to WebSocket server: {e}")
+            raise Exception(f"Failed to connect to ComfyUI: {e}")
+
+        async with ws:
+            log.info("Sending workflow to WebSocket server.")
+            log.info(f"Workflow: {workflow}")
+            return await get_images(client, ws, workflow, client_id, event_emitter)
@@ -34,9 +34,10 @@ from open_webui.routers.tasks import (
     generate_title,
     generate_image_prompt,
     generate_chat_tags,
+    generate_chat_title_and_tags,
 )
 from open_webui.routers.retrieval import process_web_search, SearchForm
-from open_webui.routers.images import image_generations, GenerateImageForm
+from open_webui.routers.images import generate_images, GenerateImageForm
 from open_webui.routers.pipelines import (
     process_pipeline_inlet_filter,
     process_pipeline_outlet_filter,
@@ -57,10 +58,10 @@ from open_webui.utils.task import (
     get_task_model_id,
     rag_template,
     tools_function_calling_generation_template,
+    truncate_messages,
 )
 from open_webui.utils.misc import (
     deep_update,
-    get_message_list,
     add_or_update_system_message,
     add_or_update_user_message,
     get_last_user_message,
@@ -88,6 +89,11 @@ from open_webui.env import (
     GLOBAL_LOG_LEVEL,
     BYPASS_MODEL_ACCESS_CONTROL,
     ENABLE_REALTIME_CHAT_SAVE,
+    TOOL_CALL_TIMEOUT,
+    TITLE_GENERATION_TOKEN_BUDGET,
+    TAGS_GENERATION_TOKEN_BUDGET,
+    ENABLE_TITLE_TAGS_FUSION,
+    TOOL_CALL_MAX_CONCURRENCY,
 )
 from open_webui.constants import TASKS
 
@@ -521,10 +527,12 @@ async def chat_image_generation_handler(
     system_message_content = ""
 
     try:
-        images = await image_generations(
+        images = await generate_images(
             request=request,
             form_data=GenerateImageForm(**{"prompt": prompt}),
             user=user,
+            event_emitter=__event_emitter__,
+            chat_id=extra_params["__metadata__"].get("chat_id"),
         )
 
         await __event_emitter__(
@@ -952,111 +960,129 @@ async def process_chat_payload(request, form_data, user, metadata, model):
 
 
 async def process_chat_response(
-    request, response, form_data, user, metadata, model, events, tasks
+    request,
+    response,
+    form_data,
+    user,
+    metadata,
+    model,
+    events,
+    tasks,
+    task_messages: Optional[list[dict]] = None,
 ):
-    async def background_tasks_handler():
-        message_map = Chats.get_messages_by_chat_id(metadata["chat_id"])
-        message = message_map.get(metadata["message_id"]) if message_map else None
+    def get_task_response_json(res) -> Optional[dict]:
+        if not res or not isinstance(res, dict):
+            return None
 
-        if message:
-            messages = get_message_list(message_map, message.get("id"))
+        choices = res.get("choices", [])
+        if len(choices) != 1:
+            return {}
 
-            if tasks and messages:
-                if TASKS.TITLE_GENERATION in tasks:
-                    if tasks[TASKS.TITLE_GENERATION]:
-                        res = await generate_title(
-                            request,
-                            {
-                                "model": message["model"],
-                                "messages": messages,
-                                "chat_id": metadata["chat_id"],
-                            },
-                            user,
-                        )
+        content = choices[0].get("message", {}).get("content", "")
+        try:
+            return json.loads(content[content.find("{") : content.rfind("}") + 1])
+        except Exception:
+            return {}
 
-                        if res and isinstance(res, dict):
-                            if len(res.get("choices", [])) == 1:
-                                title_string = (
-                                    res.get("choices", [])[0]
-                                    .get("message", {})
-                                    .get("content", message.get("content", "New Chat"))
-                                )
-                            else:
-                                title_string = ""
+    async def set_chat_title(title: str):
+        Chats.update_chat_title_by_id(metadata["chat_id"], title)
+        await event_emitter({"type": "chat:title", "data": title})
 
-                            title_string = title_string[
-                                title_string.find("{") : title_string.rfind("}") + 1
-                            ]
+    async def set_chat_tags(tags: list[str]):
+        Chats.update_chat_tags_by_id(metadata["chat_id"], tags, user)
+        await event_emitter({"type": "chat:tags", "data": tags})
 
-                            try:
-                                title = json.loads(title_string).get(
-                                    "title", "New Chat"
-                                )
-                            except Exception as e:
-                                title = ""
+    async def title_task(messages: list[dict]):
+        res = await generate_title(
+            request,
+            {
+                "model": model["id"],
+                "messages": truncate_messages(messages, TITLE_GENERATION_TOKEN_BUDGET),
+                "chat_id": metadata["chat_id"],
+            },
+            user,
+        )
 
-                            if not title:
-                                title = messages[0].get("content", "New Chat")
+        data = get_task_response_json(res)
+        if data is not None:
+            await set_chat_title(
+                data.get("title") or messages[0].get("content", "New Chat")
+            )
 
-                            Chats.update_chat_title_by_id(metadata["chat_id"], title)
+    async def tags_task(messages: list[dict]):
+        res = await generate_chat_tags(
+            request,
+            {
+                "model": model["id"],
+                "messages": truncate_messages(messages, TAGS_GENERATION_TOKEN_BUDGET),
+                "chat_id": metadata["chat_id"],
+            },
+            user,
+        )
 
-                            await event_emitter(
-                                {
-                                    "type": "chat:title",
-                                    "data": title,
-                                }
-                            )
-                    elif len(messages) == 2:
-                        title = messages[0].get("content", "New Chat")
+        data = get_task_response_json(res)
+        if data and isinstance(data.get("tags"), list):
+            await set_chat_tags(data["tags"])
 
-                        Chats.update_chat_title_by_id(metadata["chat_id"], title)
+    async def title_tags_task(messages: list[dict]):
+        res = await generate_chat_title_and_tags(
+            request,
+            {
+                "model": model["id"],
+                "messages": truncate_messages(
+                    messages,
+                    max(TITLE_GENERATION_TOKEN_BUDGET, TAGS_GENERATION_TOKEN_BUDGET),
+                ),
+                "chat_id": metadata["chat_id"],
+            },
+            user,
+        )
 
-                        await event_emitter(
-                            {
-                                "type": "chat:title",
-                                "data": message.get("content", "New Chat"),
-                            }
-                        )
+        data = get_task_response_json(res)
+        if data is not None:
+            await set_chat_title(
+                data.get("title") or messages[0].get("content", "New Chat")
+            )
+        if data and isinstance(data.get("tags"), list):
+            await set_chat_tags(data["tags"])
 
-                if TASKS.TAGS_GENERATION in tasks and tasks[TASKS.TAGS_GENERATION]:
-                    res = await generate_chat_tags(
-                        request,
-                        {
-                            "model": message["model"],
-                            "messages": messages,
-                            "chat_id": metadata["chat_id"],
-                        },
-                        user,
-                    )
+    async def background_tasks_handler(content: str):
+        if not tasks or not task_messages:
+            return
 
-                    if res and isinstance(res, dict):
-                        if len(res.get("choices", [])) == 1:
-                            tags_string = (
-                                res.get("choices", [])[0]
-                                .get("message", {})
-                                .get("content", "")
-                            )
-                        else:
-                            tags_string = ""
+        # The conversation as sent with the request plus this response, so
+        # the chat doesn't have to be read back from the database
+        messages = [*task_messages, {"role": "assistant", "content": content}]
 
-                        tags_string = tags_string[
-                            tags_string.find("{") : tags_string.rfind("}") + 1
-                        ]
+        title_enabled = tasks.get(TASKS.TITLE_GENERATION)
+        tags_enabled = tasks.get(TASKS.TAGS_GENERATION)
 
-                        try:
-                            tags = json.loads(tags_string).get("tags", [])
-                            Chats.update_chat_tags_by_id(
-                                metadata["chat_id"], tags, user
-                            )
+        jobs = []
+        if (
+            title_enabled
+            and tags_enabled
+            and ENABLE_TITLE_TAGS_FUSION
+            and request.app.state.config.ENABLE_TITLE_GENERATION
+            and request.app.state.config.ENABLE_TAGS_GENERATION
+            # Custom templates can't be merged, keep them as separate calls
+            and request.app.state.config.TITLE_GENERATION_PROMPT_TEMPLATE == ""
+            and request.app.state.config.TAGS_GENERATION_PROMPT_TEMPLATE == ""
+        ):
+            jobs.append(title_tags_task(messages))
+        else:
+            if title_enabled:
+                jobs.append(title_task(messages))
+            elif TASKS.TITLE_GENERATION in tasks and len(messages) == 2:
+                jobs.append(set_chat_title(messages[0].get("content", "New Chat")))
 
-                            await event_emitter(
-                                {
-                                    "type": "chat:tags",
-                                    "data": tags,
-                                }
-                            )
-                        except Exception as e:
-                            pass
+            if tags_enabled:
+                jobs.append(tags_task(messages))
+
+        # Each task works on its own copy of the messages, so they can run
+        # side by side
+        for result in await asyncio.gather(*jobs, return_exceptions=True):
+            if isinstance(result, Exception):
+                log.error(f"Error running background task: {result}")
 
     event_emitter = None
     event_caller = None
@@ -1144,7 +1170,7 @@ async def process_chat_response(
                                 },
                             )
 
-                    await background_tasks_handler()
+                    await background_tasks_handler(content)
 
             return response
         else:
@@ -1879,8 +1905,7 @@ async def process_chat_response(
 
                     tools = metadata.get("tools", {})
 
-                    results = []
-                    for tool_call in response_tool_calls:
+                    async def execute_tool_call(tool_call):
                         tool_call_id = tool_call.get("id", "")
                         tool_name = tool_call.get("function", {}).get("name", "")
 
@@ -1922,7 +1947,7 @@ async def process_chat_response(
                                 }
 
                                 if tool.get("direct", False):
-                                    tool_result = await event_caller(
+                                    tool_coroutine = event_caller(
                                         {
                                             "type": "execute:tool",
                                             "data": {
@@ -1939,10 +1964,18 @@ async def process_chat_response(
 
                                 else:
                                     tool_function = tool["callable"]
-                                    tool_result = await tool_function(
+                                    tool_coroutine = tool_function(
                                         **tool_function_params
                                     )
 
+                                tool_result = await asyncio.wait_for(
+                                    tool_coroutine, timeout=TOOL_CALL_TIMEOUT
+                                )
+                            except asyncio.TimeoutError:
+                                tool_result = (
+                                    f"Tool {tool_name} timed out after "
+                                    f"{TOOL_CALL_TIMEOUT} seconds"
+                                )
                             except Exception as e:
                                 tool_result = str(e)
 
@@ -1959,19 +1992,66 @@ async def process_chat_response(
                         ):
                             tool_result = json.dumps(tool_result, indent=2)
 
-                        results.append(
+                        return {
+                            "tool_call_id": tool_call_id,
+                            "content": tool_result,
+                            **(
+                                {"files": tool_result_files}
+                                if tool_result_files
+                                else {}
+                            ),
+                        }
+
+                    # Independent calls from one model turn run concurrently,
+                    # results are reported as they land and kept in call order
+                    tool_call_semaphore = asyncio.Semaphore(TOOL_CALL_MAX_CONCURRENCY)
+                    landed_results = []
+
+                    async def run_tool_call(tool_call):
+                        tool_name = tool_call.get("function", {}).get("name", "")
+
+                        async with tool_call_semaphore:
+                            start = time.perf_counter()
+                            result = await execute_tool_call(tool_call)
+                            duration = time.perf_counter() - start
+
+                        log.info(
+                            f"Tool call {tool_name} ({result['tool_call_id']}) "
+                            f"finished in {duration:.3f}s"
+                        )
+
+                        landed_results.append(result)
+                        content_blocks[-1]["results"] = landed_results
+
+                        await event_emitter(
                             {
-                                "tool_call_id": tool_call_id,
-                                "content": tool_result,
-                                **(
-                                    {"files": tool_result_files}
-                                    if tool_result_files
-                                    else {}
-                                ),
+                                "type": "status",
+                                "data": {
+                                    "action": "tool_call",
+                                    "description": f"Executed {tool_name}",
+                                    "tool_call_id": result["tool_call_id"],
+                                    "name": tool_name,
+                                    "duration": round(duration, 3),
+                                    "done": len(landed_results)
+                                    == len(response_tool_calls),
+                                },
                             }
                         )
+                        await event_emitter(
+                            {
+                                "type": "chat:completion",
+                                "data": {
+                                    "content": serialize_content_blocks(content_blocks),
+                                },
+                            }
+                        )
+                        return result
 
-                    content_blocks[-1]["results"] = results
+                    results = await asyncio.gather(
+                        *[run_tool_call(tool_call) for tool_call in response_tool_calls]
+                    )
+
+                    content_blocks[-1]["results"] = list(results)
 
                     content_blocks.append(
                         {
@@ -2073,6 +2153,11 @@ async def process_chat_response(
                                             else None
                                         ),
                                         request.app.state.config.CODE_INTERPRETER_JUPYTER_TIMEOUT,
+                                        session_key=(
+                                            f"{user.id}:{metadata['chat_id']}"
+                                            if metadata.get("chat_id")
+                                            else None
+                                        ),
                                     )
                                 else:
                                     output = {
@@ -2233,7 +2318,7 @@ async def process_chat_response(
                     }
                 )
 
-                await background_tasks_handler()
+                await background_tasks_handler(data["content"])
             except asyncio.CancelledError:
                 log.warning("Task was cancelled!")
                 await event_emitter({"type": "task-cancelled"})
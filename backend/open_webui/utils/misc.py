@@ -244,6 +244,24 @@ def openai_chat_completion_message_template(
     return template
 
 
+# Keyset pagination cursor, "<timestamp>:<id>" of the last row of a page
+CURSOR_PATTERN = r"^\d+:.+$"
+
+
+def get_cursor(timestamp: int, id: str) -> str:
+    # Built server side where timestamps are in ns, as clients can't
+    # represent those exactly
+    return f"{timestamp}:{id}"
+
+
+def parse_cursor(cursor: Optional[str]) -> Optional[tuple[int, str]]:
+    if cursor is None:
+        return None
+
+    value, _, id = cursor.partition(":")
+    return int(value), id
+
+
 def get_gravatar_url(email):
     # Trim leading and trailing whitespace from
     # an email address and force all characters
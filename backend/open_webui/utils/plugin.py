@@ -6,14 +6,42 @@ from importlib import util
 import types
 import tempfile
 import logging
-
-from open_webui.env import SRC_LOG_LEVELS, PIP_OPTIONS, PIP_PACKAGE_INDEX_OPTIONS
+import hashlib
+import json
+import marshal
+import uuid
+from typing import Optional
+
+from open_webui.env import (
+    SRC_LOG_LEVELS,
+    PIP_OPTIONS,
+    PIP_PACKAGE_INDEX_OPTIONS,
+    REDIS_URL,
+    REDIS_SENTINEL_HOSTS,
+    REDIS_SENTINEL_PORT,
+)
+from open_webui.config import CACHE_DIR
 from open_webui.models.functions import Functions
 from open_webui.models.tools import Tools
+from open_webui.utils.redis import (
+    get_async_redis_connection,
+    get_sentinels_from_env,
+    listen_to_channel,
+)
 
 log = logging.getLogger(__name__)
 log.setLevel(SRC_LOG_LEVELS["MAIN"])
 
+PLUGIN_CACHE_DIR = CACHE_DIR / "plugins"
+PLUGIN_UPDATES_CHANNEL = "open-webui:plugins"
+plugin_redis = None
+
+# Content hash of the loaded source by "tool:<id>" / "function:<id>"
+PLUGIN_VERSIONS: dict[str, str] = {}
+
+# Identifies this worker in broadcast messages
+PLUGIN_WORKER_ID = str(uuid.uuid4())
+
 
 def extract_frontmatter(content):
     """
@@ -68,6 +96,111 @@ def replace_imports(content):
     return content
 
 
+def get_plugin_hash(content: str) -> str:
+    return hashlib.sha256(content.encode()).hexdigest()
+
+
+def compile_plugin(content: str, content_hash: str):
+    # Source and bytecode are stored by content hash, so every version is
+    # compiled once and shared by all workers on the host
+    PLUGIN_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+
+    source_path = PLUGIN_CACHE_DIR / f"{content_hash}.py"
+    bytecode_path = (
+        PLUGIN_CACHE_DIR / f"{content_hash}.{sys.implementation.cache_tag}.bin"
+    )
+
+    if not source_path.exists():
+        # Write to a temporary file first so concurrent workers never
+        # observe a partially written file
+        with tempfile.NamedTemporaryFile(
+            "w", dir=PLUGIN_CACHE_DIR, delete=False, encoding="utf-8"
+        ) as f:
+            f.write(content)
+        os.replace(f.name, source_path)
+
+    if bytecode_path.exists():
+        try:
+            with open(bytecode_path, "rb") as f:
+                return marshal.load(f), str(source_path)
+        except Exception as e:
+            log.warning(f"Ignoring invalid plugin bytecode {bytecode_path}: {e}")
+
+    code = compile(content, str(source_path), "exec")
+    try:
+        with tempfile.NamedTemporaryFile(dir=PLUGIN_CACHE_DIR, delete=False) as f:
+            marshal.dump(code, f)
+        os.replace(f.name, bytecode_path)
+    except Exception as e:
+        log.warning(f"Failed to cache plugin bytecode: {e}")
+
+    return code, str(source_path)
+
+
+def remove_plugin_files(content_hash: str):
+    for path in PLUGIN_CACHE_DIR.glob(f"{content_hash}.*"):
+        try:
+            path.unlink(missing_ok=True)
+        except Exception as e:
+            log.warning(f"Failed to remove cached plugin file {path}: {e}")
+
+
+def set_plugin_version(key: str, content_hash: Optional[str]):
+    # Drops the cached files of the version being replaced, unless another
+    # plugin has the very same source
+    previous = PLUGIN_VERSIONS.pop(key, None)
+    if content_hash is not None:
+        PLUGIN_VERSIONS[key] = content_hash
+
+    if previous and previous != content_hash:
+        if previous not in PLUGIN_VERSIONS.values():
+            remove_plugin_files(previous)
+
+
+def prune_plugin_cache():
+    # Versions replaced while no worker was running are never released by
+    # set_plugin_version, drop every file no tool or function uses
+    if not PLUGIN_CACHE_DIR.exists():
+        return
+
+    hashes = {
+        get_plugin_hash(replace_imports(tool.content)) for tool in Tools.get_tools()
+    }
+    hashes |= {
+        get_plugin_hash(replace_imports(function.content))
+        for function in Functions.get_functions()
+    }
+
+    for path in PLUGIN_CACHE_DIR.glob("*.*"):
+        if path.suffix in (".py", ".bin") and path.name.split(".")[0] not in hashes:
+            try:
+                path.unlink(missing_ok=True)
+            except Exception as e:
+                log.warning(f"Failed to remove cached plugin file {path}: {e}")
+
+
+def load_plugin_module(module_name: str, content: str):
+    content_hash = get_plugin_hash(content)
+
+    module = types.ModuleType(module_name)
+    sys.modules[module_name] = module
+
+    try:
+        code, source_path = compile_plugin(content, content_hash)
+
+        # `__file__` points at the cached source so that it works as expected
+        # from the module's perspective
+        module.__dict__["__file__"] = source_path
+
+        # Executing the modified content in the created module's namespace
+        exec(code, module.__dict__)
+        log.info(f"Loaded module: {module.__name__} ({content_hash[:12]})")
+        return module, content_hash
+    except Exception:
+        del sys.modules[module_name]  # Clean up
+        raise
+
+
 def load_tool_module_by_id(tool_id, content=None):
 
     if content is None:
@@ -75,44 +208,28 @@ def load_tool_module_by_id(tool_id, content=None):
         if not tool:
             raise Exception(f"Toolkit not found: {tool_id}")
 
-        content = tool.content
-
-        content = replace_imports(content)
-        Tools.update_tool_by_id(tool_id, {"content": content})
+        content = replace_imports(tool.content)
+        if content != tool.content:
+            Tools.update_tool_by_id(tool_id, {"content": content})
     else:
         frontmatter = extract_frontmatter(content)
         # Install required packages found within the frontmatter
         install_frontmatter_requirements(frontmatter.get("requirements", ""))
 
-    module_name = f"tool_{tool_id}"
-    module = types.ModuleType(module_name)
-    sys.modules[module_name] = module
-
-    # Create a temporary file and use it to define `__file__` so
-    # that it works as expected from the module's perspective.
-    temp_file = tempfile.NamedTemporaryFile(delete=False)
-    temp_file.close()
     try:
-        with open(temp_file.name, "w", encoding="utf-8") as f:
-            f.write(content)
-        module.__dict__["__file__"] = temp_file.name
-
-        # Executing the modified content in the created module's namespace
-        exec(content, module.__dict__)
+        module, content_hash = load_plugin_module(f"tool_{tool_id}", content)
         frontmatter = extract_frontmatter(content)
-        log.info(f"Loaded module: {module.__name__}")
 
         # Create and return the object if the class 'Tools' is found in the module
         if hasattr(module, "Tools"):
+            set_plugin_version(f"tool:{tool_id}", content_hash)
             return module.Tools(), frontmatter
         else:
             raise Exception("No Tools class found in the module")
     except Exception as e:
         log.error(f"Error loading module: {tool_id}: {e}")
-        del sys.modules[module_name]  # Clean up
+        sys.modules.pop(f"tool_{tool_id}", None)
         raise e
-    finally:
-        os.unlink(temp_file.name)
 
 
 def load_function_module_by_id(function_id, content=None):
@@ -120,49 +237,135 @@ def load_function_module_by_id(function_id, content=None):
         function = Functions.get_function_by_id(function_id)
         if not function:
             raise Exception(f"Function not found: {function_id}")
-        content = function.content
 
-        content = replace_imports(content)
-        Functions.update_function_by_id(function_id, {"content": content})
+        content = replace_imports(function.content)
+        if content != function.content:
+            Functions.update_function_by_id(function_id, {"content": content})
     else:
         frontmatter = extract_frontmatter(content)
         install_frontmatter_requirements(frontmatter.get("requirements", ""))
 
-    module_name = f"function_{function_id}"
-    module = types.ModuleType(module_name)
-    sys.modules[module_name] = module
-
-    # Create a temporary file and use it to define `__file__` so
-    # that it works as expected from the module's perspective.
-    temp_file = tempfile.NamedTemporaryFile(delete=False)
-    temp_file.close()
     try:
-        with open(temp_file.name, "w", encoding="utf-8") as f:
-            f.write(content)
-        module.__dict__["__file__"] = temp_file.name
-
-        # Execute the modified content in the created module's namespace
-        exec(content, module.__dict__)
+        module, content_hash = load_plugin_module(f"function_{function_id}", content)
         frontmatter = extract_frontmatter(content)
-        log.info(f"Loaded module: {module.__name__}")
 
         # Create appropriate object based on available class type in the module
         if hasattr(module, "Pipe"):
-            return module.Pipe(), "pipe", frontmatter
+            function_module, function_type = module.Pipe(), "pipe"
         elif hasattr(module, "Filter"):
-            return module.Filter(), "filter", frontmatter
+            function_module, function_type = module.Filter(), "filter"
         elif hasattr(module, "Action"):
-            return module.Action(), "action", frontmatter
+            function_module, function_type = module.Action(), "action"
         else:
             raise Exception("No Function class found in the module")
+
+        set_plugin_version(f"function:{function_id}", content_hash)
+        return function_module, function_type, frontmatter
     except Exception as e:
         log.error(f"Error loading module: {function_id}: {e}")
-        del sys.modules[module_name]  # Cleanup by removing the module in case of error
+        sys.modules.pop(f"function_{function_id}", None)
 
         Functions.update_function_by_id(function_id, {"is_active": False})
         raise e
-    finally:
-        os.unlink(temp_file.name)
+
+
+####################
+# Plugin registry
+####################
+
+
+def get_plugin_cache(app, kind: str) -> dict:
+    return app.state.TOOLS if kind == "tool" else app.state.FUNCTIONS
+
+
+def invalidate_plugin(app, kind: str, plugin_id: str):
+    get_plugin_cache(app, kind).pop(plugin_id, None)
+    set_plugin_version(f"{kind}:{plugin_id}", None)
+
+
+def get_plugin_redis():
+    global plugin_redis
+    if REDIS_URL and plugin_redis is None:
+        plugin_redis = get_async_redis_connection(
+            REDIS_URL,
+            get_sentinels_from_env(REDIS_SENTINEL_HOSTS, REDIS_SENTINEL_PORT),
+        )
+    return plugin_redis
+
+
+async def broadcast_plugin_update(kind: str, plugin_id: str):
+    # Tell the other workers to drop their copy of the plugin, the worker
+    # that handled the update has already reloaded it
+    if not get_plugin_redis():
+        return
+
+    try:
+        await get_plugin_redis().publish(
+            PLUGIN_UPDATES_CHANNEL,
+            json.dumps(
+                {
+                    "kind": kind,
+                    "id": plugin_id,
+                    "version": PLUGIN_VERSIONS.get(f"{kind}:{plugin_id}"),
+                    "origin": PLUGIN_WORKER_ID,
+                }
+            ),
+        )
+    except Exception as e:
+        log.warning(f"Failed to broadcast plugin update for {kind} {plugin_id}: {e}")
+
+
+async def listen_for_plugin_updates(app):
+    if not get_plugin_redis():
+        return
+
+    async def handle(message):
+        try:
+            data = json.loads(message)
+            if data.get("origin") == PLUGIN_WORKER_ID:
+                return
+
+            kind, plugin_id = data["kind"], data["id"]
+            version = PLUGIN_VERSIONS.get(f"{kind}:{plugin_id}")
+            if version is None or version != data.get("version"):
+                invalidate_plugin(app, kind, plugin_id)
+                log.info(f"Invalidated {kind} {plugin_id} after remote update")
+        except Exception as e:
+            log.warning(f"Invalid plugin update message: {e}")
+
+    await listen_to_channel(get_plugin_redis(), PLUGIN_UPDATES_CHANNEL, handle)
+
+
+def warm_up_plugins(app):
+    # Load every tool and active function once at startup so the first
+    # requests don't pay for compiling them
+    try:
+        prune_plugin_cache()
+    except Exception as e:
+        log.warning(f"Failed to prune plugin cache: {e}")
+
+    for tool in Tools.get_tools():
+        if tool.id in app.state.TOOLS:
+            continue
+        try:
+            app.state.TOOLS[tool.id], _ = load_tool_module_by_id(tool.id)
+        except Exception as e:
+            log.warning(f"Failed to warm up tool {tool.id}: {e}")
+
+    for function in Functions.get_functions(active_only=True):
+        if function.id in app.state.FUNCTIONS:
+            continue
+        try:
+            app.state.FUNCTIONS[function.id], _, _ = load_function_module_by_id(
+                function.id
+            )
+        except Exception as e:
+            log.warning(f"Failed to warm up function {function.id}: {e}")
+
+    log.info(
+        f"Warmed up {len(app.state.TOOLS)} tools and "
+        f"{len(app.state.FUNCTIONS)} functions."
+    )
 
 
 def install_frontmatter_requirements(requirements: str):
@@ -1,8 +1,19 @@
+import asyncio
+import logging
+
 import socketio
 import redis
 from redis import asyncio as aioredis
 from urllib.parse import urlparse
 
+from open_webui.env import SRC_LOG_LEVELS
+
+log = logging.getLogger(__name__)
+log.setLevel(SRC_LOG_LEVELS["MAIN"])
+
+# Longest wait in seconds between attempts to resubscribe to a channel
+SUBSCRIBE_MAX_BACKOFF = 30
+
 
 def parse_redis_service_url(redis_url):
     parsed_url = urlparse(redis_url)
@@ -37,6 +48,25 @@ def get_redis_connection(redis_url, redis_sentinels, decode_responses=True):
         return redis.Redis.from_url(redis_url, decode_responses=decode_responses)
 
 
+def get_async_redis_connection(redis_url, redis_sentinels, decode_responses=True):
+    if redis_sentinels:
+        redis_config = parse_redis_service_url(redis_url)
+        sentinel = aioredis.sentinel.Sentinel(
+            redis_sentinels,
+            port=redis_config["port"],
+            db=redis_config["db"],
+            username=redis_config["username"],
+            password=redis_config["password"],
+            decode_responses=decode_responses,
+        )
+
+        # Get a master connection from Sentinel
+        return sentinel.master_for(redis_config["service"])
+    else:
+        # Standard Redis connection
+        return aioredis.Redis.from_url(redis_url, decode_responses=decode_responses)
+
+
 def get_sentinels_from_env(sentinel_hosts_env, sentinel_port_env):
     if sentinel_hosts_env:
         sentinel_hosts = sentinel_hosts_env.split(",")
@@ -56,3 +86,33 @@ def get_sentinel_url_from_env(redis_url, sentinel_hosts_env, sentinel_port_env):
         f"{host}:{sentinel_port_env}" for host in sentinel_hosts_env.split(",")
     )
     return f"redis+sentinel://{auth_part}{hosts_part}/{redis_config['db']}/{redis_config['service']}"
+
+
+async def listen_to_channel(redis_connection, channel: str, handler):
+    """
+    Calls handler(data) for every message published to channel until
+    cancelled. The subscription is re-established with exponential backoff
+    whenever the connection drops.
+    """
+    backoff = 1
+    while True:
+        pubsub = redis_connection.pubsub()
+        try:
+            await pubsub.subscribe(channel)
+            backoff = 1
+
+            async for message in pubsub.listen():
+                if message.get("type") == "message":
+                    await handler(message["data"])
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            log.warning(f"Subscription to {channel} lost, retrying in {backoff}s: {e}")
+        finally:
+            try:
+                await pubsub.aclose()
+            except Exception:
+                pass
+
+        await asyncio.sleep(backoff)
+        backoff = min(backoff * 2, SUBSCRIBE_MAX_BACKOFF)
@@ -2,11 +2,15 @@ import logging
 import math
 import re
 from datetime import datetime
-from typing import Optional
-import uuid
+from functools import lru_cache
+from typing import Callable, NamedTuple, Optional
 
 
-from open_webui.utils.misc import get_last_user_message, get_messages_content
+from open_webui.utils.misc import (
+    get_content_from_message,
+    get_last_user_message,
+    get_messages_content,
+)
 
 from open_webui.env import SRC_LOG_LEVELS
 from open_webui.config import DEFAULT_RAG_TEMPLATE
@@ -32,15 +36,174 @@ def get_task_model_id(
     return task_model_id
 
 
+def get_task_messages(messages: list[dict]) -> list[dict]:
+    """
+    Text-only copy of the user and assistant turns, as background tasks see
+    the conversation.
+    """
+    return [
+        {"role": message["role"], "content": get_content_from_message(message) or ""}
+        for message in messages
+        if message.get("role") in ("user", "assistant")
+    ]
+
+
+def estimate_tokens(text: str) -> int:
+    # About four characters per token, close enough for budgeting prompts
+    # without loading a tokenizer
+    return math.ceil(len(text) / 4)
+
+
+def truncate_messages(messages: list[dict], token_budget: int) -> list[dict]:
+    """
+    Keeps the latest messages that fit in token_budget. The oldest message
+    kept is shortened in the middle if it does not fit whole.
+    """
+    if not token_budget or token_budget <= 0:
+        return [{**message} for message in messages]
+
+    truncated = []
+    remaining = token_budget
+    for message in reversed(messages):
+        if remaining <= 0:
+            break
+
+        content = message["content"]
+        tokens = estimate_tokens(content)
+        if tokens > remaining:
+            half = remaining * 2
+            content = f"{content[:half]}...{content[-half:]}"
+            tokens = remaining
+
+        truncated.insert(0, {**message, "content": content})
+        remaining -= tokens
+
+    return truncated
+
+
 def prompt_variables_template(template: str, variables: dict[str, str]) -> str:
     for variable, value in variables.items():
         template = template.replace(variable, value)
     return template
 
 
-def prompt_template(
-    template: str, user_name: Optional[str] = None, user_location: Optional[str] = None
-) -> str:
+####################
+# Template compilation
+####################
+
+# Templates used to be filled in with one re.sub or str.replace pass per
+# placeholder, each pass also seeing the values inserted by the passes before
+# it. Each pass is now a stage: a template is split once into literal text and
+# placeholders, cached by its text, and rendered with a single join. Inserted
+# values, which can be large (e.g. RAG context), are never cached and only
+# rescanned for the later stages whose marker they contain, so the output
+# stays the same.
+
+
+class TemplateStage(NamedTuple):
+    pattern: str
+    replace: Callable[[re.Match], Optional[str]]
+    # Text that every match of the pattern contains
+    marker: str
+    # Whether the later stages apply to the inserted value
+    cascade: bool = True
+
+
+@lru_cache(maxsize=64)
+def get_literal_pattern(placeholder: str) -> str:
+    return re.escape(placeholder)
+
+
+def literal_stage(placeholder: str, value: str, cascade: bool = True) -> TemplateStage:
+    return TemplateStage(
+        get_literal_pattern(placeholder), lambda match: value, placeholder, cascade
+    )
+
+
+@lru_cache(maxsize=64)
+def get_stages_regex(patterns: tuple[str, ...]) -> re.Pattern:
+    return re.compile(
+        "|".join(f"(?P<stage{idx}>{pattern})" for idx, pattern in enumerate(patterns))
+    )
+
+
+@lru_cache(maxsize=256)
+def compile_template(template: str, patterns: tuple[str, ...]) -> tuple:
+    """
+    Splits a template into literal strings and (stage index, match) pairs for
+    its placeholders.
+    """
+    segments = []
+    position = 0
+    for match in get_stages_regex(patterns).finditer(template):
+        if match.start() > position:
+            segments.append(template[position : match.start()])
+
+        idx = int(match.lastgroup.removeprefix("stage"))
+        segments.append((idx, re.fullmatch(patterns[idx], match.group())))
+        position = match.end()
+
+    if position < len(template):
+        segments.append(template[position:])
+    return tuple(segments)
+
+
+def render_value(value: str, stages: list[TemplateStage]) -> str:
+    """
+    Applies the stages to an inserted value one after another, as the
+    sequential passes did, scanning only for the stages it has markers of.
+    """
+    for idx, stage in enumerate(stages):
+        if stage.marker not in value:
+            continue
+
+        parts = []
+        position = 0
+        for match in re.finditer(stage.pattern, value):
+            parts.append(
+                render_value(value[position : match.start()], stages[idx + 1 :])
+            )
+            replacement = stage.replace(match) or ""
+            if stage.cascade:
+                replacement = render_value(replacement, stages[idx + 1 :])
+            parts.append(replacement)
+            position = match.end()
+
+        parts.append(render_value(value[position:], stages[idx + 1 :]))
+        return "".join(parts)
+
+    return value
+
+
+def render_template(template: str, stages: list[TemplateStage]) -> str:
+    segments = compile_template(template, tuple(stage.pattern for stage in stages))
+
+    parts = []
+    for segment in segments:
+        if isinstance(segment, str):
+            parts.append(segment)
+            continue
+
+        idx, match = segment
+        value = stages[idx].replace(match) or ""
+        if stages[idx].cascade:
+            value = render_value(value, stages[idx + 1 :])
+        parts.append(value)
+
+    return "".join(parts)
+
+
+####################
+# Template stages
+####################
+
+PROMPT_VARIABLE_PATTERN = r"(?i:{{prompt}}|{{prompt:start:(\d+)}}|{{prompt:end:(\d+)}}|{{prompt:middletruncate:(\d+)}})"
+MESSAGES_VARIABLE_PATTERN = r"{{MESSAGES}}|{{MESSAGES:START:(\d+)}}|{{MESSAGES:END:(\d+)}}|{{MESSAGES:MIDDLETRUNCATE:(\d+)}}"
+
+
+def get_prompt_template_stages(
+    user_name: Optional[str] = None, user_location: Optional[str] = None
+) -> list[TemplateStage]:
     # Get the current date
     current_date = datetime.now()
 
@@ -49,31 +212,32 @@ def prompt_template(
     formatted_time = current_date.strftime("%I:%M:%S %p")
     formatted_weekday = current_date.strftime("%A")
 
-    template = template.replace("{{CURRENT_DATE}}", formatted_date)
-    template = template.replace("{{CURRENT_TIME}}", formatted_time)
-    template = template.replace(
-        "{{CURRENT_DATETIME}}", f"{formatted_date} {formatted_time}"
-    )
-    template = template.replace("{{CURRENT_WEEKDAY}}", formatted_weekday)
-
-    if user_name:
-        # Replace {{USER_NAME}} in the template with the user's name
-        template = template.replace("{{USER_NAME}}", user_name)
-    else:
-        # Replace {{USER_NAME}} in the template with "Unknown"
-        template = template.replace("{{USER_NAME}}", "Unknown")
+    return [
+        literal_stage("{{CURRENT_DATE}}", formatted_date),
+        literal_stage("{{CURRENT_TIME}}", formatted_time),
+        literal_stage("{{CURRENT_DATETIME}}", f"{formatted_date} {formatted_time}"),
+        literal_stage("{{CURRENT_WEEKDAY}}", formatted_weekday),
+        # "Unknown" when the user's name or location isn't known
+        literal_stage("{{USER_NAME}}", user_name if user_name else "Unknown"),
+        literal_stage(
+            "{{USER_LOCATION}}", user_location if user_location else "Unknown"
+        ),
+    ]
 
-    if user_location:
-        # Replace {{USER_LOCATION}} in the template with the current location
-        template = template.replace("{{USER_LOCATION}}", user_location)
-    else:
-        # Replace {{USER_LOCATION}} in the template with "Unknown"
-        template = template.replace("{{USER_LOCATION}}", "Unknown")
 
-    return template
+def get_user_stages(user: Optional[dict] = None) -> list[TemplateStage]:
+    return get_prompt_template_stages(
+        **(
+            {"user_name": user.get("name"), "user_location": user.get("location")}
+            if user
+            else {}
+        ),
+    )
 
 
-def replace_prompt_variable(template: str, prompt: str) -> str:
+def get_prompt_variable_stage(
+    prompt: str, pattern: str = PROMPT_VARIABLE_PATTERN, marker: str = "{{"
+) -> TemplateStage:
     def replacement_function(match):
         full_match = match.group(
             0
@@ -97,15 +261,12 @@ def replace_prompt_variable(template: str, prompt: str) -> str:
             return f"{start}...{end}"
         return ""
 
-    # Updated regex pattern to make it case-insensitive with the `(?i)` flag
-    pattern = r"(?i){{prompt}}|{{prompt:start:(\d+)}}|{{prompt:end:(\d+)}}|{{prompt:middletruncate:(\d+)}}"
-    template = re.sub(pattern, replacement_function, template)
-    return template
+    return TemplateStage(pattern, replacement_function, marker)
 
 
-def replace_messages_variable(
-    template: str, messages: Optional[list[dict]] = None
-) -> str:
+def get_messages_variable_stage(
+    messages: Optional[list[dict]] = None,
+) -> TemplateStage:
     def replacement_function(match):
         full_match = match.group(0)
         start_length = match.group(1)
@@ -136,13 +297,30 @@ def replace_messages_variable(
             return f"{formatted_start}\n{formatted_end}"
         return ""
 
-    template = re.sub(
-        r"{{MESSAGES}}|{{MESSAGES:START:(\d+)}}|{{MESSAGES:END:(\d+)}}|{{MESSAGES:MIDDLETRUNCATE:(\d+)}}",
-        replacement_function,
-        template,
+    return TemplateStage(MESSAGES_VARIABLE_PATTERN, replacement_function, "{{MESSAGES")
+
+
+####################
+# Templates
+####################
+
+
+def prompt_template(
+    template: str, user_name: Optional[str] = None, user_location: Optional[str] = None
+) -> str:
+    return render_template(
+        template, get_prompt_template_stages(user_name, user_location)
     )
 
-    return template
+
+def replace_prompt_variable(template: str, prompt: str) -> str:
+    return render_template(template, [get_prompt_variable_stage(prompt)])
+
+
+def replace_messages_variable(
+    template: str, messages: Optional[list[dict]] = None
+) -> str:
+    return render_template(template, [get_messages_variable_stage(messages)])
 
 
 # {{prompt:middletruncate:8000}}
@@ -152,8 +330,6 @@ def rag_template(template: str, context: str, query: str):
     if template.strip() == "":
         template = DEFAULT_RAG_TEMPLATE
 
-    template = prompt_template(template)
-
     if "[context]" not in template and "{{CONTEXT}}" not in template:
         log.debug(
             "WARNING: The RAG template does not contain the '[context]' or '{{CONTEXT}}' placeholder."
@@ -166,98 +342,80 @@ def rag_template(template: str, context: str, query: str):
             "nothing, or the user might be trying to hack something."
         )
 
-    query_placeholders = []
-    if "[query]" in context:
-        query_placeholder = "{{QUERY" + str(uuid.uuid4()) + "}}"
-        template = template.replace("[query]", query_placeholder)
-        query_placeholders.append(query_placeholder)
+    stages = get_prompt_template_stages()
 
+    # The template's own query placeholders are filled in without being
+    # rescanned, placeholders inside the context still get the query
+    if "[query]" in context:
+        stages.append(literal_stage("[query]", query, cascade=False))
     if "{{QUERY}}" in context:
-        query_placeholder = "{{QUERY" + str(uuid.uuid4()) + "}}"
-        template = template.replace("{{QUERY}}", query_placeholder)
-        query_placeholders.append(query_placeholder)
+        stages.append(literal_stage("{{QUERY}}", query, cascade=False))
 
-    template = template.replace("[context]", context)
-    template = template.replace("{{CONTEXT}}", context)
-    template = template.replace("[query]", query)
-    template = template.replace("{{QUERY}}", query)
+    stages += [
+        literal_stage("[context]", context),
+        literal_stage("{{CONTEXT}}", context),
+        literal_stage("[query]", query),
+        literal_stage("{{QUERY}}", query),
+    ]
 
-    for query_placeholder in query_placeholders:
-        template = template.replace(query_placeholder, query)
-
-    return template
+    return render_template(template, stages)
 
 
 def title_generation_template(
     template: str, messages: list[dict], user: Optional[dict] = None
 ) -> str:
     prompt = get_last_user_message(messages)
-    template = replace_prompt_variable(template, prompt)
-    template = replace_messages_variable(template, messages)
-
-    template = prompt_template(
+    return render_template(
         template,
-        **(
-            {"user_name": user.get("name"), "user_location": user.get("location")}
-            if user
-            else {}
-        ),
+        [
+            get_prompt_variable_stage(prompt),
+            get_messages_variable_stage(messages),
+            *get_user_stages(user),
+        ],
     )
 
-    return template
+
+def title_tags_generation_template(
+    template: str, messages: list[dict], user: Optional[dict] = None
+) -> str:
+    return title_generation_template(template, messages, user)
 
 
 def tags_generation_template(
     template: str, messages: list[dict], user: Optional[dict] = None
 ) -> str:
     prompt = get_last_user_message(messages)
-    template = replace_prompt_variable(template, prompt)
-    template = replace_messages_variable(template, messages)
-
-    template = prompt_template(
+    return render_template(
         template,
-        **(
-            {"user_name": user.get("name"), "user_location": user.get("location")}
-            if user
-            else {}
-        ),
+        [
+            get_prompt_variable_stage(prompt),
+            get_messages_variable_stage(messages),
+            *get_user_stages(user),
+        ],
     )
-    return template
 
 
 def image_prompt_generation_template(
     template: str, messages: list[dict], user: Optional[dict] = None
 ) -> str:
     prompt = get_last_user_message(messages)
-    template = replace_prompt_variable(template, prompt)
-    template = replace_messages_variable(template, messages)
-
-    template = prompt_template(
+    return render_template(
         template,
-        **(
-            {"user_name": user.get("name"), "user_location": user.get("location")}
-            if user
-            else {}
-        ),
+        [
+            get_prompt_variable_stage(prompt),
+            get_messages_variable_stage(messages),
+            *get_user_stages(user),
+        ],
     )
-    return template
 
 
 def emoji_generation_template(
     template: str, prompt: str, user: Optional[dict] = None
 ) -> str:
-    template = replace_prompt_variable(template, prompt)
-    template = prompt_template(
-        template,
-        **(
-            {"user_name": user.get("name"), "user_location": user.get("location")}
-            if user
-            else {}
-        ),
+    return render_template(
+        template, [get_prompt_variable_stage(prompt), *get_user_stages(user)]
     )
 
-    return template
-
 
 def autocomplete_generation_template(
     template: str,
@@ -266,74 +424,49 @@ def autocomplete_generation_template(
     type: Optional[str] = None,
     user: Optional[dict] = None,
 ) -> str:
-    template = template.replace("{{TYPE}}", type if type else "")
-    template = replace_prompt_variable(template, prompt)
-    template = replace_messages_variable(template, messages)
-
-    template = prompt_template(
+    return render_template(
         template,
-        **(
-            {"user_name": user.get("name"), "user_location": user.get("location")}
-            if user
-            else {}
-        ),
+        [
+            literal_stage("{{TYPE}}", type if type else ""),
+            get_prompt_variable_stage(prompt),
+            get_messages_variable_stage(messages),
+            *get_user_stages(user),
+        ],
     )
-    return template
 
 
 def query_generation_template(
     template: str, messages: list[dict], user: Optional[dict] = None
 ) -> str:
     prompt = get_last_user_message(messages)
-    template = replace_prompt_variable(template, prompt)
-    template = replace_messages_variable(template, messages)
-
-    template = prompt_template(
+    return render_template(
         template,
-        **(
-            {"user_name": user.get("name"), "user_location": user.get("location")}
-            if user
-            else {}
-        ),
+        [
+            get_prompt_variable_stage(prompt),
+            get_messages_variable_stage(messages),
+            *get_user_stages(user),
+        ],
     )
-    return template
 
 
 def moa_response_generation_template(
     template: str, prompt: str, responses: list[str]
 ) -> str:
-    def replacement_function(match):
-        full_match = match.group(0)
-        start_length = match.group(1)
-        end_length = match.group(2)
-        middle_length = match.group(3)
-
-        if full_match == "{{prompt}}":
-            return prompt
-        elif start_length is not None:
-            return prompt[: int(start_length)]
-        elif end_length is not None:
-            return prompt[-int(end_length) :]
-        elif middle_length is not None:
-            middle_length = int(middle_length)
-            if len(prompt) <= middle_length:
-                return prompt
-            start = prompt[: math.ceil(middle_length / 2)]
-            end = prompt[-math.floor(middle_length / 2) :]
-            return f"{start}...{end}"
-        return ""
-
-    template = re.sub(
-        r"{{prompt}}|{{prompt:start:(\d+)}}|{{prompt:end:(\d+)}}|{{prompt:middletruncate:(\d+)}}",
-        replacement_function,
-        template,
-    )
-
     responses = [f'"""{response}"""' for response in responses]
     responses = "\n\n".join(responses)
 
-    template = template.replace("{{responses}}", responses)
-    return template
+    return render_template(
+        template,
+        [
+            # Unlike the other templates, only lowercase {{prompt}} is replaced
+            get_prompt_variable_stage(
+                prompt,
+                r"{{prompt}}|{{prompt:start:(\d+)}}|{{prompt:end:(\d+)}}|{{prompt:middletruncate:(\d+)}}",
+                "{{prompt",
+            ),
+            literal_stage("{{responses}}", responses),
+        ],
+    )
 
 
 def tools_function_calling_generation_template(template: str, tools_specs: str) -> str:
@@ -2,10 +2,15 @@ import inspect
 import logging
 import re
 import inspect
+import hashlib
+import json
+import time
 import aiohttp
 import asyncio
 import yaml
 
+from collections import OrderedDict
+
 from pydantic import BaseModel
 from pydantic.fields import FieldInfo
 from typing import (
@@ -33,10 +38,19 @@ from langchain_core.utils.function_calling import (
 )
 
 
-from open_webui.models.tools import Tools
+from open_webui.models.tools import Tools, ToolModel
 from open_webui.models.users import UserModel
 from open_webui.utils.plugin import load_tool_module_by_id
-from open_webui.env import AIOHTTP_CLIENT_TIMEOUT_TOOL_SERVER_DATA
+from open_webui.env import (
+    AIOHTTP_CLIENT_TIMEOUT,
+    AIOHTTP_CLIENT_TIMEOUT_TOOL_SERVER_DATA,
+    TOOL_SERVER_MAX_CONCURRENCY,
+    TOOL_SERVER_KEEPALIVE_TIMEOUT,
+    TOOL_SERVER_SPEC_CACHE_TTL,
+    TOOL_SERVER_CACHE_MAX_SIZE,
+    TOOL_SERVER_CIRCUIT_BREAKER_THRESHOLD,
+    TOOL_SERVER_CIRCUIT_BREAKER_COOLDOWN,
+)
 
 import copy
 
@@ -54,19 +68,97 @@ def get_async_tool_function_and_apply_extra_params(
         update_wrapper(partial_func, function)
         return partial_func
     else:
-        # Make it a coroutine function
+        # Make it a coroutine function, running in a worker thread so that
+        # blocking tools don't stall concurrent tool calls
         async def new_function(*args, **kwargs):
-            return partial_func(*args, **kwargs)
+            return await asyncio.to_thread(partial_func, *args, **kwargs)
 
         update_wrapper(new_function, function)
         return new_function
 
 
+# Compiled tool specs by tool id, validated against the tool's content hash
+TOOL_SPEC_CACHE: dict[str, dict] = {}
+
+
+def get_tool_content_hash(tool: ToolModel) -> str:
+    return hashlib.sha256(
+        f"{tool.content}\n{json.dumps(tool.specs, sort_keys=True)}".encode()
+    ).hexdigest()
+
+
+def invalidate_tool_spec_cache(tool_id: Optional[str] = None):
+    if tool_id is None:
+        TOOL_SPEC_CACHE.clear()
+    else:
+        TOOL_SPEC_CACHE.pop(tool_id, None)
+
+
+def compile_tool_specs(tool: ToolModel, module, content_hash: str) -> dict:
+    specs = []
+    for spec in copy.deepcopy(tool.specs):
+        # TODO: Fix hack for OpenAI API
+        # Some times breaks OpenAI but others don't. Leaving the comment
+        for val in spec.get("parameters", {}).get("properties", {}).values():
+            if val["type"] == "str":
+                val["type"] = "string"
+
+        # Remove internal reserved parameters (e.g. __id__, __user__)
+        spec["parameters"]["properties"] = {
+            key: val
+            for key, val in spec["parameters"]["properties"].items()
+            if not key.startswith("__")
+        }
+
+        function_name = spec["name"]
+        function = getattr(module, function_name)
+
+        # TODO: Support Pydantic models as parameters
+        if function.__doc__ and function.__doc__.strip() != "":
+            spec["description"] = re.split(":(param|return)", function.__doc__, 1)[0]
+        else:
+            spec["description"] = function_name
+
+        specs.append({"name": function_name, "function": function, "spec": spec})
+
+    return {
+        "hash": content_hash,
+        "module": module,
+        "specs": specs,
+        "metadata": {
+            "file_handler": hasattr(module, "file_handler") and module.file_handler,
+            "citation": hasattr(module, "citation") and module.citation,
+        },
+        # Raw valves and the validated Valves instance built from them
+        "valves": None,
+        "valves_instance": None,
+    }
+
+
+def get_compiled_tool(request: Request, tool: ToolModel) -> dict:
+    module = request.app.state.TOOLS.get(tool.id, None)
+    if module is None:
+        module, _ = load_tool_module_by_id(tool.id)
+        request.app.state.TOOLS[tool.id] = module
+
+    content_hash = get_tool_content_hash(tool)
+    compiled = TOOL_SPEC_CACHE.get(tool.id)
+    if (
+        compiled is None
+        or compiled["hash"] != content_hash
+        or compiled["module"] is not module
+    ):
+        compiled = compile_tool_specs(tool, module, content_hash)
+        TOOL_SPEC_CACHE[tool.id] = compiled
+    return compiled
+
+
 def get_tools(
     request: Request, tool_ids: list[str], user: UserModel, extra_params: dict
 ) -> dict[str, dict]:
     tools_dict = {}
 
+    tool_servers = None
     for tool_id in tool_ids:
         tool = Tools.get_tool_by_id(tool_id)
         if tool is None:
@@ -75,11 +167,12 @@ def get_tools(
                 tool_server_connection = (
                     request.app.state.config.TOOL_SERVER_CONNECTIONS[server_idx]
                 )
-                tool_server_data = None
-                for server in request.app.state.TOOL_SERVERS:
-                    if server["idx"] == server_idx:
-                        tool_server_data = server
-                        break
+                if tool_servers is None:
+                    tool_servers = {
+                        server["idx"]: server
+                        for server in request.app.state.TOOL_SERVERS
+                    }
+                tool_server_data = tool_servers.get(server_idx)
                 assert tool_server_data is not None
                 specs = tool_server_data.get("specs", [])
 
@@ -135,60 +228,41 @@ def get_tools(
             else:
                 continue
         else:
-            module = request.app.state.TOOLS.get(tool_id, None)
-            if module is None:
-                module, _ = load_tool_module_by_id(tool_id)
-                request.app.state.TOOLS[tool_id] = module
+            compiled = get_compiled_tool(request, tool)
+            module = compiled["module"]
 
             extra_params["__id__"] = tool_id
 
-            # Set valves for the tool
+            # Set valves for the tool, re-validating only when they changed
             if hasattr(module, "valves") and hasattr(module, "Valves"):
                 valves = Tools.get_tool_valves_by_id(tool_id) or {}
-                module.valves = module.Valves(**valves)
+                if compiled["valves_instance"] is None or compiled["valves"] != valves:
+                    compiled["valves"] = valves
+                    compiled["valves_instance"] = module.Valves(**valves)
+                module.valves = compiled["valves_instance"]
             if hasattr(module, "UserValves"):
+                # The request user is loaded fresh, no need to query it again
+                user_settings = user.settings.model_dump() if user.settings else {}
+                user_valves = (
+                    user_settings.get("tools", {}).get("valves", {}).get(tool_id, {})
+                )
                 extra_params["__user__"]["valves"] = module.UserValves(  # type: ignore
-                    **Tools.get_user_valves_by_id_and_user_id(tool_id, user.id)
+                    **user_valves
                 )
 
-            for spec in tool.specs:
-                # TODO: Fix hack for OpenAI API
-                # Some times breaks OpenAI but others don't. Leaving the comment
-                for val in spec.get("parameters", {}).get("properties", {}).values():
-                    if val["type"] == "str":
-                        val["type"] = "string"
-
-                # Remove internal reserved parameters (e.g. __id__, __user__)
-                spec["parameters"]["properties"] = {
-                    key: val
-                    for key, val in spec["parameters"]["properties"].items()
-                    if not key.startswith("__")
-                }
-
+            for compiled_spec in compiled["specs"]:
                 # convert to function that takes only model params and inserts custom params
-                function_name = spec["name"]
-                tool_function = getattr(module, function_name)
+                function_name = compiled_spec["name"]
                 callable = get_async_tool_function_and_apply_extra_params(
-                    tool_function, extra_params
+                    compiled_spec["function"], extra_params
                 )
 
-                # TODO: Support Pydantic models as parameters
-                if callable.__doc__ and callable.__doc__.strip() != "":
-                    s = re.split(":(param|return)", callable.__doc__, 1)
-                    spec["description"] = s[0]
-                else:
-                    spec["description"] = function_name
-
                 tool_dict = {
                     "tool_id": tool_id,
                     "callable": callable,
-                    "spec": spec,
+                    "spec": compiled_spec["spec"],
                     # Misc info
-                    "metadata": {
-                        "file_handler": hasattr(module, "file_handler")
-                        and module.file_handler,
-                        "citation": hasattr(module, "citation") and module.citation,
-                    },
+                    "metadata": compiled["metadata"],
                 }
 
                 # TODO: if collision, prepend toolkit name
@@ -420,7 +494,49 @@ def convert_openapi_to_tool_payload(openapi_spec):
     return tool_payload
 
 
-async def get_tool_server_data(token: str, url: str) -> Dict[str, Any]:
+# Fetched OpenAPI specs by (url, auth_type, token), see get_tool_server_data
+TOOL_SERVER_SPEC_CACHE: OrderedDict[tuple, dict] = OrderedDict()
+
+# Converted tool payloads and operation indexes by spec hash
+TOOL_SERVER_PAYLOAD_CACHE: OrderedDict[str, dict] = OrderedDict()
+
+
+def get_lru_cache_entry(cache: OrderedDict, key, default):
+    # Least recently used entries are dropped past TOOL_SERVER_CACHE_MAX_SIZE
+    if key in cache:
+        cache.move_to_end(key)
+        return cache[key]
+
+    cache[key] = default
+    while len(cache) > TOOL_SERVER_CACHE_MAX_SIZE:
+        cache.popitem(last=False)
+    return default
+
+
+def get_openapi_operation_index(openapi_spec: dict) -> dict[str, dict]:
+    # operationId -> route, so tool calls don't scan every path
+    operations = {}
+    for path, methods in openapi_spec.get("paths", {}).items():
+        for method, operation in methods.items():
+            if isinstance(operation, dict) and operation.get("operationId"):
+                operations.setdefault(
+                    operation["operationId"],
+                    {"path": path, "method": method.lower(), "operation": operation},
+                )
+    return operations
+
+
+def get_tool_server_payload(openapi_spec: dict, spec_hash: str) -> dict:
+    payload = TOOL_SERVER_PAYLOAD_CACHE.get(spec_hash)
+    if payload is None:
+        payload = {
+            "specs": convert_openapi_to_tool_payload(openapi_spec),
+            "operations": get_openapi_operation_index(openapi_spec),
+        }
+    return get_lru_cache_entry(TOOL_SERVER_PAYLOAD_CACHE, spec_hash, payload)
+
+
+async def fetch_tool_server_data(token: str, url: str, entry: dict) -> dict:
     headers = {
         "Accept": "application/json",
         "Content-Type": "application/json",
@@ -428,21 +544,120 @@ async def get_tool_server_data(token: str, url: str) -> Dict[str, Any]:
     if token:
         headers["Authorization"] = f"Bearer {token}"
 
-    error = None
+    # Revalidate instead of downloading the spec again if it hasn't changed
+    if entry.get("data") is not None:
+        if entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+
+    timeout = aiohttp.ClientTimeout(total=AIOHTTP_CLIENT_TIMEOUT_TOOL_SERVER_DATA)
+    async with aiohttp.ClientSession(timeout=timeout) as session:
+        async with session.get(url, headers=headers) as response:
+            if response.status == 304 and entry.get("data") is not None:
+                return entry["data"]
+
+            if response.status != 200:
+                error_body = await response.json()
+                raise Exception(error_body)
+
+            body = await response.read()
+            entry["etag"] = response.headers.get("ETag")
+            entry["last_modified"] = response.headers.get("Last-Modified")
+
+    # Check if URL ends with .yaml or .yml to determine format
+    if url.lower().endswith((".yaml", ".yml")):
+        res = yaml.safe_load(body.decode())
+    else:
+        res = json.loads(body)
+
+    spec_hash = hashlib.sha256(body).hexdigest()
+    payload = get_tool_server_payload(res, spec_hash)
+
+    data = {
+        "openapi": res,
+        "info": res.get("info", {}),
+        "specs": payload["specs"],
+        "operations": payload["operations"],
+        "hash": spec_hash,
+    }
+
+    log.debug(f"Fetched tool server data from {url}: {data['info']}")
+    return data
+
+
+async def refresh_tool_server_data(token: str, url: str, entry: dict) -> dict:
     try:
-        timeout = aiohttp.ClientTimeout(total=AIOHTTP_CLIENT_TIMEOUT_TOOL_SERVER_DATA)
-        async with aiohttp.ClientSession(timeout=timeout) as session:
-            async with session.get(url, headers=headers) as response:
-                if response.status != 200:
-                    error_body = await response.json()
-                    raise Exception(error_body)
-
-                # Check if URL ends with .yaml or .yml to determine format
-                if url.lower().endswith((".yaml", ".yml")):
-                    text_content = await response.text()
-                    res = yaml.safe_load(text_content)
-                else:
-                    res = await response.json()
+        data = await fetch_tool_server_data(token, url, entry)
+    except Exception as err:
+        entry["failures"] = entry.get("failures", 0) + 1
+        if entry["failures"] >= TOOL_SERVER_CIRCUIT_BREAKER_THRESHOLD:
+            # Stop calling a failing server for a while
+            entry["open_until"] = time.time() + TOOL_SERVER_CIRCUIT_BREAKER_COOLDOWN
+            log.warning(
+                f"Tool server {url} failed {entry['failures']} times, "
+                f"skipping it for {TOOL_SERVER_CIRCUIT_BREAKER_COOLDOWN}s"
+            )
+        raise err
+    finally:
+        entry["refreshing"] = None
+
+    entry.update(
+        {
+            "data": data,
+            "fetched_at": time.time(),
+            "failures": 0,
+            "open_until": 0,
+        }
+    )
+    return data
+
+
+async def get_tool_server_data(
+    token: str, url: str, use_cache: bool = True, auth_type: str = "bearer"
+) -> Dict[str, Any]:
+    """
+    Returns the OpenAPI spec of a tool server along with its tool payload.
+
+    Specs are cached for TOOL_SERVER_SPEC_CACHE_TTL seconds and revalidated
+    with ETag / Last-Modified afterwards. Stale specs are served right away
+    while they are refreshed in the background, and servers that keep
+    failing are skipped until their circuit breaker cools down. Entries are
+    kept per credentials, a server may expose different specs to each user.
+    """
+    entry = get_lru_cache_entry(TOOL_SERVER_SPEC_CACHE, (url, auth_type, token), {})
+    data = entry.get("data")
+
+    try:
+        if use_cache:
+            if entry.get("open_until", 0) > time.time():
+                if data is not None:
+                    return data
+                raise Exception(f"Tool server {url} is unavailable")
+
+            if data is not None:
+                if (
+                    time.time() - entry.get("fetched_at", 0)
+                    < TOOL_SERVER_SPEC_CACHE_TTL
+                ):
+                    return data
+
+                if not entry.get("refreshing"):
+                    entry["refreshing"] = asyncio.create_task(
+                        refresh_tool_server_data(token, url, entry)
+                    )
+                    entry["refreshing"].add_done_callback(
+                        lambda task: task.cancelled() or task.exception()
+                    )
+                return data
+
+        if entry.get("refreshing"):
+            return await asyncio.shield(entry["refreshing"])
+
+        entry["refreshing"] = asyncio.create_task(
+            refresh_tool_server_data(token, url, entry)
+        )
+        return await asyncio.shield(entry["refreshing"])
     except Exception as err:
         log.exception(f"Could not fetch tool server spec from {url}")
         if isinstance(err, dict) and "detail" in err:
@@ -451,18 +666,11 @@ async def get_tool_server_data(token: str, url: str) -> Dict[str, Any]:
             error = str(err)
         raise Exception(error)
 
-    data = {
-        "openapi": res,
-        "info": res.get("info", {}),
-        "specs": convert_openapi_to_tool_payload(res),
-    }
-
-    print("Fetched data:", data)
-    return data
-
 
 async def get_tool_servers_data(
-    servers: List[Dict[str, Any]], session_token: Optional[str] = None
+    servers: List[Dict[str, Any]],
+    session_token: Optional[str] = None,
+    include_session: bool = True,
 ) -> List[Dict[str, Any]]:
     # Prepare list of enabled servers along with their original index
     server_entries = []
@@ -472,25 +680,30 @@ async def get_tool_servers_data(
             full_url = f"{server.get('url')}/{url_path}"
 
             auth_type = server.get("auth_type", "bearer")
+            if auth_type == "session" and not include_session:
+                continue
             token = None
 
             if auth_type == "bearer":
                 token = server.get("key", "")
             elif auth_type == "session":
                 token = session_token
-            server_entries.append((idx, server, full_url, token))
+            server_entries.append((idx, server, full_url, auth_type, token))
 
     # Create async tasks to fetch data
-    tasks = [get_tool_server_data(token, url) for (_, _, url, token) in server_entries]
+    tasks = [
+        get_tool_server_data(token, url, auth_type=auth_type)
+        for (_, _, url, auth_type, token) in server_entries
+    ]
 
     # Execute tasks concurrently
     responses = await asyncio.gather(*tasks, return_exceptions=True)
 
     # Build final results with index and server metadata
     results = []
-    for (idx, server, url, _), response in zip(server_entries, responses):
+    for (idx, server, url, _, _), response in zip(server_entries, responses):
         if isinstance(response, Exception):
-            print(f"Failed to connect to {url} OpenAPI tool server")
+            log.warning(f"Failed to connect to {url} OpenAPI tool server")
             continue
 
         results.append(
@@ -500,67 +713,137 @@ async def get_tool_servers_data(
                 "openapi": response.get("openapi"),
                 "info": response.get("info"),
                 "specs": response.get("specs"),
+                "operations": response.get("operations"),
+                "hash": response.get("hash"),
             }
         )
 
     return results
 
 
-async def execute_tool_server(
-    token: str, url: str, name: str, params: Dict[str, Any], server_data: Dict[str, Any]
-) -> Any:
-    error = None
-    try:
-        openapi = server_data.get("openapi", {})
-        paths = openapi.get("paths", {})
-
-        matching_route = None
-        for route_path, methods in paths.items():
-            for http_method, operation in methods.items():
-                if isinstance(operation, dict) and operation.get("operationId") == name:
-                    matching_route = (route_path, methods)
-                    break
-            if matching_route:
-                break
-
-        if not matching_route:
-            raise Exception(f"No matching route found for operationId: {name}")
-
-        route_path, methods = matching_route
-
-        method_entry = None
-        for http_method, operation in methods.items():
-            if operation.get("operationId") == name:
-                method_entry = (http_method.lower(), operation)
-                break
+async def periodic_tool_servers_refresh(app):
+    # Keeps app.state.TOOL_SERVERS fresh without waiting for a request
+    while True:
+        await asyncio.sleep(TOOL_SERVER_SPEC_CACHE_TTL)
+        try:
+            connections = app.state.config.TOOL_SERVER_CONNECTIONS
+            if connections:
+                # Session auth servers need the token of a user's request, keep
+                # whatever the last request fetched for them
+                servers = await get_tool_servers_data(
+                    connections, include_session=False
+                )
+                servers.extend(
+                    server
+                    for server in app.state.TOOL_SERVERS
+                    if server["idx"] < len(connections)
+                    and connections[server["idx"]].get("auth_type", "bearer")
+                    == "session"
+                )
+                app.state.TOOL_SERVERS = sorted(
+                    servers, key=lambda server: server["idx"]
+                )
+        except Exception as e:
+            log.warning(f"Failed to refresh tool servers: {e}")
 
-        if not method_entry:
-            raise Exception(f"No matching method found for operationId: {name}")
 
-        http_method, operation = method_entry
+class ToolServerExecutor:
+    """
+    Executes tool calls against one OpenAPI tool server.
 
-        path_params = {}
-        query_params = {}
-        body_params = {}
+    Holds a pooled keep-alive session, a per-server concurrency limit and an
+    operationId index whose path templates are split into segments once per
+    spec version.
+    """
 
-        for param in operation.get("parameters", []):
-            param_name = param["name"]
-            param_in = param["in"]
-            if param_name in params:
-                if param_in == "path":
-                    path_params[param_name] = params[param_name]
-                elif param_in == "query":
-                    query_params[param_name] = params[param_name]
+    def __init__(self, url: str, max_concurrency: int = TOOL_SERVER_MAX_CONCURRENCY):
+        self.url = url
+        self.semaphore = asyncio.Semaphore(max_concurrency)
+        self.max_concurrency = max_concurrency
+        self.session: Optional[aiohttp.ClientSession] = None
+        self.operations: dict[str, dict] = {}
+        self.spec_hash: Optional[str] = None
+
+    def get_session(self) -> aiohttp.ClientSession:
+        if self.session is None or self.session.closed:
+            self.session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(
+                    limit_per_host=self.max_concurrency,
+                    keepalive_timeout=TOOL_SERVER_KEEPALIVE_TIMEOUT,
+                ),
+                timeout=aiohttp.ClientTimeout(total=AIOHTTP_CLIENT_TIMEOUT),
+            )
+        return self.session
+
+    def load_operations(self, server_data: Dict[str, Any]):
+        spec_hash = server_data.get("hash")
+        if self.operations and spec_hash is not None and spec_hash == self.spec_hash:
+            return
+
+        operations = server_data.get("operations")
+        if operations is None:
+            operations = get_openapi_operation_index(server_data.get("openapi", {}))
+
+        self.operations = {
+            name: self.compile_operation(entry) for name, entry in operations.items()
+        }
+        self.spec_hash = spec_hash
+
+    @staticmethod
+    def compile_operation(entry: dict) -> dict:
+        operation = entry["operation"]
+
+        # "/items/{id}" -> ["/items/", "id", ""], names at odd positions
+        segments = re.split(r"\{([^}]+)\}", entry["path"])
+
+        return {
+            "method": entry["method"],
+            "segments": segments,
+            "path_params": {
+                param["name"]
+                for param in operation.get("parameters", [])
+                if param.get("in") == "path"
+            },
+            "query_params": {
+                param["name"]
+                for param in operation.get("parameters", [])
+                if param.get("in") == "query"
+            },
+            "has_body": bool(operation.get("requestBody", {}).get("content")),
+        }
+
+    async def execute(
+        self, token: str, name: str, params: Dict[str, Any], server_data: Dict[str, Any]
+    ) -> Any:
+        self.load_operations(server_data)
+
+        operation = self.operations.get(name)
+        if operation is None:
+            raise Exception(f"No matching route found for operationId: {name}")
 
-        final_url = f"{url}{route_path}"
-        for key, value in path_params.items():
-            final_url = final_url.replace(f"{{{key}}}", str(value))
+        segments = operation["segments"]
+        path = "".join(
+            (
+                segment
+                if i % 2 == 0
+                else (
+                    str(params[segment])
+                    if segment in params and segment in operation["path_params"]
+                    else f"{{{segment}}}"
+                )
+            )
+            for i, segment in enumerate(segments)
+        )
+        final_url = f"{self.url}{path}"
 
-        if query_params:
-            query_string = "&".join(f"{k}={v}" for k, v in query_params.items())
-            final_url = f"{final_url}?{query_string}"
+        query_params = {
+            key: str(value)
+            for key, value in params.items()
+            if key in operation["query_params"]
+        }
 
-        if operation.get("requestBody", {}).get("content"):
+        body_params = {}
+        if operation["has_body"]:
             if params:
                 body_params = params
             else:
@@ -573,25 +856,52 @@ async def execute_tool_server(
         if token:
             headers["Authorization"] = f"Bearer {token}"
 
-        async with aiohttp.ClientSession() as session:
-            request_method = getattr(session, http_method.lower())
-
-            if http_method in ["post", "put", "patch"]:
-                async with request_method(
-                    final_url, json=body_params, headers=headers
-                ) as response:
-                    if response.status >= 400:
-                        text = await response.text()
-                        raise Exception(f"HTTP error {response.status}: {text}")
-                    return await response.json()
-            else:
-                async with request_method(final_url, headers=headers) as response:
-                    if response.status >= 400:
-                        text = await response.text()
-                        raise Exception(f"HTTP error {response.status}: {text}")
-                    return await response.json()
+        http_method = operation["method"]
+        async with self.semaphore:
+            async with self.get_session().request(
+                http_method.upper(),
+                final_url,
+                params=query_params or None,
+                json=body_params if http_method in ["post", "put", "patch"] else None,
+                headers=headers,
+            ) as response:
+                if response.status >= 400:
+                    text = await response.text()
+                    raise Exception(f"HTTP error {response.status}: {text}")
+                return await response.json()
+
+    async def close(self):
+        if self.session is not None and not self.session.closed:
+            await self.session.close()
 
+
+# One executor per tool server URL
+TOOL_SERVER_EXECUTORS: dict[str, ToolServerExecutor] = {}
+
+
+def get_tool_server_executor(url: str) -> ToolServerExecutor:
+    executor = TOOL_SERVER_EXECUTORS.get(url)
+    if executor is None:
+        executor = ToolServerExecutor(url)
+        TOOL_SERVER_EXECUTORS[url] = executor
+    return executor
+
+
+async def close_tool_server_executors():
+    for executor in TOOL_SERVER_EXECUTORS.values():
+        await executor.close()
+    TOOL_SERVER_EXECUTORS.clear()
+
+
+async def execute_tool_server(
+    token: str, url: str, name: str, params: Dict[str, Any], server_data: Dict[str, Any]
+) -> Any:
+    error = None
+    try:
+        return await get_tool_server_executor(url).execute(
+            token, name, params, server_data
+        )
     except Exception as err:
         error = str(err)
-        print("API Request Error:", error)
+        log.error(f"API Request Error: {error}")
         return {"error": error}
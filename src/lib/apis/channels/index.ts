@@ -173,12 +173,18 @@ export const getChannelMessages = async (
 	token: string = '',
 	channel_id: string,
 	skip: number = 0,
-	limit: number = 50
+	limit: number = 50,
+	cursor: string | null = null
 ) => {
 	let error = null;
 
+	const searchParams = new URLSearchParams({ skip: `${skip}`, limit: `${limit}` });
+	if (cursor !== null) {
+		searchParams.append('cursor', cursor);
+	}
+
 	const res = await fetch(
-		`${WEBUI_API_BASE_URL}/channels/${channel_id}/messages?skip=${skip}&limit=${limit}`,
+		`${WEBUI_API_BASE_URL}/channels/${channel_id}/messages?${searchParams.toString()}`,
 		{
 			method: 'GET',
 			headers: {
@@ -213,12 +219,18 @@ export const getChannelThreadMessages = async (
 	channel_id: string,
 	message_id: string,
 	skip: number = 0,
-	limit: number = 50
+	limit: number = 50,
+	cursor: string | null = null
 ) => {
 	let error = null;
 
+	const searchParams = new URLSearchParams({ skip: `${skip}`, limit: `${limit}` });
+	if (cursor !== null) {
+		searchParams.append('cursor', cursor);
+	}
+
 	const res = await fetch(
-		`${WEBUI_API_BASE_URL}/channels/${channel_id}/messages/${message_id}/thread?skip=${skip}&limit=${limit}`,
+		`${WEBUI_API_BASE_URL}/channels/${channel_id}/messages/${message_id}/thread?${searchParams.toString()}`,
 		{
 			method: 'GET',
 			headers: {
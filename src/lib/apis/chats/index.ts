@@ -72,7 +72,11 @@ export const importChat = async (
 	return res;
 };
 
-export const getChatList = async (token: string = '', page: number | null = null) => {
+export const getChatList = async (
+	token: string = '',
+	page: number | null = null,
+	cursor: string | null = null
+) => {
 	let error = null;
 	const searchParams = new URLSearchParams();
 
@@ -80,6 +84,10 @@ export const getChatList = async (token: string = '', page: number | null = null
 		searchParams.append('page', `${page}`);
 	}
 
+	if (cursor !== null) {
+		searchParams.append('cursor', cursor);
+	}
+
 	const res = await fetch(`${WEBUI_API_BASE_URL}/chats/?${searchParams.toString()}`, {
 		method: 'GET',
 		headers: {
@@ -440,10 +448,15 @@ export const getChatListByTagName = async (token: string = '', tagName: string)
 	}));
 };
 
-export const getChatById = async (token: string, id: string) => {
+export const getChatById = async (token: string, id: string, exportChat: boolean = false) => {
 	let error = null;
 
-	const res = await fetch(`${WEBUI_API_BASE_URL}/chats/${id}`, {
+	const searchParams = new URLSearchParams();
+	if (exportChat) {
+		searchParams.append('export', 'true');
+	}
+
+	const res = await fetch(`${WEBUI_API_BASE_URL}/chats/${id}?${searchParams.toString()}`, {
 		method: 'GET',
 		headers: {
 			Accept: 'application/json',